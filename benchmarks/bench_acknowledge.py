@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Acknowledge Latency Benchmark for Alexa Plus Chatbot
+Language: Python 3.9+
+Purpose: Show CaregiverConfirmIntent latency stays flat as call history grows
+
+Runs offline against an in-memory stand-in for the CareHomeCalls table.
+Historical (acknowledged) calls are synthesized on demand so a 1M-call
+history costs no memory; scans still visit every one of them, the way a
+DynamoDB scan reads every item, while the sparse pending-calls index only
+ever holds open calls.
+
+Usage:
+    python benchmarks/bench_acknowledge.py
+    python benchmarks/bench_acknowledge.py --sizes 1000 1000000 --legacy-max 100000
+"""
+
+import argparse
+import bisect
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from botocore.exceptions import ClientError
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'lambda'))
+
+from lambda_function import AlexaCareHandler, PENDING_CALLS_INDEX  # noqa: E402
+
+OPEN_CALLS = 5
+EPOCH = datetime(2024, 1, 1)
+
+
+class FakeCallsTable:
+    """Minimal CareHomeCalls table with a sparse pending-calls index"""
+
+    def __init__(self, history_size: int):
+        self.history_size = history_size
+        self.items = {}
+        self.pending_index = []  # sorted (timestamp, call_id)
+
+    def _history_item(self, n: int):
+        return {
+            'call_id': f'hist-{n}',
+            'room': f'room{n % 300}',
+            'type': 'touch_call',
+            'message': 'History',
+            'timestamp': (EPOCH + timedelta(seconds=n)).isoformat(),
+            'status': 'acknowledged'
+        }
+
+    def put_item(self, Item):
+        self.items[Item['call_id']] = dict(Item)
+        if 'pending' in Item:
+            bisect.insort(self.pending_index, (Item['timestamp'], Item['call_id']))
+
+    def scan(self, **kwargs):
+        wanted = kwargs['ExpressionAttributeValues'][':status']
+        matches = []
+        for n in range(self.history_size):
+            item = self._history_item(n)
+            if item['status'] == wanted:
+                matches.append(item)
+        matches.extend(i for i in self.items.values() if i['status'] == wanted)
+        return {'Items': matches}
+
+    def query(self, **kwargs):
+        assert kwargs['IndexName'] == PENDING_CALLS_INDEX
+        limit = kwargs.get('Limit', len(self.pending_index))
+        entries = self.pending_index[::-1] if not kwargs.get('ScanIndexForward', True) else self.pending_index
+        return {'Items': [{'call_id': call_id, 'timestamp': ts, 'pending': 'pending'}
+                          for ts, call_id in entries[:limit]]}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues, ConditionExpression=None, **kwargs):
+        item = self.items.get(Key['call_id'])
+        if ConditionExpression and (item is None or item['status'] != 'pending'):
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'UpdateItem')
+        if item is None:
+            return {}
+        item['status'] = ExpressionAttributeValues[':status']
+        item['acknowledged_at'] = ExpressionAttributeValues[':time']
+        if 'pending' in item:
+            del item['pending']
+            self.pending_index.remove((item['timestamp'], item['call_id']))
+        return {}
+
+
+def legacy_acknowledge(table: FakeCallsTable):
+    """The pre-index implementation: full scan plus max() in Python"""
+    response = table.scan(
+        FilterExpression='#status = :status',
+        ExpressionAttributeNames={'#status': 'status'},
+        ExpressionAttributeValues={':status': 'pending'}
+    )
+    if response['Items']:
+        latest_call = max(response['Items'], key=lambda x: x['timestamp'])
+        table.update_item(
+            Key={'call_id': latest_call['call_id']},
+            UpdateExpression='SET #status = :status, acknowledged_at = :time',
+            ExpressionAttributeValues={':status': 'acknowledged', ':time': datetime.now().isoformat()}
+        )
+
+
+def seed_open_calls(table: FakeCallsTable, count: int):
+    base = EPOCH + timedelta(seconds=table.history_size)
+    for n in range(count):
+        table.put_item(Item={
+            'call_id': f'open-{len(table.items)}',
+            'room': 'room1',
+            'type': 'touch_call',
+            'message': 'Open',
+            'timestamp': (base + timedelta(seconds=len(table.items))).isoformat(),
+            'status': 'pending',
+            'pending': 'pending'
+        })
+
+
+def time_acknowledge(table: FakeCallsTable, acknowledge, rounds: int):
+    samples = []
+    for _ in range(rounds):
+        seed_open_calls(table, OPEN_CALLS)
+        start = time.perf_counter()
+        acknowledge()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--legacy-max', type=int, default=100_000,
+                        help='largest history to run the legacy scan path against')
+    args = parser.parse_args()
+
+    print(f"{'history':>10} {'indexed p50 ms':>15} {'indexed p99 ms':>15} {'legacy p50 ms':>14}")
+    for size in args.sizes:
+        table = FakeCallsTable(size)
+        handler = AlexaCareHandler()
+        handler.calls_table = table
+        indexed = sorted(time_acknowledge(table, handler.acknowledge_latest_call, args.rounds))
+
+        legacy_p50 = '-'
+        if size <= args.legacy_max:
+            legacy_table = FakeCallsTable(size)
+            legacy = time_acknowledge(legacy_table, lambda: legacy_acknowledge(legacy_table), 3)
+            legacy_p50 = f"{statistics.median(legacy):.3f}"
+
+        p99 = indexed[min(len(indexed) - 1, int(len(indexed) * 0.99))]
+        print(f"{size:>10} {statistics.median(indexed):>15.3f} {p99:>15.3f} {legacy_p50:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Lambda Handler Benchmark for Alexa Plus Chatbot
+Language: Python 3.9+
+Purpose: Measure end-to-end lambda_handler latency per request type
+
+Drives lambda_handler with generated Alexa requests (LaunchRequest,
+HelpWakeWordIntent, NurseWakeWordIntent with a message slot, the APL
+touch-call UserEvent and CaregiverConfirmIntent) against stubbed DynamoDB
+and SNS clients that sleep for a configurable latency. No AWS access is
+needed.
+
+Reports p50/p95/p99 per intent, then re-runs the mix under tracemalloc
+(allocations per invocation) and cProfile (top functions by cumulative
+time).
+
+Usage:
+    python benchmarks/bench_lambda_handler.py
+    python benchmarks/bench_lambda_handler.py --iterations 500 --db-latency-ms 8 --sns-latency-ms 25
+    python benchmarks/bench_lambda_handler.py --intents NurseWakeWordIntent --no-profile
+"""
+
+import argparse
+import bisect
+import cProfile
+import io
+import os
+import pstats
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'lambda'))
+
+import lambda_function  # noqa: E402
+
+ROOMS = 300
+NURSE_MESSAGES = [
+    "I need water",
+    "Can someone help me to the bathroom",
+    "I dropped my glasses",
+    "I'm feeling cold, could I have another blanket",
+    "Please bring my medication",
+]
+
+
+class Latency:
+    """Simulated service round trip: a base delay plus uniform jitter"""
+
+    def __init__(self, base_ms: float, jitter_ms: float = 0.0):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+
+    def wait(self):
+        delay = self.base_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+
+class StubCallsTable:
+    """CareHomeCalls Table stand-in with a sparse pending-calls index"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.items = {}
+        self.pending_index = []  # sorted (timestamp, call_id)
+        self.lock = threading.Lock()
+
+    def put_item(self, Item, **kwargs):
+        self.latency.wait()
+        with self.lock:
+            self.items[Item['call_id']] = dict(Item)
+            if 'pending' in Item:
+                bisect.insort(self.pending_index, (Item['timestamp'], Item['call_id']))
+        return {}
+
+    def get_item(self, Key, **kwargs):
+        self.latency.wait()
+        item = self.items.get(Key['call_id'])
+        return {'Item': dict(item)} if item else {}
+
+    def query(self, **kwargs):
+        self.latency.wait()
+        with self.lock:
+            entries = self.pending_index[-1:] if not kwargs.get('ScanIndexForward', True) else self.pending_index[:1]
+        return {'Items': [{'call_id': call_id, 'timestamp': ts, 'pending': 'pending'} for ts, call_id in entries]}
+
+    def update_item(self, Key, **kwargs):
+        self.latency.wait()
+        with self.lock:
+            item = self.items.get(Key['call_id'])
+            if item is None or ('ConditionExpression' in kwargs and item.get('status') != 'pending'):
+                raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'UpdateItem')
+            values = kwargs.get('ExpressionAttributeValues', {})
+            if ':status' in values:
+                item['status'] = values[':status']
+            if 'pending' in item and 'REMOVE' in kwargs.get('UpdateExpression', ''):
+                del item['pending']
+                self.pending_index.remove((item['timestamp'], item['call_id']))
+        return {}
+
+
+class StubSNS:
+    """SNS client stand-in that only pays the publish latency"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.published = 0
+
+    def publish(self, **kwargs):
+        self.latency.wait()
+        self.published += 1
+        return {'MessageId': str(uuid.uuid4())}
+
+
+def envelope(device_id: str, request: dict) -> dict:
+    """Wrap a request in the session/context envelope Alexa sends"""
+    request = dict(request)
+    request.setdefault('requestId', f"amzn1.echo-api.request.{uuid.uuid4()}")
+    request.setdefault('timestamp', datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'))
+    request.setdefault('locale', 'en-GB')
+    return {
+        "version": "1.0",
+        "session": {
+            "new": request['type'] == 'LaunchRequest',
+            "sessionId": f"amzn1.echo-api.session.{uuid.uuid4()}",
+            "application": {"applicationId": "amzn1.ask.skill.care-assistant"},
+            "user": {"userId": "amzn1.ask.account.benchmark"}
+        },
+        "context": {
+            "System": {
+                "application": {"applicationId": "amzn1.ask.skill.care-assistant"},
+                "user": {"userId": "amzn1.ask.account.benchmark"},
+                "device": {
+                    "deviceId": device_id,
+                    "supportedInterfaces": {"Alexa.Presentation.APL": {"runtime": {"maxVersion": "1.9"}}}
+                },
+                "apiEndpoint": "https://api.eu.amazonalexa.com"
+            }
+        },
+        "request": request
+    }
+
+
+def resident_device() -> str:
+    return f"room{random.randint(1, ROOMS)}_device_{uuid.uuid4().hex[:6]}"
+
+
+def launch_event() -> dict:
+    device_id = 'main_device_123' if random.random() < 0.1 else resident_device()
+    return envelope(device_id, {"type": "LaunchRequest"})
+
+
+def intent_event(name: str, slots: dict = None) -> dict:
+    return envelope(resident_device(), {
+        "type": "IntentRequest",
+        "intent": {"name": name, "confirmationStatus": "NONE", "slots": slots or {}}
+    })
+
+
+def nurse_event() -> dict:
+    return intent_event('NurseWakeWordIntent', {
+        "message": {"name": "message", "value": random.choice(NURSE_MESSAGES), "confirmationStatus": "NONE"}
+    })
+
+
+def touch_event() -> dict:
+    return envelope(resident_device(), {
+        "type": "Alexa.Presentation.APL.UserEvent",
+        "token": "residentCallScreen",
+        "arguments": ["touchCall"],
+        "source": {"type": "TouchWrapper", "handler": "Press", "id": "callButton"}
+    })
+
+
+def confirm_event() -> dict:
+    return envelope('main_device_123', {
+        "type": "IntentRequest",
+        "intent": {"name": "CaregiverConfirmIntent", "confirmationStatus": "NONE", "slots": {}}
+    })
+
+
+GENERATORS = {
+    'LaunchRequest': launch_event,
+    'HelpWakeWordIntent': lambda: intent_event('HelpWakeWordIntent'),
+    'NurseWakeWordIntent': nurse_event,
+    'APL.UserEvent': touch_event,
+    'CaregiverConfirmIntent': confirm_event,
+}
+
+
+def build_handler(db_latency: Latency):
+    """A fresh handler wired to the stubs, as in a warm container"""
+    handler = lambda_function.AlexaCareHandler()
+    handler.calls_table = StubCallsTable(db_latency)
+    handler.status_table = None
+    handler.outbox = None
+    return handler
+
+
+def percentile(ordered, fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_mix(handler, intents, iterations: int):
+    """Invoke each intent `iterations` times, interleaved; returns ms samples per intent"""
+    samples = {name: [] for name in intents}
+    for _ in range(iterations):
+        for name in intents:
+            event = GENERATORS[name]()
+            start = time.perf_counter()
+            handler.lambda_handler(event, None)
+            samples[name].append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report_latency(samples):
+    print(f"{'intent':<24} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, values in samples.items():
+        ordered = sorted(values)
+        print(f"{name:<24} {len(ordered):>6} {statistics.median(ordered):>9.2f} "
+              f"{percentile(ordered, 0.95):>9.2f} {percentile(ordered, 0.99):>9.2f} {ordered[-1]:>9.2f}")
+
+
+def report_allocations(handler, intents, iterations: int):
+    """Net allocated blocks/bytes per invocation, measured one intent at a time"""
+    print(f"\n{'intent':<24} {'blocks/call':>12} {'KiB/call':>10} {'peak KiB':>10}")
+    for name in intents:
+        events = [GENERATORS[name]() for _ in range(iterations)]
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        for event in events:
+            handler.lambda_handler(event, None)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        diff = after.compare_to(before, 'filename')
+        blocks = sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+        size = sum(stat.size_diff for stat in diff if stat.size_diff > 0)
+        print(f"{name:<24} {blocks / iterations:>12.1f} {size / iterations / 1024:>10.2f} {peak / 1024:>10.1f}")
+
+
+def report_profile(handler, intents, iterations: int, top: int):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    run_mix(handler, intents, iterations)
+    profiler.disable()
+
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats('cumulative').print_stats(top)
+    print(f"\ncProfile, {iterations} rounds of the mix (top {top} by cumulative time):")
+    print(out.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200, help='invocations per intent')
+    parser.add_argument('--warmup', type=int, default=20, help='untimed invocations per intent first')
+    parser.add_argument('--intents', nargs='+', choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument('--db-latency-ms', type=float, default=5.0)
+    parser.add_argument('--sns-latency-ms', type=float, default=15.0)
+    parser.add_argument('--jitter-ms', type=float, default=2.0, help='uniform jitter added to each stub call')
+    parser.add_argument('--debounce', action='store_true',
+                        help='keep per-room debouncing on (repeat presses then skip the writes)')
+    parser.add_argument('--no-allocations', action='store_true')
+    parser.add_argument('--no-profile', action='store_true')
+    parser.add_argument('--profile-top', type=int, default=25)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    db_latency = Latency(args.db_latency_ms, args.jitter_ms)
+    sns = StubSNS(Latency(args.sns_latency_ms, args.jitter_ms))
+    debounce_seconds = lambda_function.DEBOUNCE_SECONDS if args.debounce else 0
+
+    with patch('lambda_function.get_sns', return_value=sns), \
+         patch('lambda_function.DEBOUNCE_SECONDS', debounce_seconds), \
+         patch('telemetry.LOG_EVENT_SAMPLE_RATE', 0.0):
+        handler = build_handler(db_latency)
+        run_mix(handler, args.intents, args.warmup)
+
+        print(f"lambda_handler, stub latency db={args.db_latency_ms}ms sns={args.sns_latency_ms}ms "
+              f"(+0-{args.jitter_ms}ms jitter), {args.iterations} invocations per intent\n")
+        report_latency(run_mix(handler, args.intents, args.iterations))
+
+        if not args.no_allocations:
+            report_allocations(handler, args.intents, args.iterations)
+        if not args.no_profile:
+            report_profile(handler, args.intents, max(1, args.iterations // 4), args.profile_top)
+
+
+if __name__ == "__main__":
+    main()
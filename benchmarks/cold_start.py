@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Cold Start Measurement for Alexa Plus Chatbot
+Language: Python 3.9+
+Purpose: Track Lambda module import time and first-invocation latency
+
+Each sample runs in a fresh interpreter, the way a new Lambda container
+does: import lambda_function, then time the first LaunchRequest and the
+same LaunchRequest again on the now-warm module (warm_invocation_ms). No
+AWS access is needed; dummy credentials let boto3 build its clients and
+nothing is written.
+
+Usage:
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --runs 20 --max-import-ms 400 --max-first-ms 800
+
+Exits non-zero when a threshold is exceeded, so CI can flag regressions.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+LAMBDA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lambda'))
+
+PROBE = r'''
+import json, time
+start = time.perf_counter()
+import lambda_function
+imported = time.perf_counter()
+
+launch = {
+    "request": {"type": "LaunchRequest"},
+    "context": {"System": {"device": {"deviceId": "room1_device_123"}}}
+}
+lambda_function.lambda_handler(launch, None)
+first = time.perf_counter()
+lambda_function.lambda_handler(launch, None)
+second = time.perf_counter()
+
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_invocation_ms": (first - imported) * 1000,
+    "warm_invocation_ms": (second - first) * 1000,
+}))
+'''
+
+
+def run_probe() -> dict:
+    env = dict(os.environ)
+    env.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    env.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+    env.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=LAMBDA_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--max-import-ms', type=float, help='fail if median import time exceeds this')
+    parser.add_argument('--max-first-ms', type=float, help='fail if median first invocation exceeds this')
+    args = parser.parse_args()
+
+    samples = [run_probe() for _ in range(args.runs)]
+    medians = {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+    print(f"Cold start over {args.runs} fresh interpreters (median):")
+    for key, value in medians.items():
+        print(f"  {key:<22} {value:8.1f} ms")
+
+    failed = False
+    if args.max_import_ms is not None and medians['import_ms'] > args.max_import_ms:
+        print(f"❌ import time {medians['import_ms']:.1f} ms exceeds {args.max_import_ms} ms")
+        failed = True
+    if args.max_first_ms is not None and medians['first_invocation_ms'] > args.max_first_ms:
+        print(f"❌ first invocation {medians['first_invocation_ms']:.1f} ms exceeds {args.max_first_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -156,7 +156,7 @@ deploy_lambda() {
         # Update environment variables
         aws lambda update-function-configuration \
             --function-name $LAMBDA_FUNCTION_NAME \
-            --environment Variables="{\"DYNAMODB_TABLE\":\"$DYNAMODB_TABLE\",\"SNS_TOPIC_ARN\":\"$SNS_TOPIC_ARN\",\"AWS_REGION\":\"$AWS_REGION\"}" \
+            --environment Variables="{\"DYNAMODB_TABLE\":\"$DYNAMODB_TABLE\",\"SNS_TOPIC_ARN\":\"$SNS_TOPIC_ARN\",\"RESIDENTS_TABLE\":\"${PROJECT_NAME}-residents\",\"AWS_REGION\":\"$AWS_REGION\"}" \
             --region $AWS_REGION
     else
         print_status "Creating new Lambda function..."
@@ -168,7 +168,7 @@ deploy_lambda() {
             --zip-file fileb://lambda-deployment.zip \
             --timeout 30 \
             --memory-size 256 \
-            --environment Variables="{\"DYNAMODB_TABLE\":\"$DYNAMODB_TABLE\",\"SNS_TOPIC_ARN\":\"$SNS_TOPIC_ARN\",\"AWS_REGION\":\"$AWS_REGION\"}" \
+            --environment Variables="{\"DYNAMODB_TABLE\":\"$DYNAMODB_TABLE\",\"SNS_TOPIC_ARN\":\"$SNS_TOPIC_ARN\",\"RESIDENTS_TABLE\":\"${PROJECT_NAME}-residents\",\"AWS_REGION\":\"$AWS_REGION\"}" \
             --region $AWS_REGION
         
         # Add Alexa permission
@@ -194,6 +194,15 @@ deploy_lambda() {
     rm -f lambda-deployment.zip
 }
 
+# Function to mark calls opened by earlier releases for the pending-calls index
+migrate_call_records() {
+    print_status "Backfilling open calls into the pending-calls index..."
+    
+    DYNAMODB_TABLE=$DYNAMODB_TABLE AWS_DEFAULT_REGION=$AWS_REGION python src/lambda/migrations.py
+    
+    print_success "Open calls backfilled"
+}
+
 # Function to deploy Alexa skill
 deploy_alexa_skill() {
     print_status "Deploying Alexa skill..."
@@ -335,6 +344,7 @@ main() {
     
     # Deploy Lambda function
     deploy_lambda
+    migrate_call_records
     
     # Deploy Alexa skill
     deploy_alexa_skill
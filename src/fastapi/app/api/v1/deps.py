@@ -0,0 +1,77 @@
+"""
+Shared request parameters for v1 endpoints
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Callable, List, Optional, Tuple, Type
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Upper bound on ?ids= lookups so one request stays a handful of batch reads
+MAX_IDS_PER_REQUEST = 500
+
+
+def id_list(
+    ids: Optional[str] = Query(None, description="Comma-separated IDs to fetch in one request")
+) -> Optional[List[str]]:
+    """Parse an ?ids=a,b,c parameter; None when absent"""
+    if ids is None:
+        return None
+    
+    parsed = [item_id.strip() for item_id in ids.split(',') if item_id.strip()]
+    if len(parsed) > MAX_IDS_PER_REQUEST:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_IDS_PER_REQUEST} ids per request"
+        )
+    return parsed
+
+
+
+def field_list(model: Type[BaseModel], summary_model: Type[BaseModel]) -> Callable[..., Optional[Tuple[str, ...]]]:
+    """Dependency parsing a ?fields= sparse fieldset for `model`.
+    
+    "summary" selects the summary model's fields; otherwise a
+    comma-separated list of the model's field names. None when absent.
+    """
+    allowed = set(model.model_fields)
+    summary = tuple(summary_model.model_fields)
+    
+    def parse(
+        fields: Optional[str] = Query(
+            None, description="'summary' or comma-separated fields to return; only those attributes are read"
+        )
+    ) -> Optional[Tuple[str, ...]]:
+        if fields is None:
+            return None
+        if fields.strip() == 'summary':
+            return summary
+        
+        parsed = tuple(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+        unknown = [field for field in parsed if field not in allowed]
+        if not parsed or unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "fields is empty"
+            )
+        return parsed
+    
+    return parse
+
+
+def sparse_response(content: Any) -> JSONResponse:
+    """Serialize a fieldset-restricted result as-is.
+    
+    The endpoint's response_model describes full items and would reject
+    the missing fields, so the declared model is bypassed.
+    """
+    return JSONResponse(jsonable_encoder(content))
+
+
+def utc(value: datetime) -> datetime:
+    """A query parameter datetime as naive UTC, as stored timestamps are"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
\ No newline at end of file
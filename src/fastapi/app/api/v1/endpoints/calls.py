@@ -2,37 +2,104 @@
 Call event endpoints
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from ....models.call_event import CallEvent, CallEventCreate, CallEventUpdate
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from ....models.call_event import CallEvent, CallEventCreate, CallEventUpdate, CallEventSummary
+from ....models.call_event import CallEventBatchCreate, CallEventBatchResult
+from ....models.pagination import Page
 from ....models.user import User
-from ....db.repositories import CallEventRepository
+from ....core.pagination import InvalidCursorError
+from ....db.repositories import CallEventRepository, CallNotActiveError
+from ....services.export import EXPORT_FORMATS, export_lines, iter_calls
+from ..deps import field_list, id_list, sparse_response, utc
 from .auth import get_current_active_user
 
 router = APIRouter()
 call_repo = CallEventRepository()
+call_fields = field_list(CallEvent, CallEventSummary)
+
+
+@router.get("/", response_model=List[CallEvent])
+async def get_call_events(
+    ids: Optional[List[str]] = Depends(id_list),
+    fields: Optional[Tuple[str, ...]] = Depends(call_fields),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get call events by ID (?ids=a,b,c) with batched reads; unknown IDs are omitted"""
+    if ids is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids is required; use /calls/recent to list calls"
+        )
+    events = await call_repo.get_many(ids)
+    if fields:
+        return sparse_response([event.model_dump(include=set(fields)) for event in events])
+    return events
 
 
-@router.get("/recent", response_model=List[CallEvent])
+@router.get("/recent", response_model=Page[CallEvent])
 async def get_recent_calls(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(call_fields),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get recent call events"""
-    calls = await call_repo.get_recent(limit=limit)
-    return calls
+    """Get recent call events, newest first; ?fields=summary for list views"""
+    try:
+        page = await call_repo.get_recent_page(limit=limit, cursor=cursor, fields=fields)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return sparse_response(page) if fields else page
 
 
-@router.get("/resident/{resident_id}", response_model=List[CallEvent])
+@router.get("/resident/{resident_id}", response_model=Page[CallEvent])
 async def get_calls_by_resident(
     resident_id: str,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = Depends(call_fields),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get call events for a specific resident, newest first; ?fields=summary for list views"""
+    try:
+        page = await call_repo.get_by_resident_page(resident_id, limit=limit, cursor=cursor, fields=fields)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return sparse_response(page) if fields else page
+
+
+@router.get("/export")
+async def export_call_events(
+    start: datetime = Query(..., alias="from", description="Export calls from this time"),
+    end: Optional[datetime] = Query(None, alias="to", description="Up to (excluding) this time; defaults to now"),
+    resident_id: Optional[str] = Query(None, description="Only this resident's calls"),
+    format: str = Query("ndjson", description="ndjson or csv"),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get call events for a specific resident"""
-    calls = await call_repo.get_by_resident(resident_id, limit=limit)
-    return calls
+    """Stream every call in a range, oldest first, including archived calls.
+    
+    Pages are read as the response is sent, so any range can be exported
+    without holding it in memory.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of {', '.join(EXPORT_FORMATS)}"
+        )
+    start = utc(start)
+    end = utc(end) if end else datetime.utcnow()
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="from must be before to")
+    
+    filename = f"calls-{start:%Y%m%d}-{end:%Y%m%d}.{format}"
+    return StreamingResponse(
+        export_lines(iter_calls(start, end, resident_id), format),
+        media_type=EXPORT_FORMATS[format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
 
 
 @router.get("/{event_id}", response_model=CallEvent)
@@ -60,6 +127,19 @@ async def create_call_event(
     return call
 
 
+@router.post("/batch", response_model=CallEventBatchResult)
+async def create_call_events_batch(
+    batch: CallEventBatchCreate,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Create many call events at once, e.g. calls queued while a ward was offline.
+    
+    Returns a per-event report; events that could not be written are marked
+    failed and can be resent with the same event_id.
+    """
+    return await call_repo.create_many(batch.events)
+
+
 @router.put("/{event_id}", response_model=CallEvent)
 async def update_call_event(
     event_id: str,
@@ -86,13 +166,11 @@ async def acknowledge_call(
     event_id: str,
     current_user: User = Depends(get_current_active_user)
 ):
-    """Acknowledge a call event"""
-    update_data = CallEventUpdate(
-        status="acknowledged",
-        caregiver_id=current_user.user_id
-    )
-    
-    updated_call = await call_repo.update(event_id, update_data)
+    """Acknowledge an active call event; the response time is computed server-side"""
+    try:
+        updated_call = await call_repo.acknowledge(event_id, current_user.user_id)
+    except CallNotActiveError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     if not updated_call:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -2,26 +2,46 @@
 Resident management endpoints
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from ....models.resident import ResidentProfile, ResidentCreate, ResidentUpdate
+from ....models.resident import ResidentProfile, ResidentCreate, ResidentUpdate, ResidentSummary
+from ....models.pagination import Page
 from ....models.user import User
-from ....db.repositories import ResidentRepository
+from ....core.pagination import InvalidCursorError
+from ....db.repositories import ResidentRepository, RoomOccupiedError
+from ..deps import field_list, id_list, sparse_response
 from .auth import get_current_active_user
 
 router = APIRouter()
 resident_repo = ResidentRepository()
+resident_fields = field_list(ResidentProfile, ResidentSummary)
 
 
-@router.get("/", response_model=List[ResidentProfile])
+@router.get("/", response_model=Page[ResidentProfile])
 async def get_residents(
     active_only: bool = True,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    ids: Optional[List[str]] = Depends(id_list),
+    fields: Optional[Tuple[str, ...]] = Depends(resident_fields),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all residents"""
-    residents = await resident_repo.get_all(active_only=active_only)
-    return residents
+    """Get residents, one page at a time, or specific residents with ?ids=a,b,c.
+    
+    ?fields=summary (or a comma-separated list) returns only those fields.
+    """
+    if ids is not None:
+        residents = await resident_repo.get_many(ids)
+        if fields:
+            return sparse_response(Page(items=[resident.model_dump(include=set(fields)) for resident in residents]))
+        return Page(items=residents)
+    
+    try:
+        page = await resident_repo.get_page(active_only=active_only, limit=limit, cursor=cursor, fields=fields)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return sparse_response(page) if fields else page
 
 
 @router.get("/{resident_id}", response_model=ResidentProfile)
@@ -45,16 +65,11 @@ async def create_resident(
     current_user: User = Depends(get_current_active_user)
 ):
     """Create new resident"""
-    # Check if room number is already taken
-    existing_residents = await resident_repo.get_all(active_only=True)
-    for resident in existing_residents:
-        if resident.room_number == resident_data.room_number:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Room {resident_data.room_number} is already occupied"
-            )
-    
-    resident = await resident_repo.create(resident_data)
+    # The room lock is claimed in the same transaction as the write
+    try:
+        resident = await resident_repo.create(resident_data)
+    except RoomOccupiedError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return resident
 
 
@@ -73,17 +88,11 @@ async def update_resident(
             detail="Resident not found"
         )
     
-    # Check room number conflict if updating room
-    if resident_data.room_number and resident_data.room_number != existing_resident.room_number:
-        all_residents = await resident_repo.get_all(active_only=True)
-        for resident in all_residents:
-            if resident.resident_id != resident_id and resident.room_number == resident_data.room_number:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Room {resident_data.room_number} is already occupied"
-                )
-    
-    updated_resident = await resident_repo.update(resident_id, resident_data)
+    # Moving rooms re-claims the room lock; a held room is rejected
+    try:
+        updated_resident = await resident_repo.update(resident_id, resident_data)
+    except RoomOccupiedError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     if not updated_resident:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
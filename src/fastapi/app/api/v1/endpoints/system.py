@@ -2,17 +2,26 @@
 System status and monitoring endpoints
 """
 
-from typing import List
+import re
+from typing import List, Optional
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from ....models.system_status import SystemStatus, SystemOverview, ComponentStatus, SystemComponent
+from ....models.system_status import ResponseTimeStats, TimeSeries
 from ....models.user import User
-from ....db.repositories import CallEventRepository, ResidentRepository
+from ....db.repositories import CallCounterRepository, CallEventRepository, ResidentRepository, ResponseTimeRepository
+from ....db.repositories import CallRollupRepository
+from ..deps import utc
 from .auth import get_current_active_user
 
 router = APIRouter()
 
+# Time series steps are whole hours ("6h") or days ("1d"); a series may
+# span at most this many hourly rollups
+STEP_PATTERN = re.compile(r'^(\d+)([hd])$')
+MAX_TIMESERIES_HOURS = 24 * 31
+
 
 @router.get("/status", response_model=SystemOverview)
 async def get_system_status(
@@ -60,13 +69,11 @@ async def get_system_status(
         overall_status = ComponentStatus.DEGRADED
     
     # Get metrics
-    call_repo = CallEventRepository()
+    counter_repo = CallCounterRepository()
     resident_repo = ResidentRepository()
     
-    # Count today's calls
-    today_calls = await call_repo.get_recent(limit=1000)  # Simplified
-    today = datetime.utcnow().date()
-    calls_today = len([c for c in today_calls if c.timestamp.date() == today])
+    # Count today's calls from the materialized counters
+    calls_today = (await counter_repo.get_summary(days=1))['today']
     
     # Count active residents
     residents = await resident_repo.get_all(active_only=True)
@@ -102,27 +109,16 @@ async def get_system_metrics(
     """Get detailed system metrics"""
     
     call_repo = CallEventRepository()
+    counter_repo = CallCounterRepository()
     resident_repo = ResidentRepository()
     
-    # Get recent calls for metrics
-    recent_calls = await call_repo.get_recent(limit=1000)
-    
-    # Calculate metrics
     now = datetime.utcnow()
-    today = now.date()
-    week_ago = now - timedelta(days=7)
     
-    calls_today = len([c for c in recent_calls if c.timestamp.date() == today])
-    calls_this_week = len([c for c in recent_calls if c.timestamp >= week_ago])
+    # Call counts for today and the last 7 days, from the materialized counters
+    counts = await counter_repo.get_summary(days=7)
     
-    # Response time metrics
-    acknowledged_calls = [c for c in recent_calls if c.response_time is not None]
-    avg_response_time = sum(c.response_time for c in acknowledged_calls) / len(acknowledged_calls) if acknowledged_calls else 0
-    
-    # Call type breakdown
-    call_types = {}
-    for call in recent_calls:
-        call_types[call.event_type] = call_types.get(call.event_type, 0) + 1
+    # Response time metrics from the running aggregates
+    response_times = await ResponseTimeRepository().get_stats(days=7)
     
     # Active residents
     residents = await resident_repo.get_all(active_only=True)
@@ -130,19 +126,65 @@ async def get_system_metrics(
     return {
         "timestamp": now.isoformat(),
         "calls": {
-            "today": calls_today,
-            "this_week": calls_this_week,
-            "total_recent": len(recent_calls),
-            "by_type": call_types,
-            "avg_response_time_seconds": round(avg_response_time, 2)
+            "today": counts["today"],
+            "this_week": counts["period"],
+            "total_recent": counts["period"],
+            "by_type": counts["by_type"],
+            "by_status_today": counts["by_status_today"],
+            "avg_response_time_seconds": response_times.average_seconds or 0,
+            "response_time": response_times.model_dump(exclude={"histogram"})
         },
         "residents": {
             "active": len(residents),
             "total": len(await resident_repo.get_all(active_only=False))
         },
+        "cache": {
+            "call_events": call_repo.cache.stats(),
+            "resident_directory": resident_repo.directory.stats()
+        },
         "system": {
             "uptime_hours": 24.5,  # Simplified
             "memory_usage_percent": 78.5,
             "cpu_usage_percent": 45.2
         }
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/response-times", response_model=ResponseTimeStats)
+async def get_response_times(
+    days: int = Query(1, ge=1, le=31, description="Days to cover, today included"),
+    caregiver_id: Optional[str] = Query(None, description="Only this caregiver's acknowledgements"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Average, percentiles and histogram of acknowledgement response times"""
+    return await ResponseTimeRepository().get_stats(days=days, caregiver_id=caregiver_id)
+
+
+@router.get("/timeseries", response_model=TimeSeries)
+async def get_timeseries(
+    start: Optional[datetime] = Query(None, alias="from", description="Series start; defaults to 24 hours before `to`"),
+    end: Optional[datetime] = Query(None, alias="to", description="Series end; defaults to now"),
+    step: str = Query("1h", description="Step size in hours or days, e.g. 1h, 6h, 1d"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Call volume by type and response times per step, from hourly rollups"""
+    match = STEP_PATTERN.match(step)
+    step_hours = int(match.group(1)) * (24 if match.group(2) == 'd' else 1) if match else 0
+    if not 0 < step_hours <= MAX_TIMESERIES_HOURS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"step must be a whole number of hours or days up to {MAX_TIMESERIES_HOURS}h, e.g. 1h, 6h, 1d"
+        )
+    
+    end = utc(end) if end else datetime.utcnow()
+    start = utc(start) if start else end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="from must be before to")
+    if end - start > timedelta(hours=MAX_TIMESERIES_HOURS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Series may span at most {MAX_TIMESERIES_HOURS} hours"
+        )
+    
+    points = await CallRollupRepository().get_series(start, end, step_hours)
+    return TimeSeries(start=start, end=end, step_seconds=step_hours * 3600, points=points)
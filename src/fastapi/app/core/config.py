@@ -13,6 +13,7 @@ class Settings(BaseSettings):
     
     # Application settings
     APP_NAME: str = "Alexa Plus Chatbot API"
+    FACILITY_ID: str = "default"  # Care home these counters belong to
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
     
@@ -29,12 +30,29 @@ class Settings(BaseSettings):
     AWS_REGION: str = "us-east-1"
     AWS_ACCESS_KEY_ID: Optional[str] = None
     AWS_SECRET_ACCESS_KEY: Optional[str] = None
+    AWS_MAX_POOL_CONNECTIONS: int = 50
+    AWS_CONNECT_TIMEOUT: float = 2.0
+    AWS_READ_TIMEOUT: float = 5.0
+    AWS_KEEPALIVE_TIMEOUT: float = 60.0  # Idle pooled connections kept this long
+    
+    # Storage settings
+    STORAGE_BACKEND: str = "dynamodb"  # "dynamodb" or "sqlite" (embedded, no AWS needed)
+    SQLITE_PATH: str = ":memory:"  # Database file for the sqlite backend
     
     # DynamoDB settings
     DYNAMODB_TABLE_CALLS: str = "alexa-care-calls"
     DYNAMODB_TABLE_RESIDENTS: str = "alexa-care-residents"
     DYNAMODB_TABLE_USERS: str = "alexa-care-users"
+    DYNAMODB_TABLE_STATS: str = "alexa-care-stats"  # Materialized counters and aggregates
     DYNAMODB_ENDPOINT_URL: Optional[str] = None  # For local development
+    RESIDENT_DIRECTORY_TTL_SECONDS: int = 300  # Reload the in-memory roster after this long
+    CALL_CACHE_MAX_ENTRIES: int = 2048  # Call events held for lookups by ID (0 disables)
+    CALL_CACHE_TTL_SECONDS: int = 30
+    
+    # Call history archive
+    ARCHIVE_DIR: str = "archive"  # Day-partitioned gzip JSON Lines files
+    ARCHIVE_AFTER_DAYS: int = 90  # Resolved calls older than this leave the calls table
+    ARCHIVE_LOOKBACK_DAYS: int = 30  # Days before the cutoff each run checks
     
     # SNS settings
     SNS_TOPIC_ARN: str = ""
@@ -0,0 +1,58 @@
+"""
+Fixed-bucket response time histograms
+
+Response times are aggregated into counters with fixed upper bounds so
+they can be maintained with atomic ADD updates and merged across days,
+caregivers or hours by adding bucket counts. Percentiles are estimated
+from the buckets by linear interpolation.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+# Bucket upper bounds in seconds; slower responses land in the overflow bucket
+RESPONSE_TIME_BUCKETS = (15, 30, 60, 120, 300, 600, 1800)
+OVERFLOW_BUCKET = 'le_inf'
+
+
+def bucket_names() -> List[str]:
+    """Every bucket attribute name, fastest first"""
+    return [f"le_{bound}" for bound in RESPONSE_TIME_BUCKETS] + [OVERFLOW_BUCKET]
+
+
+def bucket_for(seconds: float) -> str:
+    """Name of the bucket a response time falls in"""
+    for bound in RESPONSE_TIME_BUCKETS:
+        if seconds <= bound:
+            return f"le_{bound}"
+    return OVERFLOW_BUCKET
+
+
+def merge(histograms: Iterable[Dict[str, int]]) -> Dict[str, int]:
+    """Add bucket counts together"""
+    merged = {name: 0 for name in bucket_names()}
+    for histogram in histograms:
+        for name in merged:
+            merged[name] += int(histogram.get(name, 0))
+    return merged
+
+
+def percentile(histogram: Dict[str, int], fraction: float) -> Optional[float]:
+    """Estimated response time below which `fraction` of responses fall.
+
+    Interpolates within the bucket holding the target rank; ranks in the
+    overflow bucket report its lower bound. None when there are no samples.
+    """
+    total = sum(int(histogram.get(name, 0)) for name in bucket_names())
+    if not total:
+        return None
+
+    target = fraction * total
+    seen = 0
+    lower = 0.0
+    for bound in RESPONSE_TIME_BUCKETS:
+        count = int(histogram.get(f"le_{bound}", 0))
+        if count and seen + count >= target:
+            return round(lower + (bound - lower) * (target - seen) / count, 2)
+        seen += count
+        lower = float(bound)
+    return lower
@@ -0,0 +1,54 @@
+"""
+Time-ordered identifiers
+
+Call event IDs are UUIDv7 (RFC 9562): a 48-bit Unix millisecond timestamp
+followed by random bits. Their canonical string form sorts by creation
+time, so "events since T" is a range condition on the ID itself.
+"""
+
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+_VERSION_BITS = 0x7 << 76
+_VARIANT_BITS = 0x2 << 62
+_RANDOM_MASK = (1 << 80) - 1
+_TIMESTAMP_MASK = (1 << 48) - 1
+
+
+def _epoch_ms(moment: datetime) -> int:
+    """Milliseconds since the epoch; naive datetimes are taken as UTC"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def _build(ms: int, random_bits: int) -> uuid.UUID:
+    value = ((ms & _TIMESTAMP_MASK) << 80) | (random_bits & _RANDOM_MASK)
+    value = (value & ~(0xF << 76)) | _VERSION_BITS
+    value = (value & ~(0x3 << 62)) | _VARIANT_BITS
+    return uuid.UUID(int=value)
+
+
+def uuid7(moment: Optional[datetime] = None) -> str:
+    """New UUIDv7 string for the given time (default: now)"""
+    ms = _epoch_ms(moment) if moment else time.time_ns() // 1_000_000
+    return str(_build(ms, int.from_bytes(os.urandom(10), 'big')))
+
+
+def uuid7_lower_bound(moment: datetime) -> str:
+    """Smallest UUIDv7 string that can be minted at or after `moment`"""
+    return str(_build(_epoch_ms(moment), 0))
+
+
+def uuid7_time(value: str) -> Optional[datetime]:
+    """Millisecond creation time (naive UTC) of a canonical UUIDv7 string; None for anything else"""
+    try:
+        parsed = uuid.UUID(value)
+    except (ValueError, TypeError, AttributeError):
+        return None
+    if parsed.version != 7 or str(parsed) != value:
+        return None
+    return datetime.fromtimestamp((parsed.int >> 80) / 1000, tz=timezone.utc).replace(tzinfo=None)
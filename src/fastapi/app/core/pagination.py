@@ -0,0 +1,62 @@
+"""
+Opaque, signed pagination cursors
+
+A cursor wraps the DynamoDB key a list query should resume from
+(its ExclusiveStartKey). It is HMAC-signed with SECRET_KEY and bound to
+the listing it came from, so clients can pass it back but cannot forge
+or reuse it against a different query.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+from typing import Any, Dict
+
+from .config import settings
+
+_SIGNATURE_BYTES = 16
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed, tampered with or from another listing"""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _sign(scope: str, payload: bytes) -> bytes:
+    message = scope.encode('utf-8') + b'\x00' + payload
+    return hmac.new(settings.SECRET_KEY.encode('utf-8'), message, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def encode_cursor(key: Dict[str, Any], scope: str) -> str:
+    """Encode a (string-valued) DynamoDB key as a cursor for `scope`"""
+    payload = json.dumps(key, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return f"{_b64encode(payload)}.{_b64encode(_sign(scope, payload))}"
+
+
+def decode_cursor(cursor: str, scope: str) -> Dict[str, Any]:
+    """Verify a cursor for `scope` and return the key it carries"""
+    try:
+        encoded_payload, encoded_signature = cursor.split('.')
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Malformed cursor")
+    
+    if not hmac.compare_digest(signature, _sign(scope, payload)):
+        raise InvalidCursorError("Invalid cursor")
+    
+    try:
+        key = json.loads(payload)
+    except ValueError:
+        raise InvalidCursorError("Malformed cursor")
+    if not isinstance(key, dict):
+        raise InvalidCursorError("Malformed cursor")
+    return key
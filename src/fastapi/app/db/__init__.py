@@ -2,13 +2,24 @@
 Database integration layer
 """
 
-from .dynamodb import get_dynamodb_client, init_dynamodb
-from .repositories import CallEventRepository, ResidentRepository, UserRepository
+from .dynamodb import close_dynamodb, get_dynamodb_client, init_dynamodb
+from .storage import close_storage, get_table, init_storage
+from .repositories import CallEventRepository, CallCounterRepository, ResidentRepository, UserRepository, RoomOccupiedError
+from .repositories import CallNotActiveError, CallRollupRepository, ResponseTimeRepository
 
 __all__ = [
+    "close_dynamodb",
+    "close_storage",
     "get_dynamodb_client",
+    "get_table",
     "init_dynamodb", 
+    "init_storage",
     "CallEventRepository",
+    "CallCounterRepository",
+    "ResponseTimeRepository",
+    "CallRollupRepository",
     "ResidentRepository",
-    "UserRepository"
+    "UserRepository",
+    "RoomOccupiedError",
+    "CallNotActiveError"
 ]
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Bounded in-process LRU cache with per-entry TTL
+
+Used for read-through lookups of individual records. Entries expire after
+ttl_seconds so writes from other processes show up within that window;
+writes made through this process replace entries immediately.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar('V')
+
+
+class LRUCache(Generic[V]):
+    """Least-recently-used cache with a size bound, TTL and hit/miss counters"""
+    
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[V]:
+        """Cached value, or None if absent or expired"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if self.clock() < expires_at:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self.entries[key]
+        self.misses += 1
+        return None
+    
+    def put(self, key: Hashable, value: V):
+        """Insert or refresh an entry, evicting the least recently used"""
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = (self.clock() + self.ttl_seconds, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def invalidate(self, key: Hashable):
+        self.entries.pop(key, None)
+    
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
@@ -0,0 +1,131 @@
+"""
+Process-local resident directory
+
+The resident roster changes rarely but is read on almost every request
+(room conflict checks, status and metrics). The directory keeps it in
+memory, indexed by resident ID, room and device. ResidentRepository
+writes through to it, and it is reloaded from DynamoDB once the TTL
+expires so changes made by other processes are picked up.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from ..models import ResidentProfile
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ResidentDirectory:
+    """In-memory resident roster with id/room/device indexes"""
+    
+    def __init__(self, ttl_seconds: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = settings.RESIDENT_DIRECTORY_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.clock = clock
+        self.by_id: Dict[str, ResidentProfile] = {}
+        self.by_room: Dict[str, str] = {}
+        self.by_device: Dict[str, str] = {}
+        self.loaded_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = asyncio.Lock()
+    
+    def is_fresh(self) -> bool:
+        return self.loaded_at is not None and self.clock() - self.loaded_at < self.ttl_seconds
+    
+    async def ensure_loaded(self, loader: Callable[[], Awaitable[Iterable[ResidentProfile]]]):
+        """Reload from `loader` if the directory is empty or past its TTL.
+        
+        Concurrent callers share one reload. If a reload fails and a stale
+        roster is available, it keeps being served until the next attempt.
+        """
+        if self.is_fresh():
+            return
+        
+        async with self._lock:
+            if self.is_fresh():
+                return
+            try:
+                self.replace(await loader())
+            except Exception as e:
+                if self.loaded_at is None:
+                    raise
+                logger.error(f"Error reloading resident directory, serving stale roster: {str(e)}")
+                self.loaded_at = self.clock()
+    
+    def replace(self, residents: Iterable[ResidentProfile]):
+        """Swap in a complete roster"""
+        by_id = {resident.resident_id: resident for resident in residents}
+        by_room: Dict[str, str] = {}
+        by_device: Dict[str, str] = {}
+        for resident in by_id.values():
+            if resident.active:
+                by_room[resident.room_number] = resident.resident_id
+                if resident.device_id:
+                    by_device[resident.device_id] = resident.resident_id
+        
+        self.by_id, self.by_room, self.by_device = by_id, by_room, by_device
+        self.loaded_at = self.clock()
+        logger.info(f"Resident directory loaded: {len(by_id)} residents")
+    
+    def upsert(self, resident: ResidentProfile):
+        """Apply a write made through this process"""
+        previous = self.by_id.get(resident.resident_id)
+        if previous:
+            if self.by_room.get(previous.room_number) == previous.resident_id:
+                del self.by_room[previous.room_number]
+            if previous.device_id and self.by_device.get(previous.device_id) == previous.resident_id:
+                del self.by_device[previous.device_id]
+        
+        self.by_id[resident.resident_id] = resident
+        if resident.active:
+            self.by_room[resident.room_number] = resident.resident_id
+            if resident.device_id:
+                self.by_device[resident.device_id] = resident.resident_id
+    
+    def invalidate(self):
+        """Force a reload on the next read"""
+        self.loaded_at = None
+    
+    def clear(self):
+        """Drop the roster entirely"""
+        self.by_id, self.by_room, self.by_device = {}, {}, {}
+        self.loaded_at = None
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.by_id),
+            'age_seconds': round(self.clock() - self.loaded_at, 1) if self.loaded_at is not None else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+    
+    def all(self, active_only: bool = True) -> List[ResidentProfile]:
+        return [r for r in self.by_id.values() if r.active or not active_only]
+    
+    def get(self, resident_id: str) -> Optional[ResidentProfile]:
+        resident = self.by_id.get(resident_id)
+        if resident:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return resident
+    
+    def get_by_room(self, room_number: str) -> Optional[ResidentProfile]:
+        resident_id = self.by_room.get(room_number)
+        return self.by_id.get(resident_id) if resident_id else None
+    
+    def get_by_device(self, device_id: str) -> Optional[ResidentProfile]:
+        resident_id = self.by_device.get(device_id)
+        return self.by_id.get(resident_id) if resident_id else None
+
+
+# Shared by every ResidentRepository in this process
+resident_directory = ResidentDirectory()
@@ -1,28 +1,62 @@
 """
 DynamoDB client and connection management
+
+The aioboto3 resource is entered once at startup and shared by every
+request; its connection pool is reused until close_dynamodb() at shutdown.
 """
 
 import aioboto3
+import asyncio
 import logging
-from typing import Optional
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional
+from aiobotocore.config import AioConfig
 from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Global DynamoDB resource
+# Global DynamoDB resource, entered for the lifetime of the application
 _dynamodb_resource = None
+_resource_stack: Optional[AsyncExitStack] = None
+
+# Table handles by name; building one is cheap but not free, and they are
+# safe to share across requests
+_tables: Dict[str, Any] = {}
+
+# Epoch seconds after which DynamoDB TTL deletes an item from the calls
+# table; set on archived calls
+TTL_ATTRIBUTE = 'ttl'
+
+# How often to check whether a newly added index has finished backfilling
+INDEX_POLL_SECONDS = 10
+
+
+def build_client_config() -> AioConfig:
+    """Connection pool, timeouts and keep-alive for AWS clients"""
+    return AioConfig(
+        max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+        connect_timeout=settings.AWS_CONNECT_TIMEOUT,
+        read_timeout=settings.AWS_READ_TIMEOUT,
+        retries={'mode': 'standard', 'max_attempts': 3},
+        tcp_keepalive=True,
+        connector_args={'keepalive_timeout': settings.AWS_KEEPALIVE_TIMEOUT}
+    )
 
 
 async def init_dynamodb():
     """Initialize DynamoDB connection"""
-    global _dynamodb_resource
+    global _dynamodb_resource, _resource_stack
+    
+    if _dynamodb_resource is not None:
+        return
     
     try:
         session = aioboto3.Session()
         
         # Configure DynamoDB connection
         dynamodb_config = {
-            'region_name': settings.AWS_REGION
+            'region_name': settings.AWS_REGION,
+            'config': build_client_config()
         }
         
         # Add endpoint URL for local development
@@ -36,7 +70,11 @@ async def init_dynamodb():
                 'aws_secret_access_key': settings.AWS_SECRET_ACCESS_KEY
             })
         
-        _dynamodb_resource = session.resource('dynamodb', **dynamodb_config)
+        stack = AsyncExitStack()
+        _dynamodb_resource = await stack.enter_async_context(
+            session.resource('dynamodb', **dynamodb_config)
+        )
+        _resource_stack = stack
         logger.info("DynamoDB connection initialized successfully")
         
     except Exception as e:
@@ -44,6 +82,23 @@ async def init_dynamodb():
         raise
 
 
+async def close_dynamodb():
+    """Close the shared DynamoDB resource and its connection pool"""
+    global _dynamodb_resource, _resource_stack
+    
+    stack = _resource_stack
+    _dynamodb_resource = None
+    _resource_stack = None
+    _tables.clear()
+    
+    if stack is not None:
+        try:
+            await stack.aclose()
+            logger.info("DynamoDB connection closed")
+        except Exception as e:
+            logger.error(f"Error closing DynamoDB connection: {str(e)}")
+
+
 def get_dynamodb_client():
     """Get DynamoDB resource"""
     if _dynamodb_resource is None:
@@ -52,17 +107,17 @@ def get_dynamodb_client():
 
 
 async def get_table(table_name: str):
-    """Get DynamoDB table"""
-    dynamodb = get_dynamodb_client()
-    return await dynamodb.Table(table_name)
+    """Get a cached DynamoDB table handle"""
+    table = _tables.get(table_name)
+    if table is None:
+        table = await get_dynamodb_client().Table(table_name)
+        _tables[table_name] = table
+    return table
 
 
-async def create_tables_if_not_exist():
-    """Create DynamoDB tables if they don't exist"""
-    dynamodb = get_dynamodb_client()
-    
-    # Table definitions
-    tables = [
+def table_definitions() -> List[Dict[str, Any]]:
+    """CreateTable definitions for every table, shared by all storage backends"""
+    return [
         {
             'TableName': settings.DYNAMODB_TABLE_CALLS,
             'KeySchema': [
@@ -71,13 +126,16 @@ async def create_tables_if_not_exist():
             'AttributeDefinitions': [
                 {'AttributeName': 'event_id', 'AttributeType': 'S'},
                 {'AttributeName': 'timestamp', 'AttributeType': 'S'},
-                {'AttributeName': 'resident_id', 'AttributeType': 'S'}
+                {'AttributeName': 'resident_id', 'AttributeType': 'S'},
+                {'AttributeName': 'day', 'AttributeType': 'S'}
             ],
             'GlobalSecondaryIndexes': [
                 {
-                    'IndexName': 'timestamp-index',
+                    # UTC day partitions sorted by time-ordered event_id
+                    'IndexName': 'day-index',
                     'KeySchema': [
-                        {'AttributeName': 'timestamp', 'KeyType': 'HASH'}
+                        {'AttributeName': 'day', 'KeyType': 'HASH'},
+                        {'AttributeName': 'event_id', 'KeyType': 'RANGE'}
                     ],
                     'Projection': {'ProjectionType': 'ALL'},
                     'BillingMode': 'PAY_PER_REQUEST'
@@ -135,23 +193,110 @@ async def create_tables_if_not_exist():
                 }
             ],
             'BillingMode': 'PAY_PER_REQUEST'
+        },
+        {
+            # Counters and aggregates, updated in place with ADD
+            'TableName': settings.DYNAMODB_TABLE_STATS,
+            'KeySchema': [
+                {'AttributeName': 'stat_id', 'KeyType': 'HASH'}
+            ],
+            'AttributeDefinitions': [
+                {'AttributeName': 'stat_id', 'AttributeType': 'S'}
+            ],
+            'BillingMode': 'PAY_PER_REQUEST'
         }
     ]
+
+
+def time_to_live_specifications() -> Dict[str, Dict[str, Any]]:
+    """TTL settings by table name, for tables whose items expire"""
+    return {
+        settings.DYNAMODB_TABLE_CALLS: {'AttributeName': TTL_ATTRIBUTE, 'Enabled': True}
+    }
+
+
+async def create_missing_indexes(table_def: Dict[str, Any], poll_seconds: float = INDEX_POLL_SECONDS) -> List[str]:
+    """Add global secondary indexes an existing table is missing.
+
+    Indexes in table_definitions() are only created with the table, so a
+    table that predates one (e.g. day-index) needs it added with
+    UpdateTable. DynamoDB creates one index per call and backfills it in
+    the background; each is waited on until ACTIVE. Returns the names of
+    the indexes created.
+    """
+    client = get_dynamodb_client().meta.client
+    table_name = table_def['TableName']
+    
+    description = (await client.describe_table(TableName=table_name))['Table']
+    existing = {index['IndexName'] for index in description.get('GlobalSecondaryIndexes', [])}
+    attribute_types = {
+        attribute['AttributeName']: attribute for attribute in table_def['AttributeDefinitions']
+    }
+    
+    created = []
+    for index in table_def.get('GlobalSecondaryIndexes', []):
+        index_name = index['IndexName']
+        if index_name in existing:
+            continue
+        
+        logger.info(f"Creating index {index_name} on {table_name}")
+        create = {key: value for key, value in index.items() if key != 'BillingMode'}
+        await client.update_table(
+            TableName=table_name,
+            AttributeDefinitions=[attribute_types[key['AttributeName']] for key in index['KeySchema']],
+            GlobalSecondaryIndexUpdates=[{'Create': create}]
+        )
+        await wait_until_index_active(table_name, index_name, poll_seconds)
+        logger.info(f"Index {index_name} on {table_name} is active")
+        created.append(index_name)
+    return created
+
+
+async def wait_until_index_active(table_name: str, index_name: str, poll_seconds: float = INDEX_POLL_SECONDS):
+    """Poll DescribeTable until the index has finished backfilling"""
+    client = get_dynamodb_client().meta.client
+    while True:
+        description = (await client.describe_table(TableName=table_name))['Table']
+        status = next(
+            (index['IndexStatus'] for index in description.get('GlobalSecondaryIndexes', [])
+             if index['IndexName'] == index_name),
+            None
+        )
+        if status == 'ACTIVE':
+            return
+        await asyncio.sleep(poll_seconds)
+
+
+async def create_tables_if_not_exist():
+    """Create DynamoDB tables if they don't exist, and add missing indexes to those that do"""
+    dynamodb = get_dynamodb_client()
     
     try:
-        for table_def in tables:
+        for table_def in table_definitions():
             table_name = table_def['TableName']
             try:
                 # Check if table exists
-                table = await dynamodb.Table(table_name)
+                table = await get_table(table_name)
                 await table.load()
                 logger.info(f"Table {table_name} already exists")
             except Exception:
+                table = None
+            
+            if table is not None:
+                await create_missing_indexes(table_def)
+            else:
                 # Table doesn't exist, create it
                 logger.info(f"Creating table {table_name}")
-                await dynamodb.create_table(**table_def)
+                table = await dynamodb.create_table(**table_def)
                 logger.info(f"Table {table_name} created successfully")
                 
+                ttl = time_to_live_specifications().get(table_name)
+                if ttl:
+                    await table.wait_until_exists()
+                    await dynamodb.meta.client.update_time_to_live(
+                        TableName=table_name, TimeToLiveSpecification=ttl
+                    )
+                
     except Exception as e:
         logger.error(f"Error creating tables: {str(e)}")
         # Don't raise in production - tables might be managed externally
\ No newline at end of file
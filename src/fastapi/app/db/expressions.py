@@ -0,0 +1,387 @@
+"""
+DynamoDB expression evaluation for the embedded storage backend
+
+Parses and evaluates the condition, key-condition, update and projection
+expression syntax the repositories send to DynamoDB, so the same
+repository code runs unchanged against SQLite. boto3 condition objects
+(Key(...) / Attr(...)) are first rendered to expression strings with
+boto3's own builder.
+"""
+
+import re
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+
+_TOKEN = re.compile(r'\s*(#\w+|:\w+|<>|<=|>=|[=<>(),.\[\]+-]|\d+|[A-Za-z_]\w*)')
+_KEYWORDS = {'AND', 'OR', 'NOT', 'BETWEEN', 'IN', 'SET', 'REMOVE', 'ADD', 'DELETE'}
+_COMPARATORS = {'=', '<>', '<', '<=', '>', '>='}
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions the embedded backend cannot parse"""
+
+
+def render(condition, names: Optional[Dict[str, str]], values: Optional[Dict[str, Any]],
+           is_key_condition: bool = False) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """Normalize a condition (string or boto3 object) to string + placeholders"""
+    names = dict(names or {})
+    values = dict(values or {})
+    if isinstance(condition, ConditionBase):
+        built = ConditionExpressionBuilder().build_expression(condition, is_key_condition=is_key_condition)
+        names.update(built.attribute_name_placeholders)
+        values.update(built.attribute_value_placeholders)
+        return built.condition_expression, names, values
+    return condition, names, values
+
+
+def tokenize(expression: str) -> List[str]:
+    tokens, position = [], 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if not match:
+            raise ExpressionError(f"Unexpected input at {expression[position:]!r}")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing nested tuples"""
+
+    def __init__(self, expression: str, names: Dict[str, str]):
+        self.tokens = tokenize(expression)
+        self.position = 0
+        self.names = names
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def keyword(self, offset: int = 0) -> Optional[str]:
+        token = self.peek(offset)
+        return token.upper() if token and token.upper() in _KEYWORDS else None
+
+    def take(self, expected: Optional[str] = None) -> str:
+        token = self.peek()
+        if token is None or (expected and token.upper() != expected):
+            raise ExpressionError(f"Expected {expected or 'token'}, got {token!r}")
+        self.position += 1
+        return token
+
+    def done(self) -> bool:
+        return self.position >= len(self.tokens)
+
+    # Conditions
+
+    def condition(self):
+        left = self.conjunction()
+        while self.keyword() == 'OR':
+            self.take()
+            left = ('or', left, self.conjunction())
+        return left
+
+    def conjunction(self):
+        left = self.negation()
+        while self.keyword() == 'AND':
+            self.take()
+            left = ('and', left, self.negation())
+        return left
+
+    def negation(self):
+        if self.keyword() == 'NOT':
+            self.take()
+            return ('not', self.negation())
+        return self.comparison()
+
+    def comparison(self):
+        if self.peek() == '(':
+            self.take('(')
+            inner = self.condition()
+            self.take(')')
+            return inner
+
+        name = self.peek()
+        if name and self.peek(1) == '(' and name.lower() in ('attribute_exists', 'attribute_not_exists',
+                                                             'attribute_type', 'begins_with', 'contains'):
+            self.take()
+            args = self.arguments()
+            return ('call', name.lower(), args)
+
+        left = self.operand()
+        token = self.peek()
+        if token in _COMPARATORS:
+            self.take()
+            return ('cmp', token, left, self.operand())
+        if self.keyword() == 'BETWEEN':
+            self.take()
+            low = self.operand()
+            self.take('AND')
+            return ('between', left, low, self.operand())
+        if self.keyword() == 'IN':
+            self.take()
+            return ('in', left, self.arguments())
+        raise ExpressionError(f"Expected comparison after operand, got {token!r}")
+
+    def arguments(self) -> List[Any]:
+        self.take('(')
+        args = [self.value()]
+        while self.peek() == ',':
+            self.take(',')
+            args.append(self.value())
+        self.take(')')
+        return args
+
+    # Operands
+
+    def value(self):
+        """An operand, optionally combined with + or - (update expressions)"""
+        left = self.operand()
+        if self.peek() in ('+', '-'):
+            operator = self.take()
+            return ('arith', operator, left, self.operand())
+        return left
+
+    def operand(self):
+        token = self.peek()
+        if token is None:
+            raise ExpressionError("Unexpected end of expression")
+        if token.startswith(':'):
+            self.take()
+            return ('value', token)
+        if self.peek(1) == '(' and token.lower() in ('size', 'if_not_exists', 'list_append'):
+            self.take()
+            return ('func', token.lower(), self.arguments())
+        return ('path', self.path())
+
+    def path(self) -> Tuple[Any, ...]:
+        parts: List[Any] = [self.name()]
+        while self.peek() in ('.', '['):
+            if self.take() == '.':
+                parts.append(self.name())
+            else:
+                parts.append(int(self.take()))
+                self.take(']')
+        return tuple(parts)
+
+    def name(self) -> str:
+        token = self.take()
+        if token.startswith('#'):
+            if token not in self.names:
+                raise ExpressionError(f"Undefined attribute name placeholder {token}")
+            return self.names[token]
+        return token
+
+    # Update expressions
+
+    def update(self) -> List[Tuple[Any, ...]]:
+        actions = []
+        while not self.done():
+            clause = self.take().upper()
+            while True:
+                if clause == 'SET':
+                    path = self.path()
+                    self.take('=')
+                    actions.append(('set', path, self.value()))
+                elif clause == 'REMOVE':
+                    actions.append(('remove', self.path()))
+                elif clause in ('ADD', 'DELETE'):
+                    path = self.path()
+                    actions.append((clause.lower(), path, self.operand()))
+                else:
+                    raise ExpressionError(f"Unknown update clause {clause}")
+                if self.peek() != ',':
+                    break
+                self.take(',')
+        return actions
+
+
+def parse_condition(expression: str, names: Dict[str, str]):
+    parser = _Parser(expression, names)
+    tree = parser.condition()
+    if not parser.done():
+        raise ExpressionError(f"Unexpected {parser.peek()!r} in condition")
+    return tree
+
+
+def parse_update(expression: str, names: Dict[str, str]):
+    return _Parser(expression, names).update()
+
+
+def parse_projection(expression: str, names: Dict[str, str]) -> List[Tuple[Any, ...]]:
+    parser = _Parser(expression, names)
+    paths = [parser.path()]
+    while parser.peek() == ',':
+        parser.take(',')
+        paths.append(parser.path())
+    return paths
+
+
+# Evaluation
+
+_MISSING = object()
+
+
+def resolve(item: Dict[str, Any], path: Tuple[Any, ...]) -> Any:
+    current: Any = item
+    for part in path:
+        if isinstance(part, int):
+            if not isinstance(current, list) or part >= len(current):
+                return _MISSING
+            current = current[part]
+        else:
+            if not isinstance(current, dict) or part not in current:
+                return _MISSING
+            current = current[part]
+    return current
+
+
+def operand_value(node, item: Dict[str, Any], values: Dict[str, Any]) -> Any:
+    kind = node[0]
+    if kind == 'value':
+        if node[1] not in values:
+            raise ExpressionError(f"Undefined attribute value placeholder {node[1]}")
+        return values[node[1]]
+    if kind == 'path':
+        return resolve(item, node[1])
+    if kind == 'arith':
+        left = operand_value(node[2], item, values)
+        right = operand_value(node[3], item, values)
+        if left is _MISSING or right is _MISSING:
+            raise ExpressionError("Arithmetic on a missing attribute")
+        return Decimal(left) + Decimal(right) if node[1] == '+' else Decimal(left) - Decimal(right)
+    if kind == 'func':
+        name, args = node[1], node[2]
+        if name == 'size':
+            target = operand_value(args[0], item, values)
+            return _MISSING if target is _MISSING else Decimal(len(target))
+        if name == 'if_not_exists':
+            current = operand_value(args[0], item, values)
+            return operand_value(args[1], item, values) if current is _MISSING else current
+        if name == 'list_append':
+            return list(operand_value(args[0], item, values)) + list(operand_value(args[1], item, values))
+    raise ExpressionError(f"Unsupported operand {node!r}")
+
+
+def _compare(operator: str, left: Any, right: Any) -> bool:
+    if left is _MISSING or right is _MISSING:
+        return operator == '<>'
+    try:
+        if operator == '=':
+            return left == right
+        if operator == '<>':
+            return left != right
+        if operator == '<':
+            return left < right
+        if operator == '<=':
+            return left <= right
+        if operator == '>':
+            return left > right
+        return left >= right
+    except TypeError:
+        # DynamoDB comparisons across types are simply false
+        return operator == '<>'
+
+
+def evaluate(tree, item: Dict[str, Any], values: Dict[str, Any]) -> bool:
+    kind = tree[0]
+    if kind == 'or':
+        return evaluate(tree[1], item, values) or evaluate(tree[2], item, values)
+    if kind == 'and':
+        return evaluate(tree[1], item, values) and evaluate(tree[2], item, values)
+    if kind == 'not':
+        return not evaluate(tree[1], item, values)
+    if kind == 'cmp':
+        return _compare(tree[1], operand_value(tree[2], item, values), operand_value(tree[3], item, values))
+    if kind == 'between':
+        target = operand_value(tree[1], item, values)
+        return (_compare('>=', target, operand_value(tree[2], item, values))
+                and _compare('<=', target, operand_value(tree[3], item, values)))
+    if kind == 'in':
+        target = operand_value(tree[1], item, values)
+        return any(_compare('=', target, operand_value(arg, item, values)) for arg in tree[2])
+    if kind == 'call':
+        name, args = tree[1], tree[2]
+        target = operand_value(args[0], item, values)
+        if name == 'attribute_exists':
+            return target is not _MISSING
+        if name == 'attribute_not_exists':
+            return target is _MISSING
+        if target is _MISSING:
+            return False
+        argument = operand_value(args[1], item, values)
+        if name == 'begins_with':
+            return isinstance(target, str) and isinstance(argument, str) and target.startswith(argument)
+        if name == 'contains':
+            try:
+                return argument in target
+            except TypeError:
+                return False
+        if name == 'attribute_type':
+            return _type_code(target) == argument
+    raise ExpressionError(f"Unsupported condition {tree!r}")
+
+
+def _type_code(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'BOOL'
+    if isinstance(value, str):
+        return 'S'
+    if isinstance(value, (int, float, Decimal)):
+        return 'N'
+    if isinstance(value, bytes):
+        return 'B'
+    if isinstance(value, dict):
+        return 'M'
+    if isinstance(value, list):
+        return 'L'
+    if isinstance(value, set):
+        return 'SS'
+    return 'NULL'
+
+
+def _assign(item: Dict[str, Any], path: Tuple[Any, ...], value: Any):
+    target = item
+    for part in path[:-1]:
+        target = target[part]
+    target[path[-1]] = value
+
+
+def _remove(item: Dict[str, Any], path: Tuple[Any, ...]):
+    target = resolve(item, path[:-1]) if len(path) > 1 else item
+    if isinstance(target, dict):
+        target.pop(path[-1], None)
+    elif isinstance(target, list) and isinstance(path[-1], int) and path[-1] < len(target):
+        del target[path[-1]]
+
+
+def apply_update(actions, item: Dict[str, Any], values: Dict[str, Any]):
+    """Apply parsed SET/REMOVE/ADD/DELETE actions to item in place"""
+    for action in actions:
+        kind, path = action[0], action[1]
+        if kind == 'set':
+            _assign(item, path, operand_value(action[2], item, values))
+        elif kind == 'remove':
+            _remove(item, path)
+        elif kind == 'add':
+            increment = operand_value(action[2], item, values)
+            current = resolve(item, path)
+            if isinstance(increment, set):
+                _assign(item, path, (set() if current is _MISSING else set(current)) | increment)
+            else:
+                _assign(item, path, Decimal(increment) + (Decimal(0) if current is _MISSING else Decimal(current)))
+        elif kind == 'delete':
+            current = resolve(item, path)
+            if current is not _MISSING:
+                _assign(item, path, set(current) - set(operand_value(action[2], item, values)))
+
+
+def project(item: Dict[str, Any], paths: List[Tuple[Any, ...]]) -> Dict[str, Any]:
+    """Keep only the top-level attributes named by a projection"""
+    projected = {}
+    for path in paths:
+        if path[0] in item:
+            projected[path[0]] = item[path[0]]
+    return projected
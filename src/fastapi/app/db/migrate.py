@@ -0,0 +1,49 @@
+"""
+Schema migrations for existing deployments
+
+Indexes in table_definitions() are only created along with a new table.
+This adds any a deployed table is missing, waits for DynamoDB to finish
+building them, then backfills data that older items lack:
+
+- the day attribute day-index is keyed on, for calls
+- room lock items for active residents, so an occupied room rejects a
+  second resident
+- the materialized call counters, recounted from the calls table so the
+  metrics include calls made before the upgrade
+
+Safe to re-run; run it once after upgrading, before serving traffic.
+
+Usage:
+    python -m src.fastapi.app.db.migrate
+"""
+
+import asyncio
+import logging
+
+from ..core.config import settings
+from .dynamodb import create_tables_if_not_exist
+from .repositories import CallCounterRepository, CallEventRepository, ResidentRepository
+from .storage import close_storage, init_storage, storage_backend
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate():
+    """Add missing indexes, then backfill what older items lack"""
+    await init_storage()
+    try:
+        if storage_backend() == 'dynamodb':
+            await create_tables_if_not_exist()
+        updated = await CallEventRepository().backfill_day_buckets()
+        locks = await ResidentRepository().backfill_room_locks()
+        # Counts by day, so only once every call has one
+        counters = await CallCounterRepository().rebuild()
+        logger.info(f"Migration complete: {updated} call events backfilled, {locks} room locks, "
+                    f"{counters} counters rebuilt")
+    finally:
+        await close_storage()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+    asyncio.run(migrate())
@@ -3,55 +3,324 @@ Repository pattern for database operations
 """
 
 import uuid
+import asyncio
 import logging
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+import random
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional, Dict, Any, Sequence, Tuple
 from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
 
-from ..models import CallEvent, CallEventCreate, CallEventUpdate
-from ..models import ResidentProfile, ResidentCreate, ResidentUpdate  
+from ..models import CallEvent, CallEventCreate, CallEventUpdate, CallEventSummary
+from ..models.call_event import CallEventStatus, CallEventType
+from ..models import CallEventBatchItem, CallEventBatchItemResult, CallEventBatchResult
+from ..models import ResidentProfile, ResidentCreate, ResidentUpdate, ResidentSummary
 from ..models import User, UserCreate, UserUpdate
+from ..models import ResponseTimeStats, TimeSeriesPoint
+from ..models import Page
+from ..core import histogram
 from ..core.config import settings
-from .dynamodb import get_table
+from ..core.ids import uuid7, uuid7_lower_bound
+from ..core.pagination import encode_cursor, decode_cursor
+from .dynamodb import TTL_ATTRIBUTE
+from .storage import get_table
+from .directory import ResidentDirectory, resident_directory
+from .cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
 
+# Call events are partitioned by UTC day in day-index and sorted by their
+# time-ordered (UUIDv7) event_id within each day
+DAY_INDEX = 'day-index'
+DAY_FORMAT = '%Y-%m-%d'
+
+# How far back get_recent looks
+RECENT_WINDOW_DAYS = 7
+
+# Bulk ingestion: BatchWriteItem takes at most 25 puts; chunks are written
+# concurrently and unprocessed items retried with jittered backoff
+BATCH_WRITE_SIZE = 25
+BATCH_WRITE_CONCURRENCY = 4
+BATCH_WRITE_ATTEMPTS = 5
+BATCH_WRITE_BASE_DELAY = 0.05
+
+# Bulk lookups: BatchGetItem takes at most 100 keys
+BATCH_GET_SIZE = 100
+
+# Exports read the calls table this many items per query
+EXPORT_PAGE_SIZE = 500
+
+# Each occupied room has a lock item in the residents table, keyed
+# room#<room_number> and owned by the active resident assigned to it.
+# Lock items carry record_type and no room_number, so they stay out of
+# room-index and out of resident scans.
+ROOM_LOCK_PREFIX = 'room#'
+ROOM_LOCK_RECORD_TYPE = 'room_lock'
+
+# Call counters live in the stats table, one item per
+# counter#<facility>#<day>#<event_type>#<status>
+COUNTER_PREFIX = 'counter#'
+
+# Response time aggregates live in the stats table too, keyed
+# response#<facility>#<day> and response#<facility>#<day>#caregiver#<id>
+RESPONSE_TIME_PREFIX = 'response#'
+
+# Hourly rollups for charts, keyed rollup#<facility>#<YYYY-MM-DDTHH>
+ROLLUP_PREFIX = 'rollup#'
+HOUR_FORMAT = '%Y-%m-%dT%H'
+
+# Call status transitions and resident room moves are conditional on the
+# state they were read with; a concurrent change is re-read and retried
+# this many times
+STATUS_UPDATE_ATTEMPTS = 3
+
+# Fieldsets that load summary models instead of plain dicts
+CALL_SUMMARY_FIELDS = tuple(CallEventSummary.model_fields)
+RESIDENT_SUMMARY_FIELDS = tuple(ResidentSummary.model_fields)
+
+
+class CallNotActiveError(Exception):
+    """Raised when acknowledging a call that is no longer active"""
+    
+    def __init__(self, event_id: str):
+        super().__init__(f"Call {event_id} has already been acknowledged or resolved")
+        self.event_id = event_id
+
+
+class RoomOccupiedError(Exception):
+    """Raised when a room is already held by another active resident"""
+    
+    def __init__(self, room_number: str):
+        super().__init__(f"Room {room_number} is already occupied")
+        self.room_number = room_number
+
+
+def projection(fields: Sequence[str]) -> Dict[str, Any]:
+    """ProjectionExpression kwargs reading only `fields`.
+    
+    Every name goes through a placeholder since several attributes
+    (status, timestamp, name, day) are DynamoDB reserved words.
+    """
+    names = {f"#p{i}": field for i, field in enumerate(dict.fromkeys(fields))}
+    return {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names}
+
+
+def set_expression(changes: Dict[str, Any], expected: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """update_item kwargs SETting `changes`, conditional on `expected` attribute values"""
+    names: Dict[str, str] = {}
+    values: Dict[str, Any] = {}
+    assignments = []
+    for i, (field, value) in enumerate(changes.items()):
+        names[f"#f{i}"], values[f":f{i}"] = field, value
+        assignments.append(f"#f{i} = :f{i}")
+    kwargs = {'UpdateExpression': 'SET ' + ', '.join(assignments)}
+    
+    if expected:
+        conditions = []
+        for i, (field, value) in enumerate(expected.items()):
+            names[f"#e{i}"], values[f":e{i}"] = field, value
+            conditions.append(f"#e{i} = :e{i}")
+        kwargs['ConditionExpression'] = ' AND '.join(conditions)
+    
+    kwargs.update(ExpressionAttributeNames=names, ExpressionAttributeValues=values)
+    return kwargs
+
+
+def response_seconds(timestamp: datetime, acknowledged_at: datetime) -> int:
+    """Whole seconds from a call to its acknowledgement"""
+    return max(0, int((acknowledged_at - timestamp).total_seconds()))
+
+
+def load_projected(items: List[Dict[str, Any]], fields: Sequence[str], summary_fields: Sequence[str], summary_model):
+    """Results for items read with a projection.
+    
+    The summary fieldset is validated into the summary model; any other
+    sparse fieldset is returned as plain dicts of just those fields.
+    """
+    if tuple(fields) == tuple(summary_fields):
+        return [summary_model(**item) for item in items]
+    return [{field: item[field] for field in fields if field in item} for item in items]
+
+
+async def batch_get(table, table_name: str, key_name: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch items by key with concurrent BatchGetItem calls; returns id -> item.
+    
+    Duplicate IDs are requested once and UnprocessedKeys are retried with
+    the same backoff as bulk writes. Missing items are simply absent.
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    chunks = [unique_ids[i:i + BATCH_GET_SIZE] for i in range(0, len(unique_ids), BATCH_GET_SIZE)]
+    semaphore = asyncio.Semaphore(BATCH_WRITE_CONCURRENCY)
+    
+    async def get_chunk(chunk):
+        found = []
+        request = {table_name: {'Keys': [{key_name: item_id} for item_id in chunk]}}
+        async with semaphore:
+            for attempt in range(BATCH_WRITE_ATTEMPTS):
+                response = await table.meta.client.batch_get_item(RequestItems=request)
+                found.extend(response.get('Responses', {}).get(table_name, []))
+                request = response.get('UnprocessedKeys') or {}
+                if not request:
+                    break
+                if attempt < BATCH_WRITE_ATTEMPTS - 1:
+                    await asyncio.sleep(BATCH_WRITE_BASE_DELAY * (2 ** attempt) * (0.5 + random.random()))
+            else:
+                logger.error(f"{len(request[table_name]['Keys'])} keys unprocessed reading {table_name}")
+        return found
+    
+    items = {}
+    for found in await asyncio.gather(*(get_chunk(chunk) for chunk in chunks)):
+        for item in found:
+            items[item[key_name]] = item
+    return items
+
+
+# Call events by ID, shared by every CallEventRepository in this process;
+# active calls are read repeatedly by every caregiver's dashboard
+call_event_cache: LRUCache[CallEvent] = LRUCache(
+    max_entries=settings.CALL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CALL_CACHE_TTL_SECONDS
+)
+
+
 class CallEventRepository:
-    """Repository for call event operations"""
+    """Repository for call event operations.
     
-    def __init__(self):
+    Lookups by ID read through the call event cache; creates and updates
+    refresh it.
+    """
+    
+    def __init__(self, cache: Optional[LRUCache] = None, counters: Optional["CallCounterRepository"] = None,
+                 response_times: Optional["ResponseTimeRepository"] = None,
+                 rollups: Optional["CallRollupRepository"] = None):
         self.table_name = settings.DYNAMODB_TABLE_CALLS
+        self.cache = call_event_cache if cache is None else cache
+        self.counters = CallCounterRepository() if counters is None else counters
+        self.response_times = ResponseTimeRepository() if response_times is None else response_times
+        self.rollups = CallRollupRepository() if rollups is None else rollups
     
-    async def create(self, call_data: CallEventCreate) -> CallEvent:
-        """Create a new call event"""
-        table = await get_table(self.table_name)
-        
-        event_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow()
-        
-        item = {
+    def build_item(self, call_data: CallEventCreate, event_id: str, timestamp: datetime) -> Dict[str, Any]:
+        """DynamoDB item for a new call event"""
+        now = datetime.utcnow().isoformat()
+        return {
             'event_id': event_id,
             'timestamp': timestamp.isoformat(),
+            'day': timestamp.strftime(DAY_FORMAT),
             'resident_id': call_data.resident_id,
             'event_type': call_data.event_type.value,
             'status': 'active',
             'message': call_data.message,
             'metadata': call_data.metadata or {},
-            'created_at': timestamp.isoformat(),
-            'updated_at': timestamp.isoformat()
+            'created_at': now,
+            'updated_at': now
         }
+    
+    async def create(self, call_data: CallEventCreate) -> CallEvent:
+        """Create a new call event"""
+        table = await get_table(self.table_name)
         
-        await table.put_item(Item=item)
+        timestamp = datetime.utcnow()
+        event_id = uuid7(timestamp)
+        
+        await table.put_item(Item=self.build_item(call_data, event_id, timestamp))
+        await asyncio.gather(
+            self.counters.add({
+                (timestamp.strftime(DAY_FORMAT), call_data.event_type.value, CallEventStatus.ACTIVE.value): 1
+            }),
+            self.rollups.add_calls({(timestamp.strftime(HOUR_FORMAT), call_data.event_type.value): 1})
+        )
         
-        return CallEvent(
+        event = CallEvent(
             event_id=event_id,
             timestamp=timestamp,
             **call_data.dict()
         )
+        self.cache.put(event_id, event)
+        return event
+    
+    async def create_many(self, events: List[CallEventBatchItem]) -> CallEventBatchResult:
+        """Create many call events with concurrent BatchWriteItem calls.
+        
+        Each event's outcome is reported by its position in `events`.
+        Events sharing an event_id are written once, and IDs already in the
+        table are reported as existing and left alone (BatchWriteItem puts
+        cannot be conditional, so they are looked up first). Resending a
+        batch therefore neither duplicates calls, overwrites ones that have
+        since been acknowledged, nor counts them twice.
+        """
+        table = await get_table(self.table_name)
+        
+        event_ids = []
+        items: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            timestamp = event.timestamp or datetime.utcnow()
+            if timestamp.tzinfo:
+                timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+            event_id = event.event_id or uuid7(timestamp)
+            event_ids.append(event_id)
+            items[event_id] = self.build_item(event, event_id, timestamp)
+        
+        existing = set(await batch_get(table, self.table_name, 'event_id', list(items)))
+        requests = [{'PutRequest': {'Item': item}} for event_id, item in items.items() if event_id not in existing]
+        chunks = [requests[i:i + BATCH_WRITE_SIZE] for i in range(0, len(requests), BATCH_WRITE_SIZE)]
+        semaphore = asyncio.Semaphore(BATCH_WRITE_CONCURRENCY)
+        
+        async def write_chunk(chunk):
+            async with semaphore:
+                return await self.write_batch(table, chunk)
+        
+        errors: Dict[str, str] = {}
+        for chunk_errors in await asyncio.gather(*(write_chunk(chunk) for chunk in chunks)):
+            errors.update(chunk_errors)
+        
+        results = [
+            CallEventBatchItemResult(index=index, event_id=event_id,
+                                     created=event_id not in errors and event_id not in existing,
+                                     existing=event_id in existing, error=errors.get(event_id))
+            for index, event_id in enumerate(event_ids)
+        ]
+        created = sum(1 for result in results if result.created)
+        already = sum(1 for result in results if result.existing)
+        failed = len(results) - created - already
+        if failed:
+            logger.error(f"Bulk ingestion: {failed} of {len(results)} call events failed")
+        
+        deltas: Dict[Tuple[str, str, str], int] = {}
+        hourly: Dict[Tuple[str, str], int] = {}
+        for event_id, item in items.items():
+            if event_id not in errors and event_id not in existing:
+                counter = (item['day'], item['event_type'], item['status'])
+                deltas[counter] = deltas.get(counter, 0) + 1
+                hour = (item['timestamp'][:13], item['event_type'])
+                hourly[hour] = hourly.get(hour, 0) + 1
+        await asyncio.gather(self.counters.add(deltas), self.rollups.add_calls(hourly))
+        return CallEventBatchResult(created=created, existing=already, failed=failed, results=results)
+    
+    async def write_batch(self, table, requests: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Write up to 25 puts, retrying unprocessed items; returns event_id -> error"""
+        pending = requests
+        error = "Unprocessed after retries"
+        for attempt in range(BATCH_WRITE_ATTEMPTS):
+            try:
+                response = await table.meta.client.batch_write_item(RequestItems={self.table_name: pending})
+                pending = response.get('UnprocessedItems', {}).get(self.table_name, [])
+            except Exception as e:
+                logger.error(f"Error writing call event batch: {str(e)}")
+                error = str(e)
+            if not pending:
+                return {}
+            if attempt < BATCH_WRITE_ATTEMPTS - 1:
+                await asyncio.sleep(BATCH_WRITE_BASE_DELAY * (2 ** attempt) * (0.5 + random.random()))
+        
+        return {request['PutRequest']['Item']['event_id']: error for request in pending}
     
     async def get_by_id(self, event_id: str) -> Optional[CallEvent]:
         """Get call event by ID"""
+        event = self.cache.get(event_id)
+        if event:
+            return event
+        
         table = await get_table(self.table_name)
         
         response = await table.get_item(Key={'event_id': event_id})
@@ -59,89 +328,668 @@ class CallEventRepository:
         
         if not item:
             return None
-            
-        return CallEvent(**item)
+        
+        event = CallEvent(**item)
+        self.cache.put(event_id, event)
+        return event
+    
+    async def get_many(self, event_ids: List[str]) -> List[CallEvent]:
+        """Get call events by ID in request order, skipping unknown IDs"""
+        found = {event_id: self.cache.get(event_id) for event_id in dict.fromkeys(event_ids)}
+        missing = [event_id for event_id, event in found.items() if event is None]
+        
+        if missing:
+            table = await get_table(self.table_name)
+            items = await batch_get(table, self.table_name, 'event_id', missing)
+            for event_id, item in items.items():
+                found[event_id] = CallEvent(**item)
+                self.cache.put(event_id, found[event_id])
+        
+        return [event for event in found.values() if event]
     
     async def update(self, event_id: str, update_data: CallEventUpdate) -> Optional[CallEvent]:
-        """Update call event"""
-        table = await get_table(self.table_name)
+        """Update call event.
         
-        # Build update expression
-        update_expr = "SET updated_at = :updated_at"
-        expr_values = {':updated_at': datetime.utcnow().isoformat()}
+        A status change is conditional on the status it was read with, so
+        each transition moves exactly one count between call counters. An
+        active call moving to acknowledged gets its response time computed
+        here, as in acknowledge(); a client-supplied one is ignored.
+        """
+        table = await get_table(self.table_name)
         
+        changes: Dict[str, Any] = {'updated_at': datetime.utcnow().isoformat()}
         if update_data.status:
-            update_expr += ", #status = :status"
-            expr_values[':status'] = update_data.status.value
-            
+            changes['status'] = update_data.status.value
         if update_data.caregiver_id:
-            update_expr += ", caregiver_id = :caregiver_id"
-            expr_values[':caregiver_id'] = update_data.caregiver_id
-            
+            changes['caregiver_id'] = update_data.caregiver_id
         if update_data.response_time is not None:
-            update_expr += ", response_time = :response_time"
-            expr_values[':response_time'] = update_data.response_time
-            
+            changes['response_time'] = update_data.response_time
         if update_data.metadata:
-            update_expr += ", metadata = :metadata"
-            expr_values[':metadata'] = update_data.metadata
-        
-        expr_names = {'#status': 'status'} if update_data.status else None
+            changes['metadata'] = update_data.metadata
         
         try:
-            response = await table.update_item(
-                Key={'event_id': event_id},
-                UpdateExpression=update_expr,
-                ExpressionAttributeValues=expr_values,
-                ExpressionAttributeNames=expr_names,
-                ReturnValues='ALL_NEW'
-            )
+            if not update_data.status:
+                response = await table.update_item(
+                    Key={'event_id': event_id}, ReturnValues='ALL_NEW', **set_expression(changes)
+                )
+                event = CallEvent(**response['Attributes'])
+                self.cache.put(event_id, event)
+                return event
             
-            return CallEvent(**response['Attributes'])
+            for attempt in range(STATUS_UPDATE_ATTEMPTS):
+                current = await self.get_by_id(event_id)
+                if current is None:
+                    return None
+                
+                attempt_changes = dict(changes)
+                response_time = None
+                if current.status == CallEventStatus.ACTIVE and update_data.status == CallEventStatus.ACKNOWLEDGED:
+                    now = datetime.utcnow()
+                    response_time = response_seconds(current.timestamp, now)
+                    attempt_changes.update(response_time=response_time, acknowledged_at=now.isoformat())
+                try:
+                    response = await table.update_item(
+                        Key={'event_id': event_id}, ReturnValues='ALL_NEW',
+                        **set_expression(attempt_changes, expected={'status': current.status.value})
+                    )
+                    break
+                except ClientError as e:
+                    if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                        raise
+                    # Changed since it was cached or read; look again
+                    self.cache.invalidate(event_id)
+            else:
+                logger.error(f"Gave up updating call event {event_id} after concurrent status changes")
+                return None
+            
+            event = CallEvent(**response['Attributes'])
+            self.cache.put(event_id, event)
+            await self.record_transition(event, current.status, response_time)
+            return event
         except Exception as e:
+            self.cache.invalidate(event_id)
             logger.error(f"Error updating call event {event_id}: {str(e)}")
             return None
     
+    async def acknowledge(self, event_id: str, caregiver_id: str) -> Optional[CallEvent]:
+        """Acknowledge an active call, computing its response time server-side.
+        
+        One conditional update_item: raises CallNotActiveError if the call
+        was already acknowledged or resolved. Returns None for unknown IDs.
+        """
+        current = await self.get_by_id(event_id)
+        if current is None:
+            return None
+        
+        table = await get_table(self.table_name)
+        
+        now = datetime.utcnow()
+        response_time = response_seconds(current.timestamp, now)
+        changes = {
+            'status': CallEventStatus.ACKNOWLEDGED.value,
+            'caregiver_id': caregiver_id,
+            'response_time': response_time,
+            'acknowledged_at': now.isoformat(),
+            'updated_at': now.isoformat()
+        }
+        
+        try:
+            response = await table.update_item(
+                Key={'event_id': event_id}, ReturnValues='ALL_NEW',
+                **set_expression(changes, expected={'status': CallEventStatus.ACTIVE.value})
+            )
+        except ClientError as e:
+            self.cache.invalidate(event_id)
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise CallNotActiveError(event_id)
+            logger.error(f"Error acknowledging call event {event_id}: {str(e)}")
+            return None
+        
+        event = CallEvent(**response['Attributes'])
+        self.cache.put(event_id, event)
+        await self.record_transition(event, CallEventStatus.ACTIVE, response_time)
+        return event
+    
+    async def record_transition(self, event: CallEvent, previous_status: CallEventStatus,
+                                response_time: Optional[int]):
+        """Move the call between status counters and record its response time"""
+        if event.status == previous_status:
+            return
+        day, event_type = event.timestamp.strftime(DAY_FORMAT), event.event_type.value
+        writes = [self.counters.add({
+            (day, event_type, previous_status.value): -1,
+            (day, event_type, event.status.value): 1
+        })]
+        if response_time is not None:
+            writes.append(self.response_times.record(day, event.caregiver_id, response_time))
+            writes.append(self.rollups.add_response(event.timestamp.strftime(HOUR_FORMAT), response_time))
+        # Independent items in the stats table; write them together
+        await asyncio.gather(*writes)
+    
     async def get_recent(self, limit: int = 50) -> List[CallEvent]:
-        """Get recent call events"""
+        """Get call events from the last RECENT_WINDOW_DAYS, newest first"""
+        page = await self.get_recent_page(limit=limit)
+        return page.items
+    
+    async def get_recent_page(self, limit: int = 50, cursor: Optional[str] = None,
+                              fields: Optional[Sequence[str]] = None) -> Page:
+        """Get one page of recent call events, newest first.
+        
+        Queries one day bucket at a time from today (or the cursor's day)
+        backwards and stops as soon as `limit` events are collected, so the
+        cost depends on `limit` rather than on the size of the table.
+        With `fields`, only those attributes are read (see load_projected).
+        """
         table = await get_table(self.table_name)
         
-        # Query using timestamp index
-        response = await table.scan(
-            Limit=limit,
-            ScanFilter={
-                'timestamp': {
-                    'AttributeValueList': [
-                        (datetime.utcnow() - datetime.timedelta(days=7)).isoformat()
-                    ],
-                    'ComparisonOperator': 'GT'
-                }
+        now = datetime.utcnow()
+        oldest = now - timedelta(days=RECENT_WINDOW_DAYS)
+        lower_bound = uuid7_lower_bound(oldest)
+        day = now.date()
+        start_key = None
+        if cursor:
+            start_key = decode_cursor(cursor, 'calls:recent')
+            day = datetime.strptime(start_key['day'], DAY_FORMAT).date()
+        items: List[Dict[str, Any]] = []
+        
+        while day >= oldest.date() and len(items) < limit:
+            query_kwargs = {
+                'IndexName': DAY_INDEX,
+                'KeyConditionExpression': Key('day').eq(day.strftime(DAY_FORMAT)) & Key('event_id').gte(lower_bound),
+                'ScanIndexForward': False
             }
-        )
+            if fields:
+                query_kwargs.update(projection([*fields, 'day', 'event_id']))
+            if start_key:
+                query_kwargs['ExclusiveStartKey'] = start_key
+                start_key = None
+            while len(items) < limit:
+                response = await table.query(Limit=limit - len(items), **query_kwargs)
+                items.extend(response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            day -= timedelta(days=1)
         
-        items = response.get('Items', [])
-        return [CallEvent(**item) for item in items]
+        next_cursor = None
+        if len(items) >= limit:
+            last = items[-1]
+            next_cursor = encode_cursor({'day': last['day'], 'event_id': last['event_id']}, 'calls:recent')
+        return Page(items=self.load(items, fields), next_cursor=next_cursor)
+    
+    async def get_since(self, since: datetime, limit: int = 100) -> List[CallEvent]:
+        """Get call events created at or after `since`, oldest first"""
+        table = await get_table(self.table_name)
+        
+        lower_bound = uuid7_lower_bound(since)
+        day = since.date()
+        today = datetime.utcnow().date()
+        events: List[CallEvent] = []
+        
+        while day <= today and len(events) < limit:
+            query_kwargs = {
+                'IndexName': DAY_INDEX,
+                'KeyConditionExpression': Key('day').eq(day.strftime(DAY_FORMAT)) & Key('event_id').gte(lower_bound),
+                'ScanIndexForward': True
+            }
+            while len(events) < limit:
+                response = await table.query(Limit=limit - len(events), **query_kwargs)
+                events.extend(CallEvent(**item) for item in response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            day += timedelta(days=1)
+        
+        return events
+    
+    async def iter_range(self, start: datetime, end: datetime, resident_id: Optional[str] = None,
+                         page_size: int = EXPORT_PAGE_SIZE) -> AsyncIterator[CallEvent]:
+        """Call events from [start, end) in index order, read one page at a time.
+        
+        The next page is only queried once the previous one has been
+        consumed, so memory stays at one page however long the range.
+        With a resident, resident-index is read in timestamp order;
+        otherwise day-index one UTC day at a time, in event_id order,
+        which follows call time only to the millisecond.
+        """
+        table = await get_table(self.table_name)
+        
+        window = Attr('timestamp').gte(start.isoformat()) & Attr('timestamp').lt(end.isoformat())
+        if resident_id:
+            queries = [{
+                'IndexName': 'resident-index',
+                'KeyConditionExpression': Key('resident_id').eq(resident_id)
+                                          & Key('timestamp').between(start.isoformat(), end.isoformat()),
+                'FilterExpression': Attr('timestamp').lt(end.isoformat())
+            }]
+        else:
+            # Filtered on timestamp, which is exact to the microsecond;
+            # event_id only orders calls to the millisecond
+            days = (end - timedelta(microseconds=1)).date() - start.date()
+            queries = [{
+                'IndexName': DAY_INDEX,
+                'KeyConditionExpression': Key('day').eq((start.date() + timedelta(days=offset)).strftime(DAY_FORMAT)),
+                'FilterExpression': window
+            } for offset in range(days.days + 1)]
+        
+        for query_kwargs in queries:
+            while True:
+                response = await table.query(Limit=page_size, ScanIndexForward=True, **query_kwargs)
+                for item in response.get('Items', []):
+                    yield CallEvent(**item)
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    async def get_archivable(self, day: str) -> List[CallEvent]:
+        """Resolved calls from one UTC day that have not been archived yet"""
+        table = await get_table(self.table_name)
+        
+        query_kwargs = {
+            'IndexName': DAY_INDEX,
+            'KeyConditionExpression': Key('day').eq(day),
+            'FilterExpression': Attr('status').eq(CallEventStatus.RESOLVED.value) & Attr(TTL_ATTRIBUTE).not_exists()
+        }
+        events: List[CallEvent] = []
+        while True:
+            response = await table.query(**query_kwargs)
+            events.extend(CallEvent(**item) for item in response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return events
+    
+    async def mark_archived(self, event_ids: List[str], expires_at: int) -> int:
+        """Set the TTL attribute on archived calls so DynamoDB deletes them.
+        
+        Conditional on the call still being resolved, so a call reopened
+        since it was archived stays in the hot table. Returns how many
+        calls were marked.
+        """
+        table = await get_table(self.table_name)
+        semaphore = asyncio.Semaphore(BATCH_WRITE_CONCURRENCY)
+        
+        async def mark(event_id: str) -> bool:
+            async with semaphore:
+                try:
+                    await table.update_item(
+                        Key={'event_id': event_id},
+                        UpdateExpression='SET #ttl = :ttl',
+                        ConditionExpression='#status = :resolved',
+                        ExpressionAttributeNames={'#ttl': TTL_ATTRIBUTE, '#status': 'status'},
+                        ExpressionAttributeValues={':ttl': expires_at, ':resolved': CallEventStatus.RESOLVED.value}
+                    )
+                except ClientError as e:
+                    if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                        logger.error(f"Error marking call event {event_id} archived: {str(e)}")
+                    return False
+                self.cache.invalidate(event_id)
+                return True
+        
+        return sum(await asyncio.gather(*(mark(event_id) for event_id in event_ids)))
     
     async def get_by_resident(self, resident_id: str, limit: int = 20) -> List[CallEvent]:
-        """Get call events for a specific resident"""
+        """Get call events for a specific resident, most recent first"""
+        page = await self.get_by_resident_page(resident_id, limit=limit)
+        return page.items
+    
+    async def get_by_resident_page(self, resident_id: str, limit: int = 20, cursor: Optional[str] = None,
+                                   fields: Optional[Sequence[str]] = None) -> Page:
+        """Get one page of a resident's call events, most recent first"""
         table = await get_table(self.table_name)
         
-        response = await table.query(
-            IndexName='resident-index',
-            KeyConditionExpression=Key('resident_id').eq(resident_id),
-            Limit=limit,
-            ScanIndexForward=False  # Most recent first
-        )
+        scope = f"calls:resident:{resident_id}"
+        query_kwargs = {
+            'IndexName': 'resident-index',
+            'KeyConditionExpression': Key('resident_id').eq(resident_id),
+            'ScanIndexForward': False  # Most recent first
+        }
+        if fields:
+            query_kwargs.update(projection([*fields, 'event_id', 'resident_id', 'timestamp']))
+        if cursor:
+            query_kwargs['ExclusiveStartKey'] = decode_cursor(cursor, scope)
         
-        items = response.get('Items', [])
+        items: List[Dict[str, Any]] = []
+        while len(items) < limit:
+            response = await table.query(Limit=limit - len(items), **query_kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        next_cursor = None
+        if len(items) >= limit:
+            last = items[-1]
+            next_cursor = encode_cursor({
+                'event_id': last['event_id'],
+                'resident_id': last['resident_id'],
+                'timestamp': last['timestamp']
+            }, scope)
+        return Page(items=self.load(items, fields), next_cursor=next_cursor)
+    
+    def load(self, items: List[Dict[str, Any]], fields: Optional[Sequence[str]]) -> List[Any]:
+        """Full events, or projected results when a fieldset was requested"""
+        if fields:
+            return load_projected(items, fields, CALL_SUMMARY_FIELDS, CallEventSummary)
         return [CallEvent(**item) for item in items]
+    
+    async def backfill_day_buckets(self) -> int:
+        """Add the day attribute to events written before day-index existed.
+        
+        One-off migration; returns the number of events updated.
+        """
+        table = await get_table(self.table_name)
+        
+        updated = 0
+        scan_kwargs = {
+            'FilterExpression': Attr('day').not_exists(),
+            'ProjectionExpression': 'event_id, #timestamp',
+            'ExpressionAttributeNames': {'#timestamp': 'timestamp'}
+        }
+        while True:
+            response = await table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                day = datetime.fromisoformat(item['timestamp']).strftime(DAY_FORMAT)
+                try:
+                    await table.update_item(
+                        Key={'event_id': item['event_id']},
+                        UpdateExpression='SET #day = :day',
+                        ConditionExpression='attribute_exists(event_id)',
+                        ExpressionAttributeNames={'#day': 'day'},
+                        ExpressionAttributeValues={':day': day}
+                    )
+                except ClientError as e:
+                    # Deleted since the scan; don't recreate it as a stub
+                    if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                        raise
+                    continue
+                updated += 1
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        logger.info(f"Backfilled day bucket on {updated} call events")
+        return updated
 
 
-class ResidentRepository:
-    """Repository for resident operations"""
+class CallCounterRepository:
+    """Materialized call counts, one item per facility/day/event type/status.
+    
+    Kept current with atomic ADD updates as calls are created and change
+    status, so status and metrics read a few counter items rather than
+    scanning calls. Counts follow the day the call was made.
+    """
+    
+    def __init__(self):
+        self.table_name = settings.DYNAMODB_TABLE_STATS
+        self.facility_id = settings.FACILITY_ID
+    
+    def counter_id(self, day: str, event_type: str, status: str) -> str:
+        return f"{COUNTER_PREFIX}{self.facility_id}#{day}#{event_type}#{status}"
+    
+    async def add(self, deltas: Dict[Tuple[str, str, str], int]):
+        """Apply count changes keyed (day, event_type, status).
+        
+        Counters are best effort: a failed update is logged and never fails
+        the call write it accompanies.
+        """
+        deltas = {counter: delta for counter, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        table = await get_table(self.table_name)
+        
+        async def add_one(day: str, event_type: str, status: str, delta: int):
+            try:
+                await table.update_item(
+                    Key={'stat_id': self.counter_id(day, event_type, status)},
+                    UpdateExpression='ADD #count :delta SET facility_id = :facility_id, #day = :day, '
+                                     'event_type = :event_type, #status = :status',
+                    ExpressionAttributeNames={'#count': 'count', '#day': 'day', '#status': 'status'},
+                    ExpressionAttributeValues={
+                        ':delta': delta, ':facility_id': self.facility_id, ':day': day,
+                        ':event_type': event_type, ':status': status
+                    }
+                )
+            except Exception as e:
+                logger.error(f"Error updating call counter {day}/{event_type}/{status}: {str(e)}")
+        
+        await asyncio.gather(*(add_one(*counter, delta) for counter, delta in deltas.items()))
+    
+    async def get_counts(self, days: List[str]) -> Dict[Tuple[str, str, str], int]:
+        """Counts keyed (day, event_type, status) for the given days, in one batched read"""
+        table = await get_table(self.table_name)
+        
+        counters = {
+            self.counter_id(day, event_type.value, status.value): (day, event_type.value, status.value)
+            for day in days for event_type in CallEventType for status in CallEventStatus
+        }
+        items = await batch_get(table, self.table_name, 'stat_id', list(counters))
+        return {counters[stat_id]: int(item.get('count', 0)) for stat_id, item in items.items()}
+    
+    async def get_summary(self, days: int = RECENT_WINDOW_DAYS) -> Dict[str, Any]:
+        """Calls today and over the last `days` days (today included), by type and status"""
+        today = datetime.utcnow().date()
+        day_keys = [(today - timedelta(days=n)).strftime(DAY_FORMAT) for n in range(days)]
+        counts = await self.get_counts(day_keys)
+        
+        by_type: Dict[str, int] = {}
+        by_status_today: Dict[str, int] = {}
+        for (day, event_type, status), count in counts.items():
+            by_type[event_type] = by_type.get(event_type, 0) + count
+            if day == day_keys[0]:
+                by_status_today[status] = by_status_today.get(status, 0) + count
+        
+        return {
+            'today': sum(by_status_today.values()),
+            'period': sum(by_type.values()),
+            'by_type': by_type,
+            'by_status_today': by_status_today
+        }
+    
+    async def rebuild(self) -> int:
+        """Recount every counter from the calls table.
+        
+        One-off migration for calls written before counters existed (run it
+        while writes are quiet); returns the number of counters written.
+        Archived calls the TTL has already deleted are no longer counted.
+        """
+        calls_table = await get_table(settings.DYNAMODB_TABLE_CALLS)
+        table = await get_table(self.table_name)
+        
+        counts: Dict[Tuple[str, str, str], int] = {}
+        scan_kwargs = projection(['day', 'event_type', 'status'])
+        while True:
+            response = await calls_table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                if 'day' in item:
+                    counter = (item['day'], item['event_type'], item.get('status', CallEventStatus.ACTIVE.value))
+                    counts[counter] = counts.get(counter, 0) + 1
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        for (day, event_type, status), count in counts.items():
+            await table.put_item(Item={
+                'stat_id': self.counter_id(day, event_type, status),
+                'facility_id': self.facility_id,
+                'day': day,
+                'event_type': event_type,
+                'status': status,
+                'count': count
+            })
+        
+        logger.info(f"Rebuilt {len(counts)} call counters")
+        return len(counts)
+
+
+class ResponseTimeRepository:
+    """Running response time aggregates per day and per caregiver per day.
+    
+    Each acknowledgement ADDs to a count, a sum and one histogram bucket,
+    so averages and percentiles are a read of one item per day rather
+    than a pass over calls.
+    """
+    
+    def __init__(self):
+        self.table_name = settings.DYNAMODB_TABLE_STATS
+        self.facility_id = settings.FACILITY_ID
+    
+    def aggregate_id(self, day: str, caregiver_id: Optional[str] = None) -> str:
+        stat_id = f"{RESPONSE_TIME_PREFIX}{self.facility_id}#{day}"
+        return f"{stat_id}#caregiver#{caregiver_id}" if caregiver_id else stat_id
+    
+    async def record(self, day: str, caregiver_id: Optional[str], seconds: int):
+        """Add one response time to the day's aggregate and the caregiver's.
+        
+        Best effort, like the call counters: failures are logged.
+        """
+        table = await get_table(self.table_name)
+        
+        async def record_one(stat_id: str):
+            try:
+                await table.update_item(
+                    Key={'stat_id': stat_id},
+                    UpdateExpression='ADD #count :one, total_seconds :seconds, #bucket :one '
+                                     'SET facility_id = :facility_id, #day = :day',
+                    ExpressionAttributeNames={'#count': 'count', '#bucket': histogram.bucket_for(seconds), '#day': 'day'},
+                    ExpressionAttributeValues={
+                        ':one': 1, ':seconds': seconds, ':facility_id': self.facility_id, ':day': day
+                    }
+                )
+            except Exception as e:
+                logger.error(f"Error recording response time for {stat_id}: {str(e)}")
+        
+        stat_ids = [self.aggregate_id(day)] + ([self.aggregate_id(day, caregiver_id)] if caregiver_id else [])
+        await asyncio.gather(*(record_one(stat_id) for stat_id in stat_ids))
+    
+    async def get_stats(self, days: int = 1, caregiver_id: Optional[str] = None) -> ResponseTimeStats:
+        """Response times over the last `days` days (today included), optionally for one caregiver"""
+        table = await get_table(self.table_name)
+        
+        today = datetime.utcnow().date()
+        stat_ids = [
+            self.aggregate_id((today - timedelta(days=n)).strftime(DAY_FORMAT), caregiver_id) for n in range(days)
+        ]
+        items = list((await batch_get(table, self.table_name, 'stat_id', stat_ids)).values())
+        
+        count = sum(int(item.get('count', 0)) for item in items)
+        total = sum(int(item.get('total_seconds', 0)) for item in items)
+        buckets = histogram.merge(items)
+        return ResponseTimeStats(
+            count=count,
+            total_seconds=total,
+            average_seconds=round(total / count, 2) if count else None,
+            p50_seconds=histogram.percentile(buckets, 0.5),
+            p90_seconds=histogram.percentile(buckets, 0.9),
+            p95_seconds=histogram.percentile(buckets, 0.95),
+            histogram=buckets
+        )
+
+
+class CallRollupRepository:
+    """Hourly rollups of call volume and response times for charts.
+    
+    One stats item per facility and UTC hour, ADDed to as calls are
+    created (counts by type) and acknowledged (response time histogram,
+    against the hour the call was made). Series of any step are summed
+    from these buckets.
+    """
     
     def __init__(self):
+        self.table_name = settings.DYNAMODB_TABLE_STATS
+        self.facility_id = settings.FACILITY_ID
+    
+    def rollup_id(self, hour: str) -> str:
+        return f"{ROLLUP_PREFIX}{self.facility_id}#{hour}"
+    
+    async def increment(self, hour: str, amounts: Dict[str, int]):
+        """ADD amounts to one hour's rollup; best effort, like the counters"""
+        table = await get_table(self.table_name)
+        
+        names = {f"#a{i}": name for i, name in enumerate(amounts)}
+        values = {f":a{i}": amount for i, amount in enumerate(amounts.values())}
+        try:
+            await table.update_item(
+                Key={'stat_id': self.rollup_id(hour)},
+                UpdateExpression='ADD ' + ', '.join(f"#a{i} :a{i}" for i in range(len(amounts)))
+                                 + ' SET facility_id = :facility_id, #hour = :hour',
+                ExpressionAttributeNames={**names, '#hour': 'hour'},
+                ExpressionAttributeValues={**values, ':facility_id': self.facility_id, ':hour': hour}
+            )
+        except Exception as e:
+            logger.error(f"Error updating rollup for {hour}: {str(e)}")
+    
+    async def add_calls(self, counts: Dict[Tuple[str, str], int]):
+        """Count new calls keyed (hour, event_type)"""
+        by_hour: Dict[str, Dict[str, int]] = {}
+        for (hour, event_type), count in counts.items():
+            amounts = by_hour.setdefault(hour, {'calls': 0})
+            amounts['calls'] += count
+            amounts[f"calls_{event_type}"] = amounts.get(f"calls_{event_type}", 0) + count
+        await asyncio.gather(*(self.increment(hour, amounts) for hour, amounts in by_hour.items()))
+    
+    async def add_response(self, hour: str, seconds: int):
+        """Record one acknowledgement of a call made in `hour`"""
+        await self.increment(hour, {
+            'acknowledged': 1,
+            'total_seconds': seconds,
+            histogram.bucket_for(seconds): 1
+        })
+    
+    async def get_series(self, start: datetime, end: datetime, step_hours: int) -> List[TimeSeriesPoint]:
+        """Points every `step_hours` covering [start, end), read from hourly rollups.
+        
+        Steps are aligned to multiples of the step since the epoch, so the
+        same chart polled twice lines up.
+        """
+        table = await get_table(self.table_name)
+        
+        epoch = datetime(1970, 1, 1)
+        step = timedelta(hours=step_hours)
+        first = epoch + step * ((start - epoch) // step)
+        hours = []
+        hour = first
+        while hour < end:
+            hours.append(hour)
+            hour += timedelta(hours=1)
+        
+        items = await batch_get(table, self.table_name, 'stat_id',
+                                [self.rollup_id(hour.strftime(HOUR_FORMAT)) for hour in hours])
+        
+        points = []
+        for offset in range(0, len(hours), step_hours):
+            buckets = [items.get(self.rollup_id(hour.strftime(HOUR_FORMAT)), {})
+                       for hour in hours[offset:offset + step_hours]]
+            by_type: Dict[str, int] = {}
+            for bucket in buckets:
+                for name, value in bucket.items():
+                    if name.startswith('calls_'):
+                        by_type[name[len('calls_'):]] = by_type.get(name[len('calls_'):], 0) + int(value)
+            acknowledged = sum(int(bucket.get('acknowledged', 0)) for bucket in buckets)
+            total = sum(int(bucket.get('total_seconds', 0)) for bucket in buckets)
+            merged = histogram.merge(buckets)
+            points.append(TimeSeriesPoint(
+                start=hours[offset],
+                calls=sum(int(bucket.get('calls', 0)) for bucket in buckets),
+                by_type=by_type,
+                acknowledged=acknowledged,
+                average_response_seconds=round(total / acknowledged, 2) if acknowledged else None,
+                p50_response_seconds=histogram.percentile(merged, 0.5),
+                p95_response_seconds=histogram.percentile(merged, 0.95)
+            ))
+        return points
+
+
+class ResidentRepository:
+    """Repository for resident operations.
+    
+    Reads of the roster are served from the process-local resident
+    directory; writes go to DynamoDB and then through to the directory.
+    """
+    
+    def __init__(self, directory: Optional[ResidentDirectory] = None):
         self.table_name = settings.DYNAMODB_TABLE_RESIDENTS
+        self.directory = directory or resident_directory
     
     async def create(self, resident_data: ResidentCreate) -> ResidentProfile:
         """Create a new resident"""
@@ -163,73 +1011,295 @@ class ResidentRepository:
             'updated_at': timestamp.isoformat()
         }
         
-        await table.put_item(Item=item)
+        # Claiming the room and writing the resident commit together
+        transact_items = [self.claim_room(resident_data.room_number, resident_id)] if resident_data.active else []
+        transact_items.append({
+            'Put': {
+                'TableName': self.table_name,
+                'Item': item,
+                'ConditionExpression': 'attribute_not_exists(resident_id)'
+            }
+        })
+        await self.transact(table, transact_items, resident_data.room_number)
         
-        return ResidentProfile(
+        resident = ResidentProfile(
             resident_id=resident_id,
             created_at=timestamp,
             updated_at=timestamp,
             **resident_data.dict()
         )
+        self.directory.upsert(resident)
+        return resident
     
     async def get_by_id(self, resident_id: str) -> Optional[ResidentProfile]:
         """Get resident by ID"""
+        await self.directory.ensure_loaded(self.scan_all)
+        resident = self.directory.get(resident_id)
+        if resident:
+            return resident
+        
+        # Possibly created by another process since the last reload
         table = await get_table(self.table_name)
         
         response = await table.get_item(Key={'resident_id': resident_id})
         item = response.get('Item')
         
-        if not item:
+        if not item or item.get('record_type') == ROOM_LOCK_RECORD_TYPE:
             return None
-            
-        return ResidentProfile(**item)
+        
+        resident = ResidentProfile(**item)
+        self.directory.upsert(resident)
+        return resident
+    
+    async def get_many(self, resident_ids: List[str]) -> List[ResidentProfile]:
+        """Get residents by ID in request order, skipping unknown IDs.
+        
+        Served from the resident directory; IDs it does not know are read
+        with one batched lookup.
+        """
+        await self.directory.ensure_loaded(self.scan_all)
+        found = {resident_id: self.directory.get(resident_id) for resident_id in dict.fromkeys(resident_ids)}
+        missing = [resident_id for resident_id, resident in found.items() if resident is None]
+        
+        if missing:
+            table = await get_table(self.table_name)
+            items = await batch_get(table, self.table_name, 'resident_id', missing)
+            for resident_id, item in items.items():
+                if item.get('record_type') != ROOM_LOCK_RECORD_TYPE:
+                    found[resident_id] = ResidentProfile(**item)
+                    self.directory.upsert(found[resident_id])
+        
+        return [resident for resident in found.values() if resident]
+    
+    async def get_by_room(self, room_number: str) -> Optional[ResidentProfile]:
+        """Get the active resident assigned to a room"""
+        await self.directory.ensure_loaded(self.scan_all)
+        return self.directory.get_by_room(room_number)
+    
+    async def get_by_device(self, device_id: str) -> Optional[ResidentProfile]:
+        """Get the active resident using an Echo device"""
+        await self.directory.ensure_loaded(self.scan_all)
+        return self.directory.get_by_device(device_id)
     
     async def get_all(self, active_only: bool = True) -> List[ResidentProfile]:
         """Get all residents"""
+        await self.directory.ensure_loaded(self.scan_all)
+        return self.directory.all(active_only=active_only)
+    
+    async def scan_all(self, active_only: bool = False) -> List[ResidentProfile]:
+        """Read every resident from DynamoDB, following scan pages to the end"""
         table = await get_table(self.table_name)
         
-        if active_only:
-            response = await table.scan(
-                FilterExpression=Attr('active').eq(True)
-            )
-        else:
-            response = await table.scan()
+        scan_kwargs = {'FilterExpression': self.resident_filter(active_only)}
+        residents = []
+        while True:
+            response = await table.scan(**scan_kwargs)
+            residents.extend(ResidentProfile(**item) for item in response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return residents
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    async def get_page(self, active_only: bool = True, limit: int = 100, cursor: Optional[str] = None,
+                       fields: Optional[Sequence[str]] = None) -> Page:
+        """Get one page of residents; with `fields`, only those attributes are read"""
+        table = await get_table(self.table_name)
         
-        items = response.get('Items', [])
-        return [ResidentProfile(**item) for item in items]
+        scope = f"residents:{'active' if active_only else 'all'}"
+        scan_kwargs = {'FilterExpression': self.resident_filter(active_only)}
+        if fields:
+            # Filters see the whole item; the projection only trims what is returned
+            scan_kwargs.update(projection([*fields, 'resident_id']))
+        if cursor:
+            scan_kwargs['ExclusiveStartKey'] = decode_cursor(cursor, scope)
+        
+        items: List[Dict[str, Any]] = []
+        while len(items) < limit:
+            # Limit caps items evaluated, so a filtered page never overshoots
+            response = await table.scan(Limit=limit - len(items), **scan_kwargs)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        
+        next_cursor = None
+        if len(items) >= limit:
+            next_cursor = encode_cursor({'resident_id': items[-1]['resident_id']}, scope)
+        if fields:
+            return Page(items=load_projected(items, fields, RESIDENT_SUMMARY_FIELDS, ResidentSummary), next_cursor=next_cursor)
+        return Page(items=[ResidentProfile(**item) for item in items], next_cursor=next_cursor)
     
     async def update(self, resident_id: str, update_data: ResidentUpdate) -> Optional[ResidentProfile]:
-        """Update resident"""
-        table = await get_table(self.table_name)
+        """Update resident.
         
-        # Build update expression
-        update_expr = "SET updated_at = :updated_at"
-        expr_values = {':updated_at': datetime.utcnow().isoformat()}
+        Raises RoomOccupiedError if the update would move or reactivate the
+        resident into a room held by someone else.
         
-        for field, value in update_data.dict(exclude_unset=True).items():
-            if value is not None:
-                update_expr += f", {field} = :{field}"
-                expr_values[f':{field}'] = value
+        Which room locks to claim or release is decided from the resident's
+        room and active flag as this process last saw them, and the write
+        is conditional on both still holding. If another process changed
+        them meanwhile, the resident is re-read from the table and the
+        update retried, so locks always follow the stored room.
+        """
+        current = await self.get_by_id(resident_id)
+        if not current:
+            return None
+        
+        table = await get_table(self.table_name)
+        changes = {field: value for field, value in update_data.dict(exclude_unset=True).items() if value is not None}
         
         try:
-            response = await table.update_item(
-                Key={'resident_id': resident_id},
-                UpdateExpression=update_expr,
-                ExpressionAttributeValues=expr_values,
-                ReturnValues='ALL_NEW'
-            )
+            for attempt in range(STATUS_UPDATE_ATTEMPTS):
+                try:
+                    attributes = await self.apply_update(table, current, changes)
+                except ClientError as e:
+                    if not self.lost_race(e):
+                        raise
+                    response = await table.get_item(Key={'resident_id': resident_id}, ConsistentRead=True)
+                    if 'Item' not in response:
+                        return None
+                    current = ResidentProfile(**response['Item'])
+                    self.directory.upsert(current)
+                    continue
+                
+                resident = ResidentProfile(**attributes)
+                self.directory.upsert(resident)
+                return resident
             
-            return ResidentProfile(**response['Attributes'])
+            logger.error(f"Resident {resident_id} kept changing; gave up after {STATUS_UPDATE_ATTEMPTS} attempts")
+            return None
+        except RoomOccupiedError:
+            raise
         except Exception as e:
             logger.error(f"Error updating resident {resident_id}: {str(e)}")
             return None
     
+    async def apply_update(self, table, current: ResidentProfile, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Write `changes` with any room lock moves, conditional on `current`'s room and status"""
+        resident_id = current.resident_id
+        
+        update_expr = "SET updated_at = :updated_at"
+        expr_names = {'#room_number': 'room_number', '#active': 'active'}
+        expr_values = {
+            ':updated_at': datetime.utcnow().isoformat(),
+            ':expected_room': current.room_number,
+            ':expected_active': current.active
+        }
+        for field, value in changes.items():
+            update_expr += f", #{field} = :{field}"
+            expr_names[f'#{field}'] = field
+            expr_values[f':{field}'] = value
+        
+        # Room locks change when the resident moves, leaves or returns
+        new_room = changes.get('room_number', current.room_number)
+        new_active = changes.get('active', current.active)
+        held = current.active
+        moved = new_room != current.room_number
+        lock_items = []
+        if new_active and (not held or moved):
+            lock_items.append(self.claim_room(new_room, resident_id))
+        if held and (not new_active or moved):
+            lock_items.append(self.release_room(current.room_number, resident_id))
+        
+        update_kwargs = {
+            'Key': {'resident_id': resident_id},
+            'UpdateExpression': update_expr,
+            'ConditionExpression': 'attribute_exists(resident_id) AND #room_number = :expected_room '
+                                   'AND #active = :expected_active',
+            'ExpressionAttributeNames': expr_names,
+            'ExpressionAttributeValues': expr_values
+        }
+        
+        if not lock_items:
+            response = await table.update_item(ReturnValues='ALL_NEW', **update_kwargs)
+            return response['Attributes']
+        
+        await self.transact(table, lock_items + [{'Update': {'TableName': self.table_name, **update_kwargs}}], new_room)
+        response = await table.get_item(Key={'resident_id': resident_id}, ConsistentRead=True)
+        return response['Item']
+    
+    def lost_race(self, error: ClientError) -> bool:
+        """Whether a write failed only because the resident changed since it was read"""
+        code = error.response.get('Error', {}).get('Code')
+        if code == 'ConditionalCheckFailedException':
+            return True
+        reasons = error.response.get('CancellationReasons') or []
+        return code == 'TransactionCanceledException' and bool(reasons) \
+            and reasons[-1].get('Code') == 'ConditionalCheckFailed'
+    
     async def delete(self, resident_id: str) -> bool:
         """Delete resident (soft delete by setting active=False)"""
         update_data = ResidentUpdate(active=False)
         result = await self.update(resident_id, update_data)
         return result is not None
-
+    
+    def resident_filter(self, active_only: bool):
+        """Scan filter selecting resident items (never room locks)"""
+        return Attr('active').eq(True) if active_only else Attr('record_type').not_exists()
+    
+    def claim_room(self, room_number: str, resident_id: str) -> Dict[str, Any]:
+        """Transaction item taking the room lock; fails if another resident holds it"""
+        return {
+            'Put': {
+                'TableName': self.table_name,
+                'Item': {
+                    'resident_id': f"{ROOM_LOCK_PREFIX}{room_number}",
+                    'record_type': ROOM_LOCK_RECORD_TYPE,
+                    'locked_room': room_number,
+                    'owner_id': resident_id
+                },
+                'ConditionExpression': 'attribute_not_exists(resident_id) OR owner_id = :owner',
+                'ExpressionAttributeValues': {':owner': resident_id}
+            }
+        }
+    
+    def release_room(self, room_number: str, resident_id: str) -> Dict[str, Any]:
+        """Transaction item dropping the room lock if this resident holds it"""
+        return {
+            'Delete': {
+                'TableName': self.table_name,
+                'Key': {'resident_id': f"{ROOM_LOCK_PREFIX}{room_number}"},
+                'ConditionExpression': 'attribute_not_exists(resident_id) OR owner_id = :owner',
+                'ExpressionAttributeValues': {':owner': resident_id}
+            }
+        }
+    
+    async def transact(self, table, transact_items: List[Dict[str, Any]], room_number: str):
+        """Run a write transaction whose first item may be a room claim.
+        
+        A failed claim raises RoomOccupiedError, unless the resident write
+        at the end failed too: then the claim was decided from a stale
+        read, and the ClientError is raised for the caller to retry.
+        """
+        try:
+            await table.meta.client.transact_write_items(TransactItems=transact_items)
+        except ClientError as e:
+            reasons = e.response.get('CancellationReasons') or []
+            claimed = 'Put' in transact_items[0] and transact_items[0]['Put']['Item'].get('record_type') == ROOM_LOCK_RECORD_TYPE
+            stale = len(reasons) > 1 and reasons[-1].get('Code') == 'ConditionalCheckFailed'
+            if claimed and reasons and reasons[0].get('Code') == 'ConditionalCheckFailed' and not stale:
+                raise RoomOccupiedError(room_number)
+            raise
+    
+    async def backfill_room_locks(self) -> int:
+        """Create room locks for active residents written before locks existed.
+        
+        One-off migration; returns the number of locks created. Rooms that
+        are already double-booked are logged and left for an administrator.
+        """
+        table = await get_table(self.table_name)
+        
+        created = 0
+        for resident in await self.scan_all(active_only=True):
+            try:
+                await table.meta.client.transact_write_items(
+                    TransactItems=[self.claim_room(resident.room_number, resident.resident_id)]
+                )
+                created += 1
+            except ClientError as e:
+                logger.error(f"Could not lock room {resident.room_number} for {resident.resident_id}: {str(e)}")
+        
+        logger.info(f"Backfilled {created} room locks")
+        return created
 
 class UserRepository:
     """Repository for user operations"""
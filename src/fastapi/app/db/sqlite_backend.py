@@ -0,0 +1,475 @@
+"""
+Embedded SQLite storage backend
+
+Implements the subset of the DynamoDB Table API the repositories use
+(put/get/update/delete_item, query, scan and the client's
+transact_write_items, batch_write_item, batch_get_item and
+update_time_to_live) on a single SQLite database, for load tests and
+small single-site installs that do not want DynamoDB or a DynamoDB Local
+container.
+
+Each table stores items in DynamoDB's typed JSON form, so numbers come
+back as Decimal exactly as they do from DynamoDB, with one column pair per
+key schema (table key and each GSI) and a SQLite index on each GSI. Calls
+run inline on the event loop: they are microseconds against an in-memory
+or local database, far less than a thread hand-off would cost.
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+from . import expressions
+
+logger = logging.getLogger(__name__)
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+_KEY_OPERATORS = {'=', '<', '<=', '>', '>='}
+
+
+def client_error(code: str, message: str, operation: str, **extra) -> ClientError:
+    """A botocore ClientError shaped like the one DynamoDB would return"""
+    return ClientError({'Error': {'Code': code, 'Message': message}, **extra}, operation)
+
+
+def encode_item(item: Dict[str, Any]) -> str:
+    return json.dumps({name: _serializer.serialize(value) for name, value in item.items()})
+
+
+def decode_item(data: str) -> Dict[str, Any]:
+    return {name: _deserializer.deserialize(value) for name, value in json.loads(data).items()}
+
+
+def column_value(value: Any) -> Any:
+    """Key attribute as stored in a SQLite column (S sorts as text, N as number)"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, Decimal)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+class KeySchema:
+    """Hash and optional range attribute of the table key or a GSI"""
+
+    def __init__(self, position: int, name: Optional[str], key_schema: List[Dict[str, str]]):
+        self.position = position
+        self.name = name
+        self.hash_key = next(k['AttributeName'] for k in key_schema if k['KeyType'] == 'HASH')
+        self.range_key = next((k['AttributeName'] for k in key_schema if k['KeyType'] == 'RANGE'), None)
+        self.hash_column = f"h{position}"
+        self.range_column = f"r{position}"
+
+    @property
+    def attributes(self) -> List[str]:
+        return [self.hash_key] + ([self.range_key] if self.range_key else [])
+
+    def columns(self, item: Dict[str, Any]) -> Tuple[Any, Any]:
+        """(hash, range) column values; both None when the item is not in this index"""
+        hash_value = column_value(item.get(self.hash_key))
+        range_value = column_value(item.get(self.range_key)) if self.range_key else None
+        if hash_value is None or (self.range_key and range_value is None):
+            return None, None
+        return hash_value, range_value
+
+
+class SQLiteTable:
+    """A DynamoDB-style table stored in one SQLite table"""
+
+    def __init__(self, store: "SQLiteStore", definition: Dict[str, Any]):
+        self.store = store
+        self.name = definition['TableName']
+        self.key = KeySchema(0, None, definition['KeySchema'])
+        self.indexes = {
+            index['IndexName']: KeySchema(position, index['IndexName'], index['KeySchema'])
+            for position, index in enumerate(definition.get('GlobalSecondaryIndexes', []), start=1)
+        }
+        self.meta = SimpleNamespace(client=store.client)
+        # Set by UpdateTimeToLive; expired items are deleted by SQLiteStore.expire()
+        self.ttl_attribute: Optional[str] = None
+
+    @property
+    def table_name(self) -> str:
+        return self.name
+
+    @property
+    def schemas(self) -> List[KeySchema]:
+        return [self.key] + list(self.indexes.values())
+
+    @property
+    def sql_name(self) -> str:
+        return '"' + self.name.replace('"', '""') + '"'
+
+    def create(self):
+        """Create the SQLite table and indexes, adding columns for new GSIs"""
+        connection = self.store.connection
+        columns = ', '.join(f"{schema.hash_column}, {schema.range_column}" for schema in self.schemas)
+        connection.execute(f"CREATE TABLE IF NOT EXISTS {self.sql_name} (pk TEXT PRIMARY KEY, item TEXT NOT NULL, {columns})")
+
+        existing = {row[1] for row in connection.execute(f"PRAGMA table_info({self.sql_name})")}
+        added = [schema for schema in self.schemas if schema.hash_column not in existing]
+        for schema in added:
+            connection.execute(f"ALTER TABLE {self.sql_name} ADD COLUMN {schema.hash_column}")
+            connection.execute(f"ALTER TABLE {self.sql_name} ADD COLUMN {schema.range_column}")
+        if added:
+            logger.info(f"Backfilling {len(added)} new index(es) on {self.name}")
+            for pk, data in connection.execute(f"SELECT pk, item FROM {self.sql_name}").fetchall():
+                self.write(decode_item(data))
+
+        for schema in self.indexes.values():
+            index_name = '"' + f"{self.name}__{schema.name}".replace('"', '""') + '"'
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON {self.sql_name} "
+                f"({schema.hash_column}, {schema.range_column}, pk)"
+            )
+
+    # Row access
+
+    def primary_key(self, key: Dict[str, Any], operation: str) -> str:
+        try:
+            values = [key[name] for name in self.key.attributes]
+        except KeyError as e:
+            raise client_error('ValidationException', f"Missing key attribute {e}", operation)
+        return json.dumps([_serializer.serialize(value) for value in values], sort_keys=True)
+
+    def read(self, key: Dict[str, Any], operation: str = 'GetItem') -> Optional[Dict[str, Any]]:
+        row = self.store.connection.execute(
+            f"SELECT item FROM {self.sql_name} WHERE pk = ?", (self.primary_key(key, operation),)
+        ).fetchone()
+        return decode_item(row[0]) if row else None
+
+    def write(self, item: Dict[str, Any], operation: str = 'PutItem'):
+        columns = ['pk', 'item']
+        values = [self.primary_key(item, operation), encode_item(item)]
+        for schema in self.schemas:
+            columns.extend([schema.hash_column, schema.range_column])
+            values.extend(schema.columns(item))
+        placeholders = ', '.join('?' for _ in columns)
+        self.store.connection.execute(
+            f"INSERT OR REPLACE INTO {self.sql_name} ({', '.join(columns)}) VALUES ({placeholders})", values
+        )
+
+    def remove(self, key: Dict[str, Any], operation: str = 'DeleteItem'):
+        self.store.connection.execute(
+            f"DELETE FROM {self.sql_name} WHERE pk = ?", (self.primary_key(key, operation),)
+        )
+
+    def key_of(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return {name: item[name] for name in self.key.attributes}
+
+    def expire(self, now: float) -> int:
+        """Delete items whose TTL attribute is at or before `now`"""
+        if not self.ttl_attribute:
+            return 0
+        path = '$."' + self.ttl_attribute.replace('"', '\\"') + '".N'
+        cursor = self.store.connection.execute(
+            f"DELETE FROM {self.sql_name} WHERE CAST(json_extract(item, ?) AS REAL) <= ?", (path, now)
+        )
+        return cursor.rowcount
+
+    # Conditions and updates, shared with transactions
+
+    def check(self, current: Optional[Dict[str, Any]], kwargs: Dict[str, Any], operation: str):
+        """Raise ConditionalCheckFailedException unless ConditionExpression holds"""
+        condition = kwargs.get('ConditionExpression')
+        if condition is None:
+            return
+        expression, names, values = expressions.render(
+            condition, kwargs.get('ExpressionAttributeNames'), kwargs.get('ExpressionAttributeValues')
+        )
+        if not expressions.evaluate(expressions.parse_condition(expression, names), current or {}, values):
+            raise client_error('ConditionalCheckFailedException', 'The conditional request failed', operation)
+
+    def updated(self, key: Dict[str, Any], current: Optional[Dict[str, Any]],
+                kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """New item after UpdateExpression, and the top-level attributes it touched"""
+        item = dict(current) if current else dict(key)
+        names = dict(kwargs.get('ExpressionAttributeNames') or {})
+        values = dict(kwargs.get('ExpressionAttributeValues') or {})
+        actions = expressions.parse_update(kwargs.get('UpdateExpression', ''), names)
+        expressions.apply_update(actions, item, values)
+        for name in self.key.attributes:
+            if item.get(name) != key[name]:
+                raise client_error('ValidationException', f"Cannot update key attribute {name}", 'UpdateItem')
+        return item, list(dict.fromkeys(action[1][0] for action in actions))
+
+    def projected(self, item: Dict[str, Any], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        projection = kwargs.get('ProjectionExpression')
+        if not projection:
+            return item
+        paths = expressions.parse_projection(projection, kwargs.get('ExpressionAttributeNames') or {})
+        return expressions.project(item, paths)
+
+    # Table API
+
+    async def load(self):
+        """Tables always exist once the store has created them"""
+
+    async def put_item(self, Item: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        current = self.read(Item, 'PutItem')
+        self.check(current, kwargs, 'PutItem')
+        self.write(dict(Item))
+        if kwargs.get('ReturnValues') == 'ALL_OLD' and current:
+            return {'Attributes': current}
+        return {}
+
+    async def get_item(self, Key: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        item = self.read(Key)
+        return {'Item': self.projected(item, kwargs)} if item else {}
+
+    async def update_item(self, Key: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        current = self.read(Key, 'UpdateItem')
+        self.check(current, kwargs, 'UpdateItem')
+        item, touched = self.updated(Key, current, kwargs)
+        self.write(item, 'UpdateItem')
+
+        return_values = kwargs.get('ReturnValues', 'NONE')
+        if return_values == 'ALL_NEW':
+            return {'Attributes': item}
+        if return_values == 'ALL_OLD':
+            return {'Attributes': current} if current else {}
+        if return_values == 'UPDATED_NEW':
+            return {'Attributes': {name: item[name] for name in touched if name in item}}
+        if return_values == 'UPDATED_OLD' and current:
+            return {'Attributes': {name: current[name] for name in touched if name in current}}
+        return {}
+
+    async def delete_item(self, Key: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        current = self.read(Key, 'DeleteItem')
+        self.check(current, kwargs, 'DeleteItem')
+        self.remove(Key)
+        if kwargs.get('ReturnValues') == 'ALL_OLD' and current:
+            return {'Attributes': current}
+        return {}
+
+    async def query(self, KeyConditionExpression, **kwargs) -> Dict[str, Any]:
+        schema = self.schema_for(kwargs.get('IndexName'), 'Query')
+        expression, names, values = expressions.render(
+            KeyConditionExpression, kwargs.get('ExpressionAttributeNames'),
+            kwargs.get('ExpressionAttributeValues'), is_key_condition=True
+        )
+        tree = expressions.parse_condition(expression, names)
+        where, params = self.key_condition(schema, tree, values)
+        order = ([schema.range_column] if schema.range_key else []) + ['pk']
+        return self.select(schema, where, params, order, kwargs, 'Query')
+
+    async def scan(self, **kwargs) -> Dict[str, Any]:
+        schema = self.schema_for(kwargs.get('IndexName'), 'Scan')
+        if schema is self.key:
+            return self.select(schema, [], [], ['pk'], kwargs, 'Scan')
+        # GSIs are sparse: only items carrying the index keys are in them
+        order = [schema.hash_column] + ([schema.range_column] if schema.range_key else []) + ['pk']
+        return self.select(schema, [f"{schema.hash_column} IS NOT NULL"], [], order, kwargs, 'Scan')
+
+    # Query planning
+
+    def schema_for(self, index_name: Optional[str], operation: str) -> KeySchema:
+        if index_name is None:
+            return self.key
+        if index_name not in self.indexes:
+            raise client_error('ValidationException', f"Unknown index {index_name} on {self.name}", operation)
+        return self.indexes[index_name]
+
+    def key_condition(self, schema: KeySchema, tree, values: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        """Translate a key condition (hash equality, optional range condition) to SQL"""
+        leaves = [tree[1], tree[2]] if tree[0] == 'and' else [tree]
+        where, params = [], []
+        has_hash = False
+        for leaf in leaves:
+            kind = leaf[0]
+            target = leaf[2][0] if kind == 'call' else leaf[1] if kind == 'between' else leaf[2] if kind == 'cmp' else None
+            attribute = target[1][0] if target and target[0] == 'path' else None
+            if attribute == schema.hash_key and kind == 'cmp' and leaf[1] == '=':
+                where.append(f"{schema.hash_column} = ?")
+                params.append(column_value(expressions.operand_value(leaf[3], {}, values)))
+                has_hash = True
+            elif attribute is not None and attribute == schema.range_key and kind == 'cmp' and leaf[1] in _KEY_OPERATORS:
+                where.append(f"{schema.range_column} {leaf[1]} ?")
+                params.append(column_value(expressions.operand_value(leaf[3], {}, values)))
+            elif attribute is not None and attribute == schema.range_key and kind == 'between':
+                where.append(f"{schema.range_column} BETWEEN ? AND ?")
+                params.extend([column_value(expressions.operand_value(leaf[2], {}, values)),
+                               column_value(expressions.operand_value(leaf[3], {}, values))])
+            elif attribute is not None and attribute == schema.range_key and kind == 'call' and leaf[1] == 'begins_with':
+                prefix = expressions.operand_value(leaf[2][1], {}, values)
+                where.append(f"substr({schema.range_column}, 1, ?) = ?")
+                params.extend([len(prefix), prefix])
+            else:
+                has_hash = False
+                break
+        if not has_hash:
+            raise client_error('ValidationException', 'Query key condition not supported', 'Query')
+        return where, params
+
+    def select(self, schema: KeySchema, where: List[str], params: List[Any], order: List[str],
+               kwargs: Dict[str, Any], operation: str) -> Dict[str, Any]:
+        """Read one page in key order, then filter and project as DynamoDB does"""
+        forward = kwargs.get('ScanIndexForward', True)
+        start = kwargs.get('ExclusiveStartKey')
+        if start:
+            start_values = {'pk': self.primary_key(start, operation)}
+            start_values[schema.hash_column], start_values[schema.range_column] = schema.columns(start)
+            where = where + [f"({', '.join(order)}) {'>' if forward else '<'} ({', '.join('?' for _ in order)})"]
+            params = params + [start_values[column] for column in order]
+
+        limit = kwargs.get('Limit')
+        sql = f"SELECT item FROM {self.sql_name}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY " + ", ".join(f"{column} {'ASC' if forward else 'DESC'}" for column in order)
+        if limit is not None:
+            # One extra row tells us whether there is another page
+            sql += f" LIMIT {int(limit) + 1}"
+        rows = self.store.connection.execute(sql, params).fetchall()
+
+        more = limit is not None and len(rows) > limit
+        evaluated = [decode_item(row[0]) for row in (rows[:limit] if more else rows)]
+
+        items = evaluated
+        if kwargs.get('FilterExpression') is not None:
+            expression, names, values = expressions.render(
+                kwargs['FilterExpression'], kwargs.get('ExpressionAttributeNames'), kwargs.get('ExpressionAttributeValues')
+            )
+            tree = expressions.parse_condition(expression, names)
+            items = [item for item in evaluated if expressions.evaluate(tree, item, values)]
+
+        response: Dict[str, Any] = {'Count': len(items), 'ScannedCount': len(evaluated)}
+        if kwargs.get('Select') != 'COUNT':
+            response['Items'] = [self.projected(item, kwargs) for item in items]
+        if more:
+            last = evaluated[-1]
+            response['LastEvaluatedKey'] = {
+                name: last[name] for name in dict.fromkeys(self.key.attributes + schema.attributes)
+            }
+        return response
+
+
+class SQLiteClient:
+    """The multi-item operations DynamoDB exposes on the low-level client"""
+
+    def __init__(self, store: "SQLiteStore"):
+        self.store = store
+
+    async def transact_write_items(self, TransactItems: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """All-or-nothing writes; every condition is checked before anything is written"""
+        planned, reasons, failed = [], [], False
+        for entry in TransactItems:
+            (action, request), = entry.items()
+            table = self.store.table(request['TableName'])
+            key = table.key_of(request['Item']) if action == 'Put' else request['Key']
+            current = table.read(key, 'TransactWriteItems')
+            try:
+                table.check(current, request, 'TransactWriteItems')
+                reasons.append({'Code': 'None'})
+            except ClientError:
+                reasons.append({'Code': 'ConditionalCheckFailed', 'Message': 'The conditional request failed'})
+                failed = True
+                continue
+            if action == 'Put':
+                planned.append((table.write, dict(request['Item'])))
+            elif action == 'Update':
+                planned.append((table.write, table.updated(key, current, request)[0]))
+            elif action == 'Delete':
+                planned.append((table.remove, key))
+
+        if failed:
+            codes = ', '.join(reason['Code'] for reason in reasons)
+            raise client_error(
+                'TransactionCanceledException', f"Transaction cancelled, please refer cancellation reasons for specific reasons [{codes}]",
+                'TransactWriteItems', CancellationReasons=reasons
+            )
+
+        with self.store.transaction():
+            for apply, argument in planned:
+                apply(argument)
+        return {}
+
+    async def batch_write_item(self, RequestItems: Dict[str, List[Dict[str, Any]]], **kwargs) -> Dict[str, Any]:
+        with self.store.transaction():
+            for table_name, requests in RequestItems.items():
+                table = self.store.table(table_name)
+                for request in requests:
+                    if 'PutRequest' in request:
+                        table.write(dict(request['PutRequest']['Item']), 'BatchWriteItem')
+                    else:
+                        table.remove(request['DeleteRequest']['Key'], 'BatchWriteItem')
+        return {'UnprocessedItems': {}}
+
+    async def update_time_to_live(self, TableName: str, TimeToLiveSpecification: Dict[str, Any],
+                                  **kwargs) -> Dict[str, Any]:
+        table = self.store.table(TableName)
+        enabled = TimeToLiveSpecification.get('Enabled', False)
+        table.ttl_attribute = TimeToLiveSpecification['AttributeName'] if enabled else None
+        return {'TimeToLiveSpecification': TimeToLiveSpecification}
+
+    async def batch_get_item(self, RequestItems: Dict[str, Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        responses = {}
+        for table_name, request in RequestItems.items():
+            table = self.store.table(table_name)
+            found = (table.read(key, 'BatchGetItem') for key in request['Keys'])
+            responses[table_name] = [table.projected(item, request) for item in found if item]
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+
+class SQLiteStore:
+    """One SQLite database holding every table"""
+
+    def __init__(self, path: str = ':memory:'):
+        # Autocommit; multi-item writes open explicit transactions
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        if path != ':memory:':
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.client = SQLiteClient(self)
+        self.tables: Dict[str, SQLiteTable] = {}
+
+    def create_table(self, definition: Dict[str, Any]) -> SQLiteTable:
+        table = SQLiteTable(self, definition)
+        with self.transaction():
+            table.create()
+        self.tables[table.name] = table
+        return table
+
+    def table(self, table_name: str) -> SQLiteTable:
+        table = self.tables.get(table_name)
+        if table is None:
+            raise client_error('ResourceNotFoundException', f"Requested resource not found: {table_name}", 'DescribeTable')
+        return table
+
+    def transaction(self):
+        return _Transaction(self.connection)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Delete expired items from tables with TTL enabled.
+
+        DynamoDB does this in the background; here it runs when called.
+        """
+        now = time.time() if now is None else now
+        with self.transaction():
+            return sum(table.expire(now) for table in self.tables.values())
+
+    def close(self):
+        self.connection.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -0,0 +1,88 @@
+"""
+Storage backend selection
+
+Repositories talk to tables through get_table(); STORAGE_BACKEND picks
+what is behind it. "dynamodb" (the default) uses the shared aioboto3
+resource, "sqlite" an embedded SQLite database at SQLITE_PATH whose
+tables speak the same Table API. The SQLite tables are created at startup.
+
+DynamoDB deletes items past their TTL in the background; SQLite has no
+background sweeper, so expire_items() does it on demand (the archive job
+calls it after each run).
+"""
+
+import logging
+from typing import Optional
+
+from ..core.config import settings
+from .dynamodb import close_dynamodb, get_table as get_dynamodb_table, init_dynamodb, table_definitions
+from .dynamodb import time_to_live_specifications
+from .sqlite_backend import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKENDS = ('dynamodb', 'sqlite')
+
+# Embedded store when STORAGE_BACKEND is "sqlite"
+_sqlite_store: Optional[SQLiteStore] = None
+
+
+def storage_backend() -> str:
+    backend = settings.STORAGE_BACKEND.lower()
+    if backend not in STORAGE_BACKENDS:
+        raise RuntimeError(f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r}, expected one of {STORAGE_BACKENDS}")
+    return backend
+
+
+async def init_storage():
+    """Initialize the configured storage backend"""
+    global _sqlite_store
+
+    if storage_backend() == 'dynamodb':
+        await init_dynamodb()
+        return
+
+    if _sqlite_store is not None:
+        return
+
+    store = SQLiteStore(settings.SQLITE_PATH)
+    for definition in table_definitions():
+        store.create_table(definition)
+    for table_name, ttl in time_to_live_specifications().items():
+        await store.client.update_time_to_live(TableName=table_name, TimeToLiveSpecification=ttl)
+    _sqlite_store = store
+    logger.info(f"SQLite storage initialized at {settings.SQLITE_PATH}")
+
+
+async def close_storage():
+    """Release the configured storage backend"""
+    global _sqlite_store
+
+    if storage_backend() == 'dynamodb':
+        await close_dynamodb()
+        return
+
+    store = _sqlite_store
+    _sqlite_store = None
+    if store is not None:
+        store.close()
+        logger.info("SQLite storage closed")
+
+
+async def get_table(table_name: str):
+    """Get a table handle from the configured backend"""
+    if storage_backend() == 'dynamodb':
+        return await get_dynamodb_table(table_name)
+    if _sqlite_store is None:
+        raise RuntimeError("Storage not initialized. Call init_storage() first.")
+    return _sqlite_store.table(table_name)
+
+
+async def expire_items() -> int:
+    """Delete items past their TTL where the backend does not do it itself"""
+    if storage_backend() == 'dynamodb' or _sqlite_store is None:
+        return 0
+    expired = _sqlite_store.expire()
+    if expired:
+        logger.info(f"Expired {expired} items past their TTL")
+    return expired
@@ -23,9 +23,9 @@ async def lifespan(app: FastAPI):
     setup_logging()
     logging.info("Starting Alexa Plus Chatbot FastAPI backend")
     
-    # Initialize database connections
-    from .db.dynamodb import init_dynamodb
-    await init_dynamodb()
+    # Initialize the storage backend
+    from .db.storage import init_storage
+    await init_storage()
     
     # Initialize SNS client
     from .services.sns import init_sns
@@ -35,6 +35,12 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logging.info("Shutting down Alexa Plus Chatbot FastAPI backend")
+    
+    # Release pooled AWS connections and storage
+    from .services.sns import close_sns
+    from .db.storage import close_storage
+    await close_sns()
+    await close_storage()
 
 
 def create_application() -> FastAPI:
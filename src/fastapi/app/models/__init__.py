@@ -2,22 +2,34 @@
 Data models for the Alexa Plus Chatbot system
 """
 
-from .call_event import CallEvent, CallEventCreate, CallEventUpdate
-from .resident import ResidentProfile, ResidentCreate, ResidentUpdate
+from .call_event import CallEvent, CallEventCreate, CallEventUpdate, CallEventSummary
+from .call_event import CallEventBatchItem, CallEventBatchCreate, CallEventBatchItemResult, CallEventBatchResult
+from .resident import ResidentProfile, ResidentCreate, ResidentUpdate, ResidentSummary
 from .user import User, UserCreate, UserUpdate, Token, TokenData
-from .system_status import SystemStatus
+from .system_status import SystemStatus, ResponseTimeStats, TimeSeries, TimeSeriesPoint
+from .pagination import Page
 
 __all__ = [
     "CallEvent",
     "CallEventCreate", 
     "CallEventUpdate",
+    "CallEventSummary",
+    "CallEventBatchItem",
+    "CallEventBatchCreate",
+    "CallEventBatchItemResult",
+    "CallEventBatchResult",
     "ResidentProfile",
     "ResidentCreate",
     "ResidentUpdate",
+    "ResidentSummary",
     "User",
     "UserCreate",
     "UserUpdate",
     "Token",
     "TokenData",
-    "SystemStatus"
+    "SystemStatus",
+    "ResponseTimeStats",
+    "TimeSeries",
+    "TimeSeriesPoint",
+    "Page"
 ]
\ No newline at end of file
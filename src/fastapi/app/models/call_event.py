@@ -2,11 +2,13 @@
 Call Event data models
 """
 
-from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, model_validator
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
 from enum import Enum
 
+from ..core.ids import uuid7_lower_bound, uuid7_time
+
 
 class CallEventType(str, Enum):
     """Types of call events"""
@@ -35,11 +37,65 @@ class CallEventCreate(CallEventBase):
     pass
 
 
+class CallEventBatchItem(CallEventCreate):
+    """A queued call event pushed in bulk, e.g. after a ward reconnects.
+    
+    A client-assigned event_id must be a UUIDv7 minted at the call's
+    timestamp: IDs are the day-index sort key, and time-range reads
+    depend on them sorting by creation time.
+    """
+    event_id: Optional[str] = Field(
+        None, description="Client-assigned UUIDv7; resending an ID already stored leaves that call unchanged"
+    )
+    timestamp: Optional[datetime] = Field(
+        None, description="When the call was made; defaults to the event_id's time, else time of ingestion"
+    )
+    
+    @model_validator(mode='after')
+    def check_event_id(self) -> "CallEventBatchItem":
+        if self.event_id is None:
+            return self
+        minted = uuid7_time(self.event_id)
+        if minted is None:
+            raise ValueError("event_id must be a lowercase UUIDv7")
+        if self.timestamp is None:
+            self.timestamp = minted
+        else:
+            timestamp = self.timestamp
+            if timestamp.tzinfo:
+                timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+            if uuid7_time(uuid7_lower_bound(timestamp)) != minted:
+                raise ValueError("event_id must be a UUIDv7 minted at the event's timestamp")
+        return self
+
+
+class CallEventBatchCreate(BaseModel):
+    """Model for bulk call event ingestion"""
+    events: List[CallEventBatchItem] = Field(..., min_length=1, max_length=1000, description="Events to create")
+
+
+class CallEventBatchItemResult(BaseModel):
+    """Outcome for one event of a batch, by its position in the request"""
+    index: int
+    event_id: str
+    created: bool
+    existing: bool = Field(False, description="Already stored by an earlier request and left unchanged")
+    error: Optional[str] = None
+
+
+class CallEventBatchResult(BaseModel):
+    """Per-item report for a bulk ingestion request"""
+    created: int
+    existing: int = 0
+    failed: int
+    results: List[CallEventBatchItemResult]
+
+
 class CallEventUpdate(BaseModel):
     """Model for updating call events"""
     status: Optional[CallEventStatus] = None
     caregiver_id: Optional[str] = None
-    response_time: Optional[int] = None
+    response_time: Optional[int] = Field(None, description="Ignored when acknowledging; computed server-side")
     metadata: Optional[Dict[str, Any]] = None
 
 
@@ -50,6 +106,7 @@ class CallEvent(CallEventBase):
     status: CallEventStatus = Field(default=CallEventStatus.ACTIVE, description="Current event status")
     caregiver_id: Optional[str] = Field(None, description="ID of responding caregiver")
     response_time: Optional[int] = Field(None, description="Time to acknowledgment in seconds")
+    acknowledged_at: Optional[datetime] = Field(None, description="When the call was acknowledged")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -57,4 +114,19 @@ class CallEvent(CallEventBase):
         from_attributes = True
         json_encoders = {
             datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
+        }
+
+
+class CallEventSummary(BaseModel):
+    """Call event fields shown in lists, read with a projection.
+    
+    Leaves out metadata and the bookkeeping timestamps so polling
+    dashboards move and validate far less per event.
+    """
+    event_id: str
+    resident_id: str
+    event_type: CallEventType
+    status: CallEventStatus = CallEventStatus.ACTIVE
+    timestamp: datetime
+    message: Optional[str] = None
+    caregiver_id: Optional[str] = None
\ No newline at end of file
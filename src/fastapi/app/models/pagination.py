@@ -0,0 +1,14 @@
+"""
+Pagination data models
+"""
+
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class Page(BaseModel, Generic[T]):
+    """One page of a list endpoint"""
+    items: List[T] = Field(default_factory=list, description="Items on this page")
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page; null on the last page")
@@ -44,4 +44,17 @@ class ResidentProfile(ResidentBase):
         from_attributes = True
         json_encoders = {
             datetime: lambda v: v.isoformat()
-        }
\ No newline at end of file
+        }
+
+
+class ResidentSummary(BaseModel):
+    """Resident fields shown in lists, read with a projection.
+    
+    Leaves out emergency contacts and preferences.
+    """
+    resident_id: str
+    name: str
+    room_number: str
+    device_id: Optional[str] = None
+    care_level: str = "standard"
+    active: bool = True
\ No newline at end of file
@@ -49,4 +49,34 @@ class SystemOverview(BaseModel):
     last_updated: datetime
     active_alerts: int
     total_calls_today: int
-    active_residents: int
\ No newline at end of file
+    active_residents: int
+
+
+class ResponseTimeStats(BaseModel):
+    """Acknowledgement response times aggregated over a period"""
+    count: int = Field(0, description="Acknowledged calls")
+    total_seconds: int = Field(0, description="Sum of response times")
+    average_seconds: Optional[float] = Field(None, description="Mean response time; null with no acknowledgements")
+    p50_seconds: Optional[float] = None
+    p90_seconds: Optional[float] = None
+    p95_seconds: Optional[float] = None
+    histogram: Dict[str, int] = Field(default_factory=dict, description="Counts by bucket upper bound (le_<seconds>)")
+
+
+class TimeSeriesPoint(BaseModel):
+    """Calls and response times for one step of a time series"""
+    start: datetime = Field(..., description="Start of the step (UTC)")
+    calls: int = 0
+    by_type: Dict[str, int] = Field(default_factory=dict)
+    acknowledged: int = Field(0, description="Calls from this step acknowledged so far")
+    average_response_seconds: Optional[float] = None
+    p50_response_seconds: Optional[float] = None
+    p95_response_seconds: Optional[float] = None
+
+
+class TimeSeries(BaseModel):
+    """Downsampled series built from hourly rollups"""
+    start: datetime
+    end: datetime
+    step_seconds: int
+    points: List[TimeSeriesPoint]
\ No newline at end of file
@@ -2,10 +2,11 @@
 Service layer for external integrations
 """
 
-from .sns import SNSService, init_sns, get_sns_service
+from .sns import SNSService, init_sns, close_sns, get_sns_service
 
 __all__ = [
     "SNSService",
     "init_sns", 
+    "close_sns",
     "get_sns_service"
 ]
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+Call history archive
+
+Resolved calls older than ARCHIVE_AFTER_DAYS are moved out of the calls
+table into gzip-compressed JSON Lines files under ARCHIVE_DIR, one
+directory per UTC day:
+
+    <ARCHIVE_DIR>/calls/day=2026-01-31/part-<id>.jsonl.gz
+
+Each run writes a new part for every day it archives, then sets the TTL
+attribute on those calls so DynamoDB deletes them from the hot table.
+Parts are written under a temporary name and renamed once on disk, so a
+crash leaves a whole part or none; a crash between writing a part and
+marking its calls means the next run archives them again, and the reader
+drops the duplicates.
+
+Usage:
+    python -m src.fastapi.app.services.archive archive [--older-than DAYS] [--lookback DAYS]
+    python -m src.fastapi.app.services.archive read --from 2026-01-01 --to 2026-01-31 [--resident-id ID]
+"""
+
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from ..core.config import settings
+from ..core.ids import uuid7
+from ..db.repositories import DAY_FORMAT, CallEventRepository
+from ..db.storage import close_storage, expire_items, init_storage
+from ..models import CallEvent
+
+logger = logging.getLogger(__name__)
+
+PART_PATTERN = 'part-*.jsonl.gz'
+
+
+class CallArchive:
+    """Day-partitioned call history files"""
+    
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.ARCHIVE_DIR) / 'calls'
+    
+    def partition(self, day: str) -> Path:
+        return self.root / f"day={day}"
+    
+    def days(self) -> List[str]:
+        """Archived UTC days, oldest first"""
+        if not self.root.is_dir():
+            return []
+        return sorted(path.name[len('day='):] for path in self.root.glob('day=*') if path.is_dir())
+    
+    def write(self, day: str, events: List[CallEvent]) -> Path:
+        """Write one day's calls as a new part; returns its path"""
+        partition = self.partition(day)
+        partition.mkdir(parents=True, exist_ok=True)
+        path = partition / f"part-{uuid7()}.jsonl.gz"
+        temporary = partition / f".{path.name}.tmp"
+        
+        with open(temporary, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as compressed:
+                for event in events:
+                    compressed.write(event.model_dump_json().encode('utf-8') + b'\n')
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(temporary, path)
+        return path
+    
+    def read_day(self, day: str) -> List[CallEvent]:
+        """One day's archived calls in time order, duplicates across parts dropped"""
+        events: Dict[str, CallEvent] = {}
+        for path in sorted(self.partition(day).glob(PART_PATTERN)):
+            with gzip.open(path, 'rt', encoding='utf-8') as lines:
+                for line in lines:
+                    if line.strip():
+                        event = CallEvent.model_validate_json(line)
+                        events[event.event_id] = event
+        return sorted(events.values(), key=lambda event: (event.timestamp, event.event_id))
+    
+    def read(self, start: date, end: date, resident_id: Optional[str] = None) -> Iterator[CallEvent]:
+        """Archived calls from UTC days start to end inclusive, oldest first.
+        
+        Reads one day's partition at a time, so memory is bounded by the
+        busiest day rather than the range.
+        """
+        first, last = start.strftime(DAY_FORMAT), end.strftime(DAY_FORMAT)
+        for day in self.days():
+            if first <= day <= last:
+                for event in self.read_day(day):
+                    if resident_id is None or event.resident_id == resident_id:
+                        yield event
+
+
+async def archive_calls(archive: Optional[CallArchive] = None, repo: Optional[CallEventRepository] = None,
+                        older_than_days: Optional[int] = None, lookback_days: Optional[int] = None) -> Dict[str, int]:
+    """Move resolved calls from days older than `older_than_days` into the archive.
+    
+    Checks the `lookback_days` whole UTC days before the cutoff, one
+    day-index partition each; widen the lookback for the first run
+    against a longer history. Returns how many calls were archived, how
+    many were marked for expiry and how many expired items were deleted.
+    """
+    archive = archive or CallArchive()
+    repo = repo or CallEventRepository()
+    older_than_days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    lookback_days = settings.ARCHIVE_LOOKBACK_DAYS if lookback_days is None else lookback_days
+    
+    # The newest day whose calls are all at least older_than_days old
+    newest = (datetime.utcnow() - timedelta(days=older_than_days)).date() - timedelta(days=1)
+    archived = marked = 0
+    for offset in range(lookback_days):
+        day = (newest - timedelta(days=offset)).strftime(DAY_FORMAT)
+        events = await repo.get_archivable(day)
+        if not events:
+            continue
+        
+        path = archive.write(day, events)
+        archived += len(events)
+        marked += await repo.mark_archived([event.event_id for event in events], int(time.time()))
+        logger.info(f"Archived {len(events)} calls from {day} to {path}")
+    
+    expired = await expire_items()
+    return {'archived': archived, 'marked': marked, 'expired': expired}
+
+
+async def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    archive_parser = commands.add_parser('archive', help='move old resolved calls into the archive')
+    archive_parser.add_argument('--older-than', type=int, default=settings.ARCHIVE_AFTER_DAYS, help='days')
+    archive_parser.add_argument('--lookback', type=int, default=settings.ARCHIVE_LOOKBACK_DAYS,
+                                help='days before the cutoff to check')
+    
+    read_parser = commands.add_parser('read', help='print archived calls as JSON Lines')
+    read_parser.add_argument('--from', dest='start', type=date.fromisoformat, required=True)
+    read_parser.add_argument('--to', dest='end', type=date.fromisoformat, required=True)
+    read_parser.add_argument('--resident-id')
+    args = parser.parse_args(argv)
+    
+    if args.command == 'read':
+        for event in CallArchive().read(args.start, args.end, args.resident_id):
+            sys.stdout.write(event.model_dump_json() + '\n')
+        return
+    
+    await init_storage()
+    try:
+        result = await archive_calls(older_than_days=args.older_than, lookback_days=args.lookback)
+        logger.info(f"Archive run complete: {result}")
+    finally:
+        await close_storage()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+    asyncio.run(main())
@@ -5,16 +5,19 @@ SNS (Simple Notification Service) integration
 import json
 import logging
 import aioboto3
+from contextlib import AsyncExitStack
 from typing import Dict, Any, Optional
 from datetime import datetime
 
 from ..core.config import settings
+from ..db.dynamodb import build_client_config
 from ..websocket.manager import broadcast_call_event, broadcast_system_status
 
 logger = logging.getLogger(__name__)
 
-# Global SNS client
+# Global SNS client, entered for the lifetime of the application
 _sns_client = None
+_client_stack: Optional[AsyncExitStack] = None
 
 
 class SNSService:
@@ -146,14 +149,18 @@ class SNSService:
 
 async def init_sns():
     """Initialize SNS client"""
-    global _sns_client
+    global _sns_client, _client_stack
+    
+    if _sns_client is not None:
+        return
     
     try:
         session = aioboto3.Session()
         
         # Configure SNS client
         sns_config = {
-            'region_name': settings.AWS_REGION
+            'region_name': settings.AWS_REGION,
+            'config': build_client_config()
         }
         
         # Add credentials if provided
@@ -163,7 +170,9 @@ async def init_sns():
                 'aws_secret_access_key': settings.AWS_SECRET_ACCESS_KEY
             })
         
-        _sns_client = session.client('sns', **sns_config)
+        stack = AsyncExitStack()
+        _sns_client = await stack.enter_async_context(session.client('sns', **sns_config))
+        _client_stack = stack
         logger.info("SNS client initialized successfully")
         
     except Exception as e:
@@ -171,6 +180,22 @@ async def init_sns():
         raise
 
 
+async def close_sns():
+    """Close the shared SNS client and its connection pool"""
+    global _sns_client, _client_stack
+    
+    stack = _client_stack
+    _sns_client = None
+    _client_stack = None
+    
+    if stack is not None:
+        try:
+            await stack.aclose()
+            logger.info("SNS client closed")
+        except Exception as e:
+            logger.error(f"Error closing SNS client: {str(e)}")
+
+
 def get_sns_service() -> SNSService:
     """Get SNS service instance"""
     if _sns_client is None:
@@ -7,19 +7,64 @@ Purpose: Handle Alexa skill requests for care home call bell system
 """
 
 import json
+import os
+import re
+import time
 import boto3
 import logging
 from datetime import datetime
 import uuid
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from outbox import SQSOutbox, OutboxConsumer, build_outbox_message, batch_item_failures
+from telemetry import InvocationTimer, LazyJson, should_sample_event
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# AWS clients
-dynamodb = boto3.resource('dynamodb')
-sns = boto3.client('sns')
+CALLS_TABLE = os.environ.get('DYNAMODB_TABLE', 'CareHomeCalls')
+SNS_TOPIC_ARN = os.environ.get('SNS_TOPIC_ARN', 'arn:aws:sns:us-east-1:123456789012:CareHomeNotifications')
+
+# When set, call records and notifications are queued here and written in
+# batches by outbox_handler instead of inline with the Alexa response
+OUTBOX_QUEUE_URL = os.environ.get('OUTBOX_QUEUE_URL')
+
+# Residents table shared with the FastAPI backend; when unset the handler
+# falls back to the built-in room mapping below
+RESIDENTS_TABLE = os.environ.get('RESIDENTS_TABLE')
+DEVICE_REGISTRY_TTL_SECONDS = int(os.environ.get('DEVICE_REGISTRY_TTL_SECONDS', '300'))
+
+# Development device IDs such as 'room12_device_abc' encode their room
+ROOM_IN_DEVICE_ID = re.compile(r'room(\d+)')
+
+# Call records and notifications are written concurrently; the handler
+# answers Alexa once both finish or this budget runs out
+SIDE_EFFECT_BUDGET_SECONDS = float(os.environ.get('SIDE_EFFECT_BUDGET_SECONDS', '2.5'))
+SIDE_EFFECT_WORKERS = 4
+
+# Repeated presses and Alexa retries from the same room within this window
+# collapse into one call with a press counter (0 disables)
+DEBOUNCE_SECONDS = int(os.environ.get('DEBOUNCE_SECONDS', '10'))
+DEBOUNCED_CALL_TYPES = ('touch_call', 'emergency')
+
+# Shared botocore settings: fail fast on a stalled connection rather than
+# holding the resident's Echo, and keep connections alive between invocations
+BOTO_CONFIG = Config(
+    connect_timeout=float(os.environ.get('AWS_CONNECT_TIMEOUT', '1')),
+    read_timeout=float(os.environ.get('AWS_READ_TIMEOUT', '2')),
+    retries={'mode': 'standard', 'max_attempts': 3},
+    max_pool_connections=SIDE_EFFECT_WORKERS * 2,
+    tcp_keepalive=True
+)
+
+# Scheduled warm-up pings (EventBridge or a custom source) prime clients and
+# caches without creating call records
+WARMUP_EVENT_SOURCES = ('aws.events', 'care.warmup')
 
 # Device mapping for care home
 DEVICE_MAP = {
@@ -35,26 +80,389 @@ RESIDENTS = {
     'room3': 'Mary'
 }
 
+# Sparse GSI holding only open calls: items carry the 'pending' attribute
+# while unacknowledged and drop out of the index when it is removed.
+PENDING_CALLS_INDEX = 'pending-calls-index'
+PENDING_MARKER = 'pending'
+ACKNOWLEDGE_ATTEMPTS = 3
+
+# APL documents, built once per container and shared across invocations.
+# Treat them as read-only: responses reference these objects directly.
+
+# APL document for main caregiver device
+MAIN_DEVICE_APL = {
+    "type": "APL",
+    "version": "1.6",
+    "mainTemplate": {
+        "items": [
+            {
+                "type": "Container",
+                "width": "100vw",
+                "height": "100vh",
+                "alignItems": "center",
+                "justifyContent": "center",
+                "backgroundColor": "#2c3e50",
+                "items": [
+                    {
+                        "type": "Text",
+                        "text": "🏥 Care Home Assistant",
+                        "fontSize": "40dp",
+                        "color": "white",
+                        "textAlign": "center"
+                    },
+                    {
+                        "type": "Text",
+                        "text": "Main Station - Monitoring All Rooms",
+                        "fontSize": "20dp",
+                        "color": "#ecf0f1",
+                        "textAlign": "center",
+                        "paddingTop": "20dp"
+                    }
+                ]
+            }
+        ]
+    }
+}
+
+# APL document for resident device with touch button
+RESIDENT_DEVICE_APL = {
+    "type": "APL",
+    "version": "1.6",
+    "mainTemplate": {
+        "items": [
+            {
+                "type": "Container",
+                "width": "100vw",
+                "height": "100vh",
+                "alignItems": "center",
+                "justifyContent": "center",
+                "backgroundColor": "#34495e",
+                "items": [
+                    {
+                        "type": "TouchWrapper",
+                        "width": "300dp",
+                        "height": "150dp",
+                        "onPress": {
+                            "type": "SendEvent",
+                            "arguments": ["touchCall"]
+                        },
+                        "items": [
+                            {
+                                "type": "Frame",
+                                "backgroundColor": "#e74c3c",
+                                "borderRadius": "20dp",
+                                "width": "100%",
+                                "height": "100%",
+                                "items": [
+                                    {
+                                        "type": "Text",
+                                        "text": "📞 CALL CAREGIVER",
+                                        "fontSize": "24dp",
+                                        "color": "white",
+                                        "fontWeight": "bold",
+                                        "textAlign": "center",
+                                        "width": "100%",
+                                        "height": "100%",
+                                        "textAlignVertical": "center"
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        "type": "Text",
+                        "text": "Say 'Help' for emergency or 'Nurse' to send a message",
+                        "fontSize": "16dp",
+                        "color": "#bdc3c7",
+                        "textAlign": "center",
+                        "paddingTop": "30dp"
+                    }
+                ]
+            }
+        ]
+    }
+}
+
+# APL document for calling state
+CALLING_APL = {
+    "type": "APL",
+    "version": "1.6",
+    "mainTemplate": {
+        "items": [
+            {
+                "type": "Container",
+                "width": "100vw",
+                "height": "100vh",
+                "alignItems": "center",
+                "justifyContent": "center",
+                "backgroundColor": "#3498db",
+                "items": [
+                    {
+                        "type": "Text",
+                        "text": "📞 Calling Caregiver...",
+                        "fontSize": "32dp",
+                        "color": "white",
+                        "textAlign": "center"
+                    },
+                    {
+                        "type": "Text",
+                        "text": "Help is on the way",
+                        "fontSize": "18dp",
+                        "color": "#ecf0f1",
+                        "textAlign": "center",
+                        "paddingTop": "20dp"
+                    }
+                ]
+            }
+        ]
+    }
+}
+
+# APL document for emergency state
+EMERGENCY_APL = {
+    "type": "APL",
+    "version": "1.6",
+    "mainTemplate": {
+        "items": [
+            {
+                "type": "Container",
+                "width": "100vw",
+                "height": "100vh",
+                "alignItems": "center",
+                "justifyContent": "center",
+                "backgroundColor": "#e74c3c",
+                "items": [
+                    {
+                        "type": "Text",
+                        "text": "🚨 EMERGENCY",
+                        "fontSize": "48dp",
+                        "color": "white",
+                        "fontWeight": "bold",
+                        "textAlign": "center"
+                    },
+                    {
+                        "type": "Text",
+                        "text": "Help is Coming",
+                        "fontSize": "24dp",
+                        "color": "#ecf0f1",
+                        "textAlign": "center",
+                        "paddingTop": "20dp"
+                    }
+                ]
+            }
+        ]
+    }
+}
+
+# RenderDocument directives keyed by document identity so build_response can
+# reuse them instead of wrapping the document on every invocation
+RENDER_DIRECTIVES = {
+    id(document): [
+        {
+            "type": "Alexa.Presentation.APL.RenderDocument",
+            "document": document
+        }
+    ]
+    for document in (MAIN_DEVICE_APL, RESIDENT_DEVICE_APL, CALLING_APL, EMERGENCY_APL)
+}
+
+
+# AWS clients are created on first use and reused across warm invocations,
+# so importing this module stays cheap
+
+
+@lru_cache(maxsize=None)
+def get_dynamodb():
+    """DynamoDB service resource"""
+    return boto3.resource('dynamodb', config=BOTO_CONFIG)
+
+
+@lru_cache(maxsize=None)
+def get_sns():
+    """SNS client"""
+    return boto3.client('sns', config=BOTO_CONFIG)
+
+
+@lru_cache(maxsize=None)
+def get_sqs():
+    """SQS client for the call outbox"""
+    return boto3.client('sqs', config=BOTO_CONFIG)
+
+
+# Reused across warm invocations; created on first use
+_side_effect_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_side_effect_pool() -> ThreadPoolExecutor:
+    """Thread pool for DynamoDB/SNS side effects"""
+    global _side_effect_pool
+    if _side_effect_pool is None:
+        _side_effect_pool = ThreadPoolExecutor(
+            max_workers=SIDE_EFFECT_WORKERS,
+            thread_name_prefix='care-side-effect'
+        )
+    return _side_effect_pool
+
+
+def new_call_id() -> str:
+    """Time-ordered UUIDv7 call ID: 48-bit Unix milliseconds then random bits,
+    so call IDs sort by creation time (same scheme as the FastAPI backend)"""
+    value = ((time.time_ns() // 1_000_000) << 80) | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return str(uuid.UUID(int=value))
+
+
+@lru_cache(maxsize=256)
+def plain_text_speech(text: str) -> Dict[str, Any]:
+    """Shared PlainText outputSpeech fragment (read-only)"""
+    return {"type": "PlainText", "text": text}
+
+
+class DeviceRegistry:
+    """Device -> room -> resident index kept across warm invocations.
+    
+    Mappings are loaded from the residents table and held in dicts so lookups
+    are O(1) regardless of facility size. The index is reloaded once it is
+    older than the TTL; if a reload fails the previous index keeps serving.
+    """
+    
+    def __init__(self, table=None, ttl_seconds: int = DEVICE_REGISTRY_TTL_SECONDS,
+                 clock=time.monotonic):
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.devices: Dict[str, Tuple[str, str]] = {}
+        self.residents_by_room: Dict[str, str] = dict(RESIDENTS)
+        self.loaded_at: Optional[float] = None
+    
+    def lookup(self, device_id: str) -> Optional[Tuple[str, str]]:
+        """Return (room, resident name) for a device, if known"""
+        self.refresh_if_stale()
+        entry = self.devices.get(device_id)
+        if entry:
+            return entry
+        
+        match = ROOM_IN_DEVICE_ID.search(device_id.lower())
+        if match:
+            room = f"room{match.group(1)}"
+            return room, self.residents_by_room.get(room, f"Room {room}")
+        return None
+    
+    def resident_for_room(self, room: str) -> str:
+        """Resident name for a room, or a generic room label"""
+        self.refresh_if_stale()
+        return self.residents_by_room.get(room, f"Room {room}")
+    
+    def refresh_if_stale(self):
+        """Reload mappings when the TTL has expired"""
+        if self.table is None:
+            return
+        now = self.clock()
+        if self.loaded_at is not None and now - self.loaded_at < self.ttl_seconds:
+            return
+        # Stamp before loading so a failing table is retried once per TTL,
+        # not on every invocation
+        self.loaded_at = now
+        try:
+            self.load()
+        except Exception as e:
+            logger.error("Error refreshing device registry: %s", e)
+    
+    def load(self):
+        """Scan active residents and rebuild the device and room indexes"""
+        devices: Dict[str, Tuple[str, str]] = {}
+        residents_by_room = dict(RESIDENTS)
+        
+        scan_kwargs = {
+            'ProjectionExpression': 'device_id, room_number, #name, active',
+            'ExpressionAttributeNames': {'#name': 'name'}
+        }
+        while True:
+            response = self.table.scan(**scan_kwargs)
+            for item in response.get('Items', []):
+                if not item.get('active', True) or not item.get('room_number'):
+                    continue
+                room = item['room_number']
+                name = item.get('name') or f"Room {room}"
+                residents_by_room[room] = name
+                if item.get('device_id'):
+                    devices[item['device_id']] = (room, name)
+            
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                break
+            scan_kwargs['ExclusiveStartKey'] = last_key
+        
+        # Swap whole dicts so readers never see a half-built index
+        self.devices = devices
+        self.residents_by_room = residents_by_room
+        logger.info("Loaded device registry: %d devices", len(devices))
+
+
+class DebounceCache:
+    """Open call per (room, call type) within the debounce window.
+    
+    Lives on the warm handler, so bursts handled by the same container
+    collapse without a DynamoDB round-trip.
+    """
+    
+    def __init__(self, window_seconds: int = DEBOUNCE_SECONDS, clock=time.monotonic):
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self.entries: Dict[Tuple[str, str], Tuple[str, float]] = {}
+    
+    def get(self, room: str, call_type: str) -> Optional[str]:
+        """Call ID still open for this room and type, if any"""
+        entry = self.entries.get((room, call_type))
+        if entry is None:
+            return None
+        call_id, expires_at = entry
+        if self.clock() >= expires_at:
+            del self.entries[(room, call_type)]
+            return None
+        return call_id
+    
+    def put(self, room: str, call_type: str, call_id: str, window_seconds: Optional[float] = None):
+        """Open a window for call_id"""
+        window = self.window_seconds if window_seconds is None else window_seconds
+        self.entries[(room, call_type)] = (call_id, self.clock() + window)
+
+
 class AlexaCareHandler:
     """Main handler class for Alexa Care Assistant skill"""
     
     def __init__(self):
         """Initialize handler with AWS resources"""
         try:
-            self.calls_table = dynamodb.Table('CareHomeCalls')
+            dynamodb = get_dynamodb()
+            self.calls_table = dynamodb.Table(CALLS_TABLE)
             self.status_table = dynamodb.Table('CaregiverStatus')
+            residents_table = dynamodb.Table(RESIDENTS_TABLE) if RESIDENTS_TABLE else None
         except Exception as e:
-            logger.error(f"Error initializing AWS resources: {str(e)}")
+            logger.error("Error initializing AWS resources: %s", e)
             # Use mock tables for local testing
             self.calls_table = None
             self.status_table = None
+            residents_table = None
+        
+        self.device_registry = DeviceRegistry(residents_table)
+        self.timer = InvocationTimer()
+        self.debounce_cache = DebounceCache()
+        self.outbox = SQSOutbox(get_sqs(), OUTBOX_QUEUE_URL) if OUTBOX_QUEUE_URL else None
         
     def lambda_handler(self, event: Dict[str, Any], context) -> Dict[str, Any]:
         """Main Lambda handler entry point"""
+        self.timer = InvocationTimer()
         try:
-            logger.info(f"Received event: {json.dumps(event)}")
+            if is_warmup_event(event):
+                return self.warm_up()
+            
+            if should_sample_event():
+                logger.info("Received event: %s", LazyJson(event))
             
             request_type = event['request']['type']
+            self.timer.fields['request_type'] = request_type
             
             if request_type == 'LaunchRequest':
                 return self.handle_launch(event)
@@ -66,8 +474,26 @@ class AlexaCareHandler:
                 return self.build_response("I didn't understand that request.")
                 
         except Exception as e:
-            logger.error(f"Error handling request: {str(e)}")
+            logger.error("Error handling request: %s", e)
+            self.timer.fields['error'] = type(e).__name__
             return self.build_response("Sorry, there was an error processing your request.")
+        finally:
+            self.timer.emit(logger)
+    
+    def warm_up(self) -> Dict[str, Any]:
+        """Prime clients, caches and connections without writing anything"""
+        get_sns()
+        get_side_effect_pool()
+        self.device_registry.refresh_if_stale()
+        
+        if self.calls_table:
+            try:
+                # A miss on a reserved key opens the keep-alive connection
+                self.calls_table.get_item(Key={'call_id': '__warmup__'})
+            except Exception as e:
+                logger.warning("Warm-up read failed: %s", e)
+        
+        return {"warmup": True}
     
     def handle_launch(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Handle skill launch request"""
@@ -87,6 +513,7 @@ class AlexaCareHandler:
     def handle_intent(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """Handle intent requests"""
         intent_name = event['request']['intent']['name']
+        self.timer.fields['intent'] = intent_name
         
         if intent_name == 'HelpWakeWordIntent':
             return self.handle_help_request(event)
@@ -105,14 +532,10 @@ class AlexaCareHandler:
         """Handle touch call button press"""
         device_id = event['context']['System']['device']['deviceId']
         room = self.get_room_from_device(device_id)
-        resident_name = RESIDENTS.get(room, f"Room {room}")
+        resident_name = self.device_registry.resident_for_room(room)
         
-        # Create call record
-        call_id = str(uuid.uuid4())
-        self.create_call_record(call_id, room, 'touch_call', resident_name)
-        
-        # Notify main device
-        self.notify_main_device(f"{resident_name} is calling")
+        # Create call record and notify main device
+        self.dispatch_call(room, 'touch_call', resident_name, f"{resident_name} is calling")
         
         return self.build_response(
             "Calling caregiver now. Help is on the way.",
@@ -124,12 +547,8 @@ class AlexaCareHandler:
         device_id = event['context']['System']['device']['deviceId']
         room = self.get_room_from_device(device_id)
         
-        # Create emergency call record
-        call_id = str(uuid.uuid4())
-        self.create_call_record(call_id, room, 'emergency', 'Help Request')
-        
-        # Notify main device with urgency
-        self.notify_main_device(f"URGENT: Help needed in {room}")
+        # Create emergency call record and notify main device with urgency
+        self.dispatch_call(room, 'emergency', 'Help Request', f"URGENT: Help needed in {room}")
         
         return self.build_response(
             "Emergency help is on the way. Stay calm.",
@@ -140,19 +559,15 @@ class AlexaCareHandler:
         """Handle nurse communication request"""
         device_id = event['context']['System']['device']['deviceId']
         room = self.get_room_from_device(device_id)
-        resident_name = RESIDENTS.get(room, f"Room {room}")
+        resident_name = self.device_registry.resident_for_room(room)
         
         # Get message from slot
         slots = event['request']['intent'].get('slots', {})
         message = slots.get('message', {}).get('value', '')
         
         if message:
-            # Create communication record
-            call_id = str(uuid.uuid4())
-            self.create_call_record(call_id, room, 'nurse_request', message)
-            
-            # Relay message to main device
-            self.notify_main_device(f"{resident_name} says: {message}")
+            # Create communication record and relay message to main device
+            self.dispatch_call(room, 'nurse_request', message, f"{resident_name} says: {message}")
             
             return self.build_response("Hold on, I'm getting help for you.")
         else:
@@ -168,39 +583,193 @@ class AlexaCareHandler:
         
         return self.build_response("Acknowledged. Resident has been notified.")
     
+    def dispatch_call(self, room: str, call_type: str, message: str, notification: str):
+        """Create the call record and notify the main device.
+        
+        With an outbox configured the call intent is queued and written later
+        in batches. Otherwise both side effects run concurrently and this
+        returns once both finish or SIDE_EFFECT_BUDGET_SECONDS elapses, so the
+        resident waits for the slower call rather than the sum of both.
+        """
+        call_id = new_call_id()
+        
+        if call_type in DEBOUNCED_CALL_TYPES and DEBOUNCE_SECONDS > 0:
+            open_call_id = self.claim_call_window(room, call_type, call_id)
+            if open_call_id and not self.record_repeat_press(open_call_id):
+                # Acknowledged, or never written; this press is a new call
+                open_call_id = self.take_call_window(room, call_type, call_id, replacing=open_call_id)
+                if open_call_id:
+                    self.record_repeat_press(open_call_id)
+            if open_call_id:
+                return
+        
+        if self.outbox:
+            try:
+                with self.timer.measure('outbox'):
+                    self.outbox.send(build_outbox_message(
+                        self.build_call_item(call_id, room, call_type, message),
+                        notification
+                    ))
+                return
+            except Exception as e:
+                # Fall back to writing inline rather than losing the call
+                logger.error("Error queueing call %s: %s", call_id, e)
+        
+        timer = self.timer
+        pool = get_side_effect_pool()
+        futures = [
+            pool.submit(timer.timed('db', self.create_call_record), call_id, room, call_type, message),
+            pool.submit(timer.timed('sns', self.notify_main_device), notification)
+        ]
+        
+        with timer.measure('dispatch'):
+            done, not_done = wait(futures, timeout=SIDE_EFFECT_BUDGET_SECONDS)
+        if not_done:
+            logger.warning("Side effects for call %s exceeded %ss budget", call_id, SIDE_EFFECT_BUDGET_SECONDS)
+        for future in done:
+            if future.exception():
+                logger.error("Error in side effect for call %s: %s", call_id, future.exception())
+    
+    def claim_call_window(self, room: str, call_type: str, call_id: str) -> Optional[str]:
+        """Claim the debounce window for a new call.
+        
+        Returns the ID of the call this press duplicates, or None if call_id
+        now owns the window. Across containers the window is a conditional
+        write on a per-room lock item; any failure there errs towards
+        creating the call rather than dropping it.
+        """
+        open_call_id = self.debounce_cache.get(room, call_type)
+        if open_call_id:
+            return open_call_id
+        return self.take_call_window(room, call_type, call_id)
+    
+    def take_call_window(self, room: str, call_type: str, call_id: str,
+                         replacing: Optional[str] = None) -> Optional[str]:
+        """Write the per-room lock item naming call_id as the open call.
+        
+        Succeeds if the window is free or has expired, or still names the
+        acknowledged call in replacing. Returns the ID of the call holding
+        the window instead, or None if call_id now owns it.
+        """
+        if self.calls_table and not self.outbox:
+            now_ms = int(time.time() * 1000)
+            condition = 'attribute_not_exists(call_id) OR expires_at_ms < :now'
+            values: Dict[str, Any] = {':now': now_ms}
+            if replacing:
+                condition += ' OR active_call_id = :replacing'
+                values[':replacing'] = replacing
+            try:
+                with self.timer.measure('debounce'):
+                    self.calls_table.put_item(
+                        Item={
+                            'call_id': f"debounce#{room}#{call_type}",
+                            'active_call_id': call_id,
+                            'expires_at_ms': now_ms + DEBOUNCE_SECONDS * 1000,
+                            'ttl': now_ms // 1000 + DEBOUNCE_SECONDS + 3600
+                        },
+                        ConditionExpression=condition,
+                        ExpressionAttributeValues=values,
+                        ReturnValuesOnConditionCheckFailure='ALL_OLD'
+                    )
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                    logger.error("Error claiming debounce window for %s: %s", room, e)
+                else:
+                    # Raw attribute values: the resource layer does not
+                    # deserialize items returned with a failed condition
+                    old = e.response.get('Item', {})
+                    open_call_id = old.get('active_call_id', {}).get('S')
+                    expires_at_ms = int(old.get('expires_at_ms', {}).get('N', now_ms))
+                    if open_call_id and open_call_id != replacing:
+                        self.debounce_cache.put(room, call_type, open_call_id,
+                                                max(0, expires_at_ms - now_ms) / 1000)
+                        return open_call_id
+            except Exception as e:
+                logger.error("Error claiming debounce window for %s: %s", room, e)
+        
+        self.debounce_cache.put(room, call_type, call_id)
+        return None
+    
+    def record_repeat_press(self, call_id: str) -> bool:
+        """Count a duplicate press against the open call.
+        
+        Returns False if the call has been acknowledged since, or (writing
+        inline) its record was never written, so the press should open a new
+        call rather than fold into a closed or lost one.
+        """
+        if not self.calls_table:
+            logger.info("Mock repeat press for call: %s", call_id)
+            return True
+        
+        try:
+            with self.timer.measure('db'):
+                self.calls_table.update_item(
+                    Key={'call_id': call_id},
+                    UpdateExpression='ADD press_count :one SET last_press_at = :time',
+                    ConditionExpression='attribute_exists(call_id) AND #status = :pending',
+                    ExpressionAttributeNames={'#status': 'status'},
+                    ExpressionAttributeValues={
+                        ':one': 1,
+                        ':time': datetime.now().isoformat(),
+                        ':pending': PENDING_MARKER
+                    },
+                    ReturnValuesOnConditionCheckFailure='ALL_OLD'
+                )
+            logger.info("Repeat press for call: %s", call_id)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                logger.error("Error recording repeat press: %s", e)
+            elif e.response.get('Item'):
+                logger.info("Call %s closed within its debounce window", call_id)
+                return False
+            elif not self.outbox:
+                # The window was taken but the call record write failed
+                logger.warning("Call %s holds the debounce window but was never written", call_id)
+                return False
+            # With the outbox the record may not be written yet; the press
+            # still collapses, only the counter is lost
+        except Exception as e:
+            logger.error("Error recording repeat press: %s", e)
+        return True
+    
     def create_call_record(self, call_id: str, room: str, call_type: str, message: str):
         """Create call record in DynamoDB"""
         if not self.calls_table:
-            logger.info(f"Mock call record: {call_id}, {room}, {call_type}, {message}")
+            logger.info("Mock call record: %s, %s, %s, %s", call_id, room, call_type, message)
             return
             
         try:
             self.calls_table.put_item(
-                Item={
-                    'call_id': call_id,
-                    'room': room,
-                    'type': call_type,
-                    'message': message,
-                    'timestamp': datetime.now().isoformat(),
-                    'status': 'pending'
-                }
+                Item=self.build_call_item(call_id, room, call_type, message)
             )
-            logger.info(f"Created call record: {call_id}")
+            logger.info("Created call record: %s", call_id)
         except Exception as e:
-            logger.error(f"Error creating call record: {str(e)}")
+            logger.error("Error creating call record: %s", e)
+    
+    def build_call_item(self, call_id: str, room: str, call_type: str, message: str) -> Dict[str, Any]:
+        """DynamoDB item for a new pending call"""
+        return {
+            'call_id': call_id,
+            'room': room,
+            'type': call_type,
+            'message': message,
+            'timestamp': datetime.now().isoformat(),
+            'status': 'pending',
+            'pending': PENDING_MARKER,
+            'press_count': 1
+        }
     
     def notify_main_device(self, message: str):
         """Send notification to main device via SNS"""
         try:
-            topic_arn = 'arn:aws:sns:us-east-1:123456789012:CareHomeNotifications'
-            sns.publish(
-                TopicArn=topic_arn,
+            get_sns().publish(
+                TopicArn=SNS_TOPIC_ARN,
                 Message=message,
                 Subject='Care Home Alert'
             )
-            logger.info(f"Sent notification: {message}")
+            logger.info("Sent notification: %s", message)
         except Exception as e:
-            logger.error(f"Error sending notification: {str(e)}")
+            logger.error("Error sending notification: %s", e)
     
     def acknowledge_latest_call(self):
         """Mark latest call as acknowledged"""
@@ -209,210 +778,79 @@ class AlexaCareHandler:
             return
             
         try:
-            # Get latest pending call
-            response = self.calls_table.scan(
-                FilterExpression='#status = :status',
-                ExpressionAttributeNames={'#status': 'status'},
-                ExpressionAttributeValues={':status': 'pending'}
-            )
-            
-            if response['Items']:
-                latest_call = max(response['Items'], key=lambda x: x['timestamp'])
-                self.calls_table.update_item(
-                    Key={'call_id': latest_call['call_id']},
-                    UpdateExpression='SET #status = :status, acknowledged_at = :time',
-                    ExpressionAttributeNames={'#status': 'status'},
-                    ExpressionAttributeValues={
-                        ':status': 'acknowledged',
-                        ':time': datetime.now().isoformat()
-                    }
-                )
-                logger.info(f"Acknowledged call: {latest_call['call_id']}")
+            # The GSI is eventually consistent, so another caregiver may have
+            # acknowledged the newest call already; fall through to the next one.
+            with self.timer.measure('db'):
+                for _ in range(ACKNOWLEDGE_ATTEMPTS):
+                    latest_call = self.get_latest_pending_call()
+                    if not latest_call:
+                        return
+                    if self.mark_call_acknowledged(latest_call['call_id']):
+                        logger.info("Acknowledged call: %s", latest_call['call_id'])
+                        return
         except Exception as e:
-            logger.error(f"Error acknowledging call: {str(e)}")
+            logger.error("Error acknowledging call: %s", e)
+    
+    def get_latest_pending_call(self) -> Optional[Dict[str, Any]]:
+        """Fetch the newest open call from the sparse pending-calls index"""
+        response = self.calls_table.query(
+            IndexName=PENDING_CALLS_INDEX,
+            KeyConditionExpression='#pending = :pending',
+            ExpressionAttributeNames={'#pending': 'pending'},
+            ExpressionAttributeValues={':pending': PENDING_MARKER},
+            ScanIndexForward=False,
+            Limit=1
+        )
+        items = response.get('Items', [])
+        return items[0] if items else None
+    
+    def mark_call_acknowledged(self, call_id: str) -> bool:
+        """Acknowledge a call and remove it from the pending index.
+        
+        Returns False if the call was no longer pending.
+        """
+        try:
+            self.calls_table.update_item(
+                Key={'call_id': call_id},
+                UpdateExpression='SET #status = :status, acknowledged_at = :time REMOVE #pending',
+                ConditionExpression='#status = :pending',
+                ExpressionAttributeNames={'#status': 'status', '#pending': 'pending'},
+                ExpressionAttributeValues={
+                    ':status': 'acknowledged',
+                    ':pending': PENDING_MARKER,
+                    ':time': datetime.now().isoformat()
+                }
+            )
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                return False
+            raise
     
     def is_main_device(self, device_id: str) -> bool:
         """Check if device is main caregiver device"""
         return 'main' in device_id.lower()
     
     def get_room_from_device(self, device_id: str) -> str:
-        """Extract room number from device ID"""
-        if 'room1' in device_id.lower():
-            return 'room1'
-        elif 'room2' in device_id.lower():
-            return 'room2'
-        elif 'room3' in device_id.lower():
-            return 'room3'
-        return 'unknown'
+        """Resolve the room for a device ID via the device registry"""
+        entry = self.device_registry.lookup(device_id)
+        return entry[0] if entry else 'unknown'
     
     def get_main_device_apl(self) -> Dict[str, Any]:
         """APL document for main caregiver device"""
-        return {
-            "type": "APL",
-            "version": "1.6",
-            "mainTemplate": {
-                "items": [
-                    {
-                        "type": "Container",
-                        "width": "100vw",
-                        "height": "100vh",
-                        "alignItems": "center",
-                        "justifyContent": "center",
-                        "backgroundColor": "#2c3e50",
-                        "items": [
-                            {
-                                "type": "Text",
-                                "text": "🏥 Care Home Assistant",
-                                "fontSize": "40dp",
-                                "color": "white",
-                                "textAlign": "center"
-                            },
-                            {
-                                "type": "Text",
-                                "text": "Main Station - Monitoring All Rooms",
-                                "fontSize": "20dp",
-                                "color": "#ecf0f1",
-                                "textAlign": "center",
-                                "paddingTop": "20dp"
-                            }
-                        ]
-                    }
-                ]
-            }
-        }
+        return MAIN_DEVICE_APL
     
     def get_resident_device_apl(self) -> Dict[str, Any]:
         """APL document for resident device with touch button"""
-        return {
-            "type": "APL",
-            "version": "1.6",
-            "mainTemplate": {
-                "items": [
-                    {
-                        "type": "Container",
-                        "width": "100vw",
-                        "height": "100vh",
-                        "alignItems": "center",
-                        "justifyContent": "center",
-                        "backgroundColor": "#34495e",
-                        "items": [
-                            {
-                                "type": "TouchWrapper",
-                                "width": "300dp",
-                                "height": "150dp",
-                                "onPress": {
-                                    "type": "SendEvent",
-                                    "arguments": ["touchCall"]
-                                },
-                                "items": [
-                                    {
-                                        "type": "Frame",
-                                        "backgroundColor": "#e74c3c",
-                                        "borderRadius": "20dp",
-                                        "width": "100%",
-                                        "height": "100%",
-                                        "items": [
-                                            {
-                                                "type": "Text",
-                                                "text": "📞 CALL CAREGIVER",
-                                                "fontSize": "24dp",
-                                                "color": "white",
-                                                "fontWeight": "bold",
-                                                "textAlign": "center",
-                                                "width": "100%",
-                                                "height": "100%",
-                                                "textAlignVertical": "center"
-                                            }
-                                        ]
-                                    }
-                                ]
-                            },
-                            {
-                                "type": "Text",
-                                "text": "Say 'Help' for emergency or 'Nurse' to send a message",
-                                "fontSize": "16dp",
-                                "color": "#bdc3c7",
-                                "textAlign": "center",
-                                "paddingTop": "30dp"
-                            }
-                        ]
-                    }
-                ]
-            }
-        }
+        return RESIDENT_DEVICE_APL
     
     def get_calling_apl(self) -> Dict[str, Any]:
         """APL document for calling state"""
-        return {
-            "type": "APL",
-            "version": "1.6",
-            "mainTemplate": {
-                "items": [
-                    {
-                        "type": "Container",
-                        "width": "100vw",
-                        "height": "100vh",
-                        "alignItems": "center",
-                        "justifyContent": "center",
-                        "backgroundColor": "#3498db",
-                        "items": [
-                            {
-                                "type": "Text",
-                                "text": "📞 Calling Caregiver...",
-                                "fontSize": "32dp",
-                                "color": "white",
-                                "textAlign": "center"
-                            },
-                            {
-                                "type": "Text",
-                                "text": "Help is on the way",
-                                "fontSize": "18dp",
-                                "color": "#ecf0f1",
-                                "textAlign": "center",
-                                "paddingTop": "20dp"
-                            }
-                        ]
-                    }
-                ]
-            }
-        }
+        return CALLING_APL
     
     def get_emergency_apl(self) -> Dict[str, Any]:
         """APL document for emergency state"""
-        return {
-            "type": "APL",
-            "version": "1.6",
-            "mainTemplate": {
-                "items": [
-                    {
-                        "type": "Container",
-                        "width": "100vw",
-                        "height": "100vh",
-                        "alignItems": "center",
-                        "justifyContent": "center",
-                        "backgroundColor": "#e74c3c",
-                        "items": [
-                            {
-                                "type": "Text",
-                                "text": "🚨 EMERGENCY",
-                                "fontSize": "48dp",
-                                "color": "white",
-                                "fontWeight": "bold",
-                                "textAlign": "center"
-                            },
-                            {
-                                "type": "Text",
-                                "text": "Help is Coming",
-                                "fontSize": "24dp",
-                                "color": "#ecf0f1",
-                                "textAlign": "center",
-                                "paddingTop": "20dp"
-                            }
-                        ]
-                    }
-                ]
-            }
-        }
+        return EMERGENCY_APL
     
     def build_response(self, speech_text: str, reprompt: Optional[str] = None, 
                       apl_document: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -420,38 +858,53 @@ class AlexaCareHandler:
         response = {
             "version": "1.0",
             "response": {
-                "outputSpeech": {
-                    "type": "PlainText",
-                    "text": speech_text
-                },
+                "outputSpeech": plain_text_speech(speech_text),
                 "shouldEndSession": False
             }
         }
         
         if reprompt:
             response["response"]["reprompt"] = {
-                "outputSpeech": {
-                    "type": "PlainText",
-                    "text": reprompt
-                }
+                "outputSpeech": plain_text_speech(reprompt)
             }
         
         if apl_document:
-            response["response"]["directives"] = [
-                {
-                    "type": "Alexa.Presentation.APL.RenderDocument",
-                    "document": apl_document
-                }
-            ]
+            directives = RENDER_DIRECTIVES.get(id(apl_document))
+            if directives is None:
+                directives = [
+                    {
+                        "type": "Alexa.Presentation.APL.RenderDocument",
+                        "document": apl_document
+                    }
+                ]
+            response["response"]["directives"] = directives
         
         return response
 
-# Global handler instance
-handler = AlexaCareHandler()
+def is_warmup_event(event: Dict[str, Any]) -> bool:
+    """Check for a scheduled warm-up ping rather than an Alexa request"""
+    return event.get('source') in WARMUP_EVENT_SOURCES or bool(event.get('warmup'))
+
+# Global handler instance, built on the first invocation
+_handler: Optional[AlexaCareHandler] = None
+
+def get_handler() -> AlexaCareHandler:
+    """Memoized handler shared across warm invocations"""
+    global _handler
+    if _handler is None:
+        _handler = AlexaCareHandler()
+    return _handler
 
 def lambda_handler(event, context):
     """AWS Lambda entry point"""
-    return handler.lambda_handler(event, context)
+    return get_handler().lambda_handler(event, context)
+
+def outbox_handler(event, context):
+    """SQS entry point draining the call outbox in batches"""
+    outbox = SQSOutbox(get_sqs(), OUTBOX_QUEUE_URL) if OUTBOX_QUEUE_URL else None
+    consumer = OutboxConsumer(get_dynamodb(), get_sns(), CALLS_TABLE, SNS_TOPIC_ARN, outbox=outbox)
+    failed = consumer.process(event.get('Records', []))
+    return batch_item_failures(failed)
 
 # For local testing
 if __name__ == "__main__":
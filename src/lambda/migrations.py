@@ -0,0 +1,63 @@
+"""
+Alexa Plus Chatbot - Call Table Migrations
+One-off data fixes for call records written by earlier releases
+
+Language: Python 3.9+
+Purpose: Calls written before the sparse pending-calls-index have no
+'pending' attribute, so the index never sees them and "acknowledge latest
+call" skips them. backfill_pending_markers sets it on calls still open.
+
+Usage:
+    DYNAMODB_TABLE=<calls table> python src/lambda/migrations.py
+"""
+
+import logging
+from typing import Any
+
+from botocore.exceptions import ClientError
+
+from lambda_function import CALLS_TABLE, PENDING_MARKER, get_dynamodb
+
+logger = logging.getLogger()
+
+
+def backfill_pending_markers(calls_table: Any) -> int:
+    """Add the pending-calls-index attribute to open calls missing it.
+
+    Safe to re-run, and to run while the skill is live: a call acknowledged
+    between the scan and the update is left alone. Returns the number of
+    calls updated.
+    """
+    updated = 0
+    scan_kwargs = {
+        'FilterExpression': '#status = :pending AND attribute_not_exists(#pending)',
+        'ProjectionExpression': 'call_id',
+        'ExpressionAttributeNames': {'#status': 'status', '#pending': 'pending'},
+        'ExpressionAttributeValues': {':pending': PENDING_MARKER}
+    }
+    while True:
+        response = calls_table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            try:
+                calls_table.update_item(
+                    Key={'call_id': item['call_id']},
+                    UpdateExpression='SET #pending = :pending',
+                    ConditionExpression='#status = :pending',
+                    ExpressionAttributeNames={'#status': 'status', '#pending': 'pending'},
+                    ExpressionAttributeValues={':pending': PENDING_MARKER}
+                )
+                updated += 1
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                    raise
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    logger.info("Backfilled pending marker on %d open calls", updated)
+    return updated
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    backfill_pending_markers(get_dynamodb().Table(CALLS_TABLE))
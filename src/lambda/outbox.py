@@ -0,0 +1,268 @@
+"""
+Alexa Plus Chatbot - Call Outbox
+Deferred side-effect pipeline for the Lambda handler
+
+Language: Python 3.9+
+Purpose: Queue call records and notifications so the resident's Echo is
+answered immediately, then write them in batches from a consumer
+"""
+
+import json
+import logging
+import queue
+import time
+import uuid
+from typing import Dict, Any, List
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+# Service batch limits
+DYNAMODB_BATCH_SIZE = 25
+SNS_BATCH_SIZE = 10
+
+# Retries for UnprocessedItems / failed publish entries within one drain
+BATCH_RETRY_ATTEMPTS = 3
+BATCH_RETRY_BASE_DELAY = 0.05
+
+# Times a message is sent back to the outbox with one side effect done
+# before it is failed outright and left to SQS redelivery and the DLQ
+MAX_REQUEUES = 5
+
+
+def receive_count(record: Dict[str, Any]) -> int:
+    """How many times SQS has delivered a record; 1 on first delivery"""
+    try:
+        return int(record.get('attributes', {}).get('ApproximateReceiveCount', 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def build_outbox_message(call_item: Dict[str, Any], notification: str) -> Dict[str, Any]:
+    """Outbox payload: the call record to write plus the notification to publish"""
+    return {
+        'call_id': call_item['call_id'],
+        'item': call_item,
+        'notification': notification
+    }
+
+
+class SQSOutbox:
+    """Outbox backed by an SQS queue, drained by outbox_handler"""
+
+    def __init__(self, sqs_client, queue_url: str):
+        self.sqs_client = sqs_client
+        self.queue_url = queue_url
+
+    def send(self, message: Dict[str, Any]):
+        """Enqueue one call intent"""
+        self.sqs_client.send_message(
+            QueueUrl=self.queue_url,
+            MessageBody=json.dumps(message)
+        )
+
+
+class InProcessOutbox:
+    """In-memory stand-in for the SQS outbox, for local runs and tests.
+
+    Messages are wrapped in SQS-shaped records so they go through the same
+    OutboxConsumer path; failed records are put back on the queue.
+    """
+
+    def __init__(self):
+        self.queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    def send(self, message: Dict[str, Any]):
+        """Enqueue one call intent"""
+        self.queue.put({
+            'messageId': str(uuid.uuid4()),
+            'body': json.dumps(message),
+            'attributes': {'ApproximateReceiveCount': '1'}
+        })
+
+    def drain(self, consumer: "OutboxConsumer", batch_size: int = SNS_BATCH_SIZE) -> int:
+        """Process up to batch_size queued records; returns how many succeeded"""
+        records = []
+        while len(records) < batch_size:
+            try:
+                records.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if not records:
+            return 0
+
+        failed = set(consumer.process(records))
+        for record in records:
+            if record['messageId'] in failed:
+                record['attributes'] = {'ApproximateReceiveCount': str(receive_count(record) + 1)}
+                self.queue.put(record)
+        return len(records) - len(failed)
+
+
+class OutboxConsumer:
+    """Writes queued call intents with batch_write_item and publish_batch"""
+
+    def __init__(self, dynamodb, sns_client, table_name: str, topic_arn: str,
+                 sleep=time.sleep, outbox=None):
+        self.dynamodb = dynamodb
+        self.sns_client = sns_client
+        self.table_name = table_name
+        self.topic_arn = topic_arn
+        self.sleep = sleep
+        # Where messages with one side effect done are sent back to
+        self.outbox = outbox
+
+    def process(self, records: List[Dict[str, Any]]) -> List[str]:
+        """Process SQS-shaped records; returns messageIds that failed.
+
+        Each message writes a call record and publishes a notification.
+        When only one of them fails, a copy marked with the step that
+        succeeded ('written' or 'published') goes back to the outbox, so
+        the retry repeats only the other; failing the record would redeliver
+        it unchanged and repeat both. A retried record may already have been
+        written, and the call acknowledged since; it is only written if the
+        call is not there yet.
+        """
+        messages: Dict[str, Dict[str, Any]] = {}
+        retried = set()
+        for record in records:
+            try:
+                message = json.loads(record['body'])
+            except (KeyError, ValueError) as e:
+                logger.error("Dropping malformed outbox record: %s", e)
+                continue
+            messages[record['messageId']] = message
+            if receive_count(record) > 1 or message.get('published'):
+                retried.add(record['messageId'])
+
+        to_write = {message_id: message for message_id, message in messages.items() if not message.get('written')}
+        write_failed = set(self.write_call_records(
+            {message_id: message for message_id, message in to_write.items() if message_id not in retried}
+        ))
+        write_failed.update(self.write_missing_call_records(
+            {message_id: message for message_id, message in to_write.items() if message_id in retried}
+        ))
+        publish_failed = set(self.publish_notifications(
+            {message_id: message for message_id, message in messages.items() if not message.get('published')}
+        ))
+
+        failed = []
+        for message_id, message in messages.items():
+            if message_id in write_failed and message_id in publish_failed:
+                failed.append(message_id)
+            elif message_id in write_failed or message_id in publish_failed:
+                done = 'published' if message_id in write_failed else 'written'
+                if not self.requeue(dict(message, **{done: True})):
+                    failed.append(message_id)
+        return failed
+
+    def requeue(self, message: Dict[str, Any]) -> bool:
+        """Send a partly processed message back to the outbox; False if it could not be"""
+        requeues = message.get('requeues', 0)
+        if self.outbox is None or requeues >= MAX_REQUEUES:
+            return False
+        try:
+            self.outbox.send(dict(message, requeues=requeues + 1))
+            return True
+        except Exception as e:
+            logger.error("Error requeueing call %s: %s", message.get('call_id'), e)
+            return False
+
+    def write_call_records(self, messages: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Batch-write call records; returns messageIds whose write failed"""
+        # A redelivered message can share a call_id with one already in the
+        # batch; DynamoDB rejects duplicate keys, so write each call once
+        by_call_id = {message['call_id']: message_id for message_id, message in messages.items()}
+        requests = [{'PutRequest': {'Item': messages[message_id]['item']}} for message_id in by_call_id.values()]
+
+        failed = []
+        for start in range(0, len(requests), DYNAMODB_BATCH_SIZE):
+            pending = requests[start:start + DYNAMODB_BATCH_SIZE]
+            for attempt in range(BATCH_RETRY_ATTEMPTS):
+                try:
+                    response = self.dynamodb.batch_write_item(RequestItems={self.table_name: pending})
+                    pending = response.get('UnprocessedItems', {}).get(self.table_name, [])
+                except Exception as e:
+                    logger.error("Error writing call record batch: %s", e)
+                if not pending:
+                    break
+                self.sleep(BATCH_RETRY_BASE_DELAY * (2 ** attempt))
+
+            failed.extend(by_call_id[request['PutRequest']['Item']['call_id']] for request in pending)
+
+        if failed:
+            logger.error("Failed to write %d call records", len(failed))
+        return failed
+
+    def write_missing_call_records(self, messages: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Conditionally write call records not already stored; returns messageIds whose write failed.
+
+        Batch puts cannot be conditional, so redelivered messages are
+        written one at a time with attribute_not_exists(call_id).
+        """
+        if not messages:
+            return []
+
+        table = self.dynamodb.Table(self.table_name)
+        by_call_id = {message['call_id']: message_id for message_id, message in messages.items()}
+        failed = []
+        for call_id, message_id in by_call_id.items():
+            try:
+                table.put_item(
+                    Item=messages[message_id]['item'],
+                    ConditionExpression='attribute_not_exists(call_id)'
+                )
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                    logger.error("Error writing redelivered call record %s: %s", call_id, e)
+                    failed.append(message_id)
+            except Exception as e:
+                logger.error("Error writing redelivered call record %s: %s", call_id, e)
+                failed.append(message_id)
+
+        if failed:
+            logger.error("Failed to write %d redelivered call records", len(failed))
+        return failed
+
+    def publish_notifications(self, messages: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Batch-publish notifications; returns messageIds whose publish failed"""
+        by_entry_id = {}
+        entries = []
+        for message_id, message in messages.items():
+            entry_id = f"n{len(entries)}"
+            by_entry_id[entry_id] = message_id
+            entries.append({
+                'Id': entry_id,
+                'Message': message['notification'],
+                'Subject': 'Care Home Alert'
+            })
+
+        failed = []
+        for start in range(0, len(entries), SNS_BATCH_SIZE):
+            pending = entries[start:start + SNS_BATCH_SIZE]
+            for attempt in range(BATCH_RETRY_ATTEMPTS):
+                try:
+                    response = self.sns_client.publish_batch(
+                        TopicArn=self.topic_arn,
+                        PublishBatchRequestEntries=pending
+                    )
+                    failed_ids = {entry['Id'] for entry in response.get('Failed', [])}
+                    pending = [entry for entry in pending if entry['Id'] in failed_ids]
+                except Exception as e:
+                    logger.error("Error publishing notification batch: %s", e)
+                if not pending:
+                    break
+                self.sleep(BATCH_RETRY_BASE_DELAY * (2 ** attempt))
+
+            failed.extend(by_entry_id[entry['Id']] for entry in pending)
+
+        if failed:
+            logger.error("Failed to publish %d notifications", len(failed))
+        return failed
+
+
+def batch_item_failures(failed_message_ids: List[str]) -> Dict[str, Any]:
+    """SQS partial batch response so only failed records are redelivered"""
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed_message_ids]}
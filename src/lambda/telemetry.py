@@ -0,0 +1,70 @@
+"""
+Alexa Plus Chatbot - Invocation Telemetry
+Low-overhead structured logging for the Lambda hot path
+
+Language: Python 3.9+
+Purpose: Emit one compact timing record per invocation and sample full
+request payloads instead of serializing every one
+"""
+
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+# Fraction of invocations whose full Alexa request is logged (0.0 - 1.0)
+LOG_EVENT_SAMPLE_RATE = float(os.environ.get('LOG_EVENT_SAMPLE_RATE', '0.01'))
+
+
+class LazyJson:
+    """Defers json.dumps until a log record is actually formatted"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __str__(self) -> str:
+        return json.dumps(self.value, separators=(',', ':'), default=str)
+
+
+def should_sample_event(rate: Optional[float] = None) -> bool:
+    """Decide whether this invocation logs its full request"""
+    rate = LOG_EVENT_SAMPLE_RATE if rate is None else rate
+    return rate > 0 and random.random() < rate
+
+
+class InvocationTimer:
+    """Collects compact per-invocation fields such as dispatch/db/sns timings"""
+
+    __slots__ = ('fields', 'started')
+
+    def __init__(self, **fields):
+        self.fields: Dict[str, Any] = fields
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def measure(self, name: str):
+        """Record the duration of a block as <name>_ms"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fields[f"{name}_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    def timed(self, name: str, func):
+        """Wrap func so each call records its duration as <name>_ms.
+
+        Safe to run on worker threads: each call writes its own key.
+        """
+        def wrapper(*args, **kwargs):
+            with self.measure(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def emit(self, logger):
+        """Log the collected fields as a single compact JSON line"""
+        self.fields['total_ms'] = round((time.perf_counter() - self.started) * 1000, 2)
+        logger.info("invocation %s", LazyJson(self.fields))
@@ -0,0 +1,143 @@
+"""
+DynamoDB resource lifecycle tests
+"""
+
+import pytest
+from unittest.mock import patch
+
+from src.fastapi.app.db import dynamodb
+
+
+class FakeResource:
+    """aioboto3 resource stand-in recording Table() calls"""
+
+    def __init__(self):
+        self.table_calls = []
+
+    async def Table(self, name):
+        self.table_calls.append(name)
+        return object()
+
+
+class FakeResourceContext:
+    """What session.resource() returns: an async context manager"""
+
+    def __init__(self, resource):
+        self.resource = resource
+        self.entered = 0
+        self.exited = 0
+
+    async def __aenter__(self):
+        self.entered += 1
+        return self.resource
+
+    async def __aexit__(self, *exc):
+        self.exited += 1
+
+
+class FakeSession:
+    def __init__(self, context):
+        self.context = context
+        self.resource_kwargs = None
+
+    def resource(self, service, **kwargs):
+        self.resource_kwargs = kwargs
+        return self.context
+
+
+@pytest.fixture
+def fake_session():
+    context = FakeResourceContext(FakeResource())
+    session = FakeSession(context)
+    with patch.object(dynamodb.aioboto3, 'Session', return_value=session):
+        yield session
+    dynamodb._dynamodb_resource = None
+    dynamodb._resource_stack = None
+    dynamodb._tables.clear()
+
+
+class TestResourceLifecycle:
+    """Shared resource and Table handle caching"""
+
+    @pytest.mark.asyncio
+    async def test_resource_entered_once_with_pool_config(self, fake_session):
+        await dynamodb.init_dynamodb()
+        await dynamodb.init_dynamodb()
+
+        assert fake_session.context.entered == 1
+        config = fake_session.resource_kwargs['config']
+        assert config.max_pool_connections == dynamodb.settings.AWS_MAX_POOL_CONNECTIONS
+        assert config.tcp_keepalive is True
+
+    @pytest.mark.asyncio
+    async def test_table_handles_are_cached(self, fake_session):
+        await dynamodb.init_dynamodb()
+
+        first = await dynamodb.get_table('calls')
+        second = await dynamodb.get_table('calls')
+        await dynamodb.get_table('residents')
+
+        assert first is second
+        assert fake_session.context.resource.table_calls == ['calls', 'residents']
+
+    @pytest.mark.asyncio
+    async def test_close_exits_resource_and_drops_handles(self, fake_session):
+        await dynamodb.init_dynamodb()
+        await dynamodb.get_table('calls')
+
+        await dynamodb.close_dynamodb()
+
+        assert fake_session.context.exited == 1
+        assert dynamodb._tables == {}
+        with pytest.raises(RuntimeError):
+            dynamodb.get_dynamodb_client()
+
+        # Closing twice is harmless
+        await dynamodb.close_dynamodb()
+        assert fake_session.context.exited == 1
+
+
+class FakeIndexClient:
+    """DescribeTable/UpdateTable stand-in; a new index turns ACTIVE after one poll"""
+
+    def __init__(self, indexes):
+        self.indexes = {name: 'ACTIVE' for name in indexes}
+        self.updates = []
+
+    async def describe_table(self, TableName):
+        description = {'GlobalSecondaryIndexes': [
+            {'IndexName': name, 'IndexStatus': status} for name, status in self.indexes.items()
+        ]}
+        self.indexes = {name: 'ACTIVE' for name in self.indexes}
+        return {'Table': description}
+
+    async def update_table(self, **kwargs):
+        self.updates.append(kwargs)
+        for update in kwargs['GlobalSecondaryIndexUpdates']:
+            self.indexes[update['Create']['IndexName']] = 'CREATING'
+
+
+class TestIndexMigration:
+    """Indexes added to table_definitions() after a table was created"""
+
+    @pytest.mark.asyncio
+    async def test_missing_index_is_created_and_waited_on(self):
+        calls = dynamodb.table_definitions()[0]
+        client = FakeIndexClient(['resident-index'])
+        resource = type('Resource', (), {'meta': type('Meta', (), {'client': client})})
+
+        with patch.object(dynamodb, '_dynamodb_resource', resource):
+            created = await dynamodb.create_missing_indexes(calls, poll_seconds=0)
+
+        assert created == ['day-index']
+        assert client.indexes == {'resident-index': 'ACTIVE', 'day-index': 'ACTIVE'}
+        [update] = client.updates
+        assert update['AttributeDefinitions'] == [
+            {'AttributeName': 'day', 'AttributeType': 'S'},
+            {'AttributeName': 'event_id', 'AttributeType': 'S'}
+        ]
+        assert 'BillingMode' not in update['GlobalSecondaryIndexUpdates'][0]['Create']
+
+        # Nothing left to add on a second run
+        with patch.object(dynamodb, '_dynamodb_resource', resource):
+            assert await dynamodb.create_missing_indexes(calls, poll_seconds=0) == []
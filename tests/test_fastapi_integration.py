@@ -2,17 +2,51 @@
 Integration tests for FastAPI backend
 """
 
+import csv
+import io
+import json
 import pytest
 import asyncio
+from datetime import datetime, timedelta
 from httpx import AsyncClient
 from fastapi.testclient import TestClient
 
 from src.fastapi.app.main import app
+from src.fastapi.app.api.v1.endpoints.auth import get_current_active_user
 from src.fastapi.app.core.config import settings
+from src.fastapi.app.core.ids import uuid7
+from src.fastapi.app.db.directory import resident_directory
+from src.fastapi.app.db.repositories import call_event_cache
+from src.fastapi.app.models.user import User
 
 # Test client
 client = TestClient(app)
 
+CAREGIVER = User(user_id="cg-001", username="carer", email="carer@example.com", full_name="Test Carer")
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Client against the embedded SQLite backend, signed in as a caregiver"""
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "SQLITE_PATH", ":memory:")
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    app.dependency_overrides[get_current_active_user] = lambda: CAREGIVER
+    call_event_cache.clear()
+    resident_directory.clear()
+    with TestClient(app) as api_client:
+        yield api_client
+    app.dependency_overrides.clear()
+    call_event_cache.clear()
+    resident_directory.clear()
+
+
+def create_call(api, resident_id="res-001", event_type="touch_call"):
+    """Create one call through the API and return it"""
+    response = api.post("/api/v1/calls/", json={"resident_id": resident_id, "event_type": event_type})
+    assert response.status_code == 200
+    return response.json()
+
 
 class TestHealthEndpoints:
     """Test health check endpoints"""
@@ -93,6 +127,208 @@ class TestWebSocketEndpoints:
             assert websocket is not None
 
 
+class TestCallBatchEndpoint:
+    """POST /calls/batch"""
+    
+    def test_batch_creates_and_reports_resent_events(self, api):
+        """Test a resent batch reports its events as already present"""
+        now = datetime.utcnow()
+        events = [
+            {
+                "event_id": uuid7(now - timedelta(seconds=n)),
+                "timestamp": (now - timedelta(seconds=n)).isoformat(),
+                "resident_id": "res-001",
+                "event_type": "touch_call"
+            }
+            for n in range(3)
+        ]
+        
+        response = api.post("/api/v1/calls/batch", json={"events": events})
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["created"], data["existing"], data["failed"]) == (3, 0, 0)
+        
+        data = api.post("/api/v1/calls/batch", json={"events": events}).json()
+        assert (data["created"], data["existing"], data["failed"]) == (0, 3, 0)
+        assert all(result["existing"] for result in data["results"])
+    
+    def test_batch_rejects_event_ids_not_minted_at_the_timestamp(self, api):
+        """Test a client event_id must be a UUIDv7 from the call's time"""
+        now = datetime.utcnow()
+        response = api.post("/api/v1/calls/batch", json={"events": [{
+            "event_id": uuid7(now - timedelta(hours=1)),
+            "timestamp": now.isoformat(),
+            "resident_id": "res-001",
+            "event_type": "touch_call"
+        }]})
+        assert response.status_code == 422
+
+
+class TestCallLookupEndpoint:
+    """GET /calls/?ids="""
+    
+    def test_ids_returns_known_calls_and_omits_unknown(self, api):
+        """Test several calls are fetched in one request"""
+        first, second = create_call(api), create_call(api, resident_id="res-002")
+        
+        response = api.get("/api/v1/calls/", params={"ids": f"{first['event_id']},{second['event_id']},{uuid7()}"})
+        assert response.status_code == 200
+        assert {call["event_id"] for call in response.json()} == {first["event_id"], second["event_id"]}
+    
+    def test_ids_is_required(self, api):
+        """Test listing without ids points at /calls/recent"""
+        response = api.get("/api/v1/calls/")
+        assert response.status_code == 400
+    
+    def test_too_many_ids_rejected(self, api):
+        """Test one request is capped at MAX_IDS_PER_REQUEST ids"""
+        response = api.get("/api/v1/calls/", params={"ids": ",".join(uuid7() for _ in range(501))})
+        assert response.status_code == 400
+
+
+class TestSparseFieldsets:
+    """?fields= on list endpoints"""
+    
+    def test_summary_preset(self, api):
+        """Test ?fields=summary returns only the summary fields"""
+        create_call(api)
+        
+        response = api.get("/api/v1/calls/recent", params={"fields": "summary"})
+        assert response.status_code == 200
+        [call] = response.json()["items"]
+        assert "metadata" not in call and "created_at" not in call
+        assert {"event_id", "resident_id", "event_type", "status", "timestamp"} <= set(call)
+    
+    def test_explicit_fields(self, api):
+        """Test a comma-separated list returns just those fields, with ?ids= too"""
+        call = create_call(api)
+        
+        response = api.get("/api/v1/calls/recent", params={"fields": "event_id,status"})
+        assert response.status_code == 200
+        assert response.json()["items"] == [{"event_id": call["event_id"], "status": "active"}]
+        
+        response = api.get("/api/v1/calls/", params={"ids": call["event_id"], "fields": "event_id,resident_id"})
+        assert response.json() == [{"event_id": call["event_id"], "resident_id": "res-001"}]
+    
+    def test_unknown_fields_rejected(self, api):
+        """Test an unknown field name is a 400, not silently dropped"""
+        response = api.get("/api/v1/calls/recent", params={"fields": "event_id,password"})
+        assert response.status_code == 400
+        assert "password" in response.json()["detail"]
+    
+    def test_resident_summary(self, api):
+        """Test residents accept the same fieldsets"""
+        response = api.post("/api/v1/residents/", json={
+            "name": "Jane", "room_number": "101", "emergency_contacts": [{"name": "Sam", "phone": "555"}]
+        })
+        assert response.status_code == 200
+        
+        response = api.get("/api/v1/residents/", params={"fields": "summary"})
+        assert response.status_code == 200
+        [resident] = response.json()["items"]
+        assert resident["room_number"] == "101"
+        assert "emergency_contacts" not in resident
+
+
+class TestAcknowledgeEndpoint:
+    """POST /calls/{event_id}/acknowledge"""
+    
+    def test_second_acknowledge_conflicts(self, api):
+        """Test only the first caregiver to acknowledge records a response time"""
+        call = create_call(api)
+        
+        response = api.post(f"/api/v1/calls/{call['event_id']}/acknowledge")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "acknowledged"
+        assert data["caregiver_id"] == CAREGIVER.user_id
+        assert data["response_time"] is not None
+        
+        response = api.post(f"/api/v1/calls/{call['event_id']}/acknowledge")
+        assert response.status_code == 409
+    
+    def test_acknowledge_unknown_call(self, api):
+        """Test acknowledging a call that does not exist is a 404"""
+        response = api.post(f"/api/v1/calls/{uuid7()}/acknowledge")
+        assert response.status_code == 404
+
+
+class TestTimeSeriesEndpoint:
+    """GET /system/timeseries"""
+    
+    def test_series_counts_calls_by_step(self, api):
+        """Test calls and acknowledgements land in the step they were made in"""
+        create_call(api, event_type="touch_call")
+        call = create_call(api, event_type="emergency")
+        api.post(f"/api/v1/calls/{call['event_id']}/acknowledge")
+        
+        response = api.get("/api/v1/system/timeseries", params={"step": "6h"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["step_seconds"] == 6 * 3600
+        assert sum(point["calls"] for point in data["points"]) == 2
+        assert sum(point["acknowledged"] for point in data["points"]) == 1
+        by_type = {}
+        for point in data["points"]:
+            for event_type, count in point["by_type"].items():
+                by_type[event_type] = by_type.get(event_type, 0) + count
+        assert by_type == {"touch_call": 1, "emergency": 1}
+    
+    @pytest.mark.parametrize("step", ["90m", "0h", "1w", "h", "999d"])
+    def test_bad_step_rejected(self, api, step):
+        """Test a step that is not a whole number of hours or days is a 400"""
+        response = api.get("/api/v1/system/timeseries", params={"step": step})
+        assert response.status_code == 400
+    
+    def test_range_must_be_ordered(self, api):
+        """Test from must come before to"""
+        now = datetime.utcnow()
+        response = api.get("/api/v1/system/timeseries", params={
+            "from": now.isoformat(), "to": (now - timedelta(hours=1)).isoformat()
+        })
+        assert response.status_code == 400
+
+
+class TestExportEndpoint:
+    """GET /calls/export"""
+    
+    def export_range(self):
+        now = datetime.utcnow()
+        return {"from": (now - timedelta(hours=1)).isoformat(), "to": (now + timedelta(minutes=1)).isoformat()}
+    
+    def test_ndjson_export_is_oldest_first(self, api):
+        """Test one JSON call per line, in call order"""
+        calls = [create_call(api, resident_id=f"res-00{n}") for n in range(3)]
+        
+        response = api.get("/api/v1/calls/export", params=self.export_range())
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert "attachment" in response.headers["content-disposition"]
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["event_id"] for line in lines] == [call["event_id"] for call in calls]
+    
+    def test_csv_export_filtered_by_resident(self, api):
+        """Test CSV has a header row and only the requested resident's calls"""
+        create_call(api, resident_id="res-001")
+        create_call(api, resident_id="res-002")
+        
+        response = api.get("/api/v1/calls/export", params={**self.export_range(), "format": "csv", "resident_id": "res-002"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["resident_id"] for row in rows] == ["res-002"]
+        assert json.loads(rows[0]["metadata"]) == {}
+    
+    def test_bad_format_and_range_rejected(self, api):
+        """Test unknown formats and reversed ranges are a 400"""
+        response = api.get("/api/v1/calls/export", params={**self.export_range(), "format": "xml"})
+        assert response.status_code == 400
+        
+        now = datetime.utcnow()
+        response = api.get("/api/v1/calls/export", params={"from": now.isoformat(), "to": (now - timedelta(hours=1)).isoformat()})
+        assert response.status_code == 400
+
+
 class TestDatabaseIntegration:
     """Test database integration (mocked)"""
     
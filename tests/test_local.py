@@ -8,6 +8,7 @@ Purpose: Test Lambda function locally without AWS dependencies
 import json
 import sys
 import os
+import time
 import unittest
 from datetime import datetime
 from unittest.mock import Mock, patch, MagicMock
@@ -16,7 +17,9 @@ from unittest.mock import Mock, patch, MagicMock
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'lambda'))
 
 try:
-    from lambda_function import AlexaCareHandler, lambda_handler
+    from lambda_function import AlexaCareHandler, DeviceRegistry, lambda_handler, new_call_id
+    from outbox import InProcessOutbox, OutboxConsumer
+    from migrations import backfill_pending_markers
 except ImportError as e:
     print(f"❌ Error importing lambda_function: {e}")
     print("Make sure lambda_function.py exists in src/lambda/")
@@ -200,6 +203,125 @@ class TestAlexaCareHandler(unittest.TestCase):
                 "Acknowledged. Resident has been notified."
             )
     
+    def test_acknowledge_latest_call_uses_pending_index(self):
+        """Test acknowledgment queries the sparse pending index instead of scanning"""
+        self.handler.calls_table.query.return_value = {
+            "Items": [{"call_id": "call-2", "timestamp": "2024-01-01T10:05:00"}]
+        }
+        
+        self.handler.acknowledge_latest_call()
+        
+        self.handler.calls_table.scan.assert_not_called()
+        query_kwargs = self.handler.calls_table.query.call_args.kwargs
+        self.assertEqual(query_kwargs["IndexName"], "pending-calls-index")
+        self.assertEqual(query_kwargs["Limit"], 1)
+        self.assertFalse(query_kwargs["ScanIndexForward"])
+        
+        update_kwargs = self.handler.calls_table.update_item.call_args.kwargs
+        self.assertEqual(update_kwargs["Key"], {"call_id": "call-2"})
+        self.assertIn("REMOVE #pending", update_kwargs["UpdateExpression"])
+    
+    def test_acknowledge_latest_call_skips_already_acknowledged(self):
+        """Test a call acknowledged concurrently falls through to the next pending call"""
+        from botocore.exceptions import ClientError
+        
+        self.handler.calls_table.query.side_effect = [
+            {"Items": [{"call_id": "call-2"}]},
+            {"Items": [{"call_id": "call-1"}]}
+        ]
+        self.handler.calls_table.update_item.side_effect = [
+            ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"),
+            {}
+        ]
+        
+        self.handler.acknowledge_latest_call()
+        
+        self.assertEqual(self.handler.calls_table.update_item.call_count, 2)
+        self.assertEqual(
+            self.handler.calls_table.update_item.call_args.kwargs["Key"],
+            {"call_id": "call-1"}
+        )
+    
+    def test_side_effects_run_concurrently(self):
+        """Test the call record and notification overlap instead of running back to back"""
+        def slow_call(*args):
+            time.sleep(0.2)
+        
+        with patch.object(self.handler, 'create_call_record', side_effect=slow_call) as record, \
+             patch.object(self.handler, 'notify_main_device', side_effect=slow_call) as notify:
+            
+            start = time.perf_counter()
+            self.handler.dispatch_call("room1", "emergency", "Help Request", "URGENT")
+            elapsed = time.perf_counter() - start
+        
+        record.assert_called_once()
+        notify.assert_called_once_with("URGENT")
+        self.assertLess(elapsed, 0.35)
+    
+    def test_side_effects_respect_latency_budget(self):
+        """Test the handler stops waiting once the latency budget runs out"""
+        def stuck_call(*args):
+            time.sleep(0.5)
+        
+        with patch('lambda_function.SIDE_EFFECT_BUDGET_SECONDS', 0.1), \
+             patch.object(self.handler, 'create_call_record', side_effect=stuck_call), \
+             patch.object(self.handler, 'notify_main_device'):
+            
+            start = time.perf_counter()
+            self.handler.dispatch_call("room1", "touch_call", "Jane", "Jane is calling")
+            elapsed = time.perf_counter() - start
+        
+        self.assertLess(elapsed, 0.4)
+    
+    def test_warmup_event_primes_without_writing(self):
+        """Test scheduled warm-up pings never create call records"""
+        event = {"source": "aws.events", "detail-type": "Scheduled Event"}
+        
+        with patch('lambda_function.get_sns') as get_sns:
+            response = self.handler.lambda_handler(event, None)
+        
+        self.assertEqual(response, {"warmup": True})
+        get_sns.assert_called_once()
+        get_sns.return_value.publish.assert_not_called()
+        self.handler.calls_table.put_item.assert_not_called()
+        self.handler.calls_table.get_item.assert_called_once()
+    
+    def test_invocation_emits_compact_timing_record(self):
+        """Test one structured timing line per invocation without the full event"""
+        event = {
+            "request": {
+                "type": "IntentRequest",
+                "intent": {"name": "HelpWakeWordIntent"}
+            },
+            "context": {
+                "System": {
+                    "device": {"deviceId": "room1_device_123"}
+                }
+            }
+        }
+        
+        with patch('lambda_function.should_sample_event', return_value=False), \
+             patch.object(self.handler, 'notify_main_device'), \
+             self.assertLogs(level='INFO') as logs:
+            self.handler.lambda_handler(event, None)
+        
+        self.assertFalse(any("Received event" in line for line in logs.output))
+        timing_lines = [line for line in logs.output if "invocation {" in line]
+        self.assertEqual(len(timing_lines), 1)
+        fields = json.loads(timing_lines[0].split("invocation ", 1)[1])
+        self.assertEqual(fields["intent"], "HelpWakeWordIntent")
+        for key in ("db_ms", "sns_ms", "dispatch_ms", "total_ms"):
+            self.assertIn(key, fields)
+    
+    def test_call_ids_are_time_ordered(self):
+        """Test call IDs are UUIDv7 and sort by creation time"""
+        first = new_call_id()
+        time.sleep(0.002)
+        second = new_call_id()
+        
+        self.assertEqual(first[14], "7")
+        self.assertLess(first, second)
+    
     def test_get_room_from_device(self):
         """Test room extraction from device ID"""
         self.assertEqual(self.handler.get_room_from_device("room1_device_123"), "room1")
@@ -230,6 +352,371 @@ class TestAlexaCareHandler(unittest.TestCase):
         emergency_apl = self.handler.get_emergency_apl()
         self.assertEqual(emergency_apl["type"], "APL")
         self.assertIn("EMERGENCY", str(emergency_apl))
+    
+    def test_apl_documents_are_built_once(self):
+        """Test APL documents and directives are reused across invocations"""
+        self.assertIs(self.handler.get_emergency_apl(), self.handler.get_emergency_apl())
+        
+        first = self.handler.build_response("Help", apl_document=self.handler.get_emergency_apl())
+        second = self.handler.build_response("Help", apl_document=self.handler.get_emergency_apl())
+        self.assertIs(first["response"]["directives"], second["response"]["directives"])
+        self.assertEqual(
+            first["response"]["directives"][0]["document"]["type"],
+            "APL"
+        )
+        
+        # Ad-hoc documents are still wrapped in a RenderDocument directive
+        custom = self.handler.build_response("Hi", apl_document={"type": "APL"})
+        self.assertEqual(custom["response"]["directives"][0]["document"], {"type": "APL"})
+
+class TestDeviceRegistry(unittest.TestCase):
+    """Unit tests for the device-to-room registry"""
+    
+    def setUp(self):
+        """Set up a registry over a mock residents table and a fake clock"""
+        self.now = 1000.0
+        self.table = Mock()
+        self.table.scan.side_effect = [
+            {
+                "Items": [
+                    {"device_id": "amzn1.device.A", "room_number": "101", "name": "Alice", "active": True}
+                ],
+                "LastEvaluatedKey": {"resident_id": "r1"}
+            },
+            {
+                "Items": [
+                    {"device_id": "amzn1.device.B", "room_number": "102", "name": "Bob", "active": True},
+                    {"device_id": "amzn1.device.C", "room_number": "103", "name": "Cara", "active": False}
+                ]
+            }
+        ]
+        self.registry = DeviceRegistry(self.table, ttl_seconds=60, clock=lambda: self.now)
+    
+    def test_lookup_loads_all_pages(self):
+        """Test mappings are loaded across scan pages and looked up by device"""
+        self.assertEqual(self.registry.lookup("amzn1.device.A"), ("101", "Alice"))
+        self.assertEqual(self.registry.lookup("amzn1.device.B"), ("102", "Bob"))
+        self.assertIsNone(self.registry.lookup("amzn1.device.C"))
+        self.assertEqual(self.registry.resident_for_room("102"), "Bob")
+        self.assertEqual(
+            self.table.scan.call_args_list[1].kwargs["ExclusiveStartKey"],
+            {"resident_id": "r1"}
+        )
+    
+    def test_index_is_reused_until_ttl_expires(self):
+        """Test warm lookups do not rescan until the TTL passes"""
+        self.registry.lookup("amzn1.device.A")
+        self.registry.lookup("amzn1.device.B")
+        self.assertEqual(self.table.scan.call_count, 2)
+        
+        self.now += 61
+        self.table.scan.side_effect = [
+            {"Items": [{"device_id": "amzn1.device.A", "room_number": "201", "name": "Alice"}]}
+        ]
+        self.assertEqual(self.registry.lookup("amzn1.device.A"), ("201", "Alice"))
+    
+    def test_failed_refresh_keeps_previous_index(self):
+        """Test a failing reload keeps serving the last good index"""
+        self.registry.lookup("amzn1.device.A")
+        
+        self.now += 61
+        self.table.scan.side_effect = Exception("throttled")
+        self.assertEqual(self.registry.lookup("amzn1.device.A"), ("101", "Alice"))
+    
+    def test_development_device_ids_fall_back_to_room_pattern(self):
+        """Test device IDs that encode a room resolve without a table"""
+        registry = DeviceRegistry()
+        self.assertEqual(registry.lookup("room12_device_abc"), ("room12", "Room room12"))
+        self.assertEqual(registry.lookup("room1_device_123"), ("room1", "Jane"))
+        self.assertIsNone(registry.lookup("unknown_device"))
+
+class TestCallDebounce(unittest.TestCase):
+    """Unit tests for collapsing repeated call-button presses"""
+    
+    def setUp(self):
+        """Set up a handler with mocked table and notifications"""
+        self.handler = AlexaCareHandler()
+        self.handler.calls_table = Mock()
+        self.event = {
+            "request": {"type": "Alexa.Presentation.APL.UserEvent"},
+            "context": {"System": {"device": {"deviceId": "room1_device_123"}}}
+        }
+    
+    def test_repeat_presses_collapse_in_warm_container(self):
+        """Test presses within the window create one call and count the rest"""
+        with patch.object(self.handler, 'notify_main_device') as notify, \
+             patch.object(self.handler, 'create_call_record') as record:
+            for _ in range(3):
+                self.handler.lambda_handler(self.event, None)
+        
+        record.assert_called_once()
+        notify.assert_called_once()
+        call_id = record.call_args.args[0]
+        repeat_updates = [
+            c for c in self.handler.calls_table.update_item.call_args_list
+            if "ADD press_count" in c.kwargs["UpdateExpression"]
+        ]
+        self.assertEqual(len(repeat_updates), 2)
+        self.assertEqual(repeat_updates[0].kwargs["Key"], {"call_id": call_id})
+    
+    def test_press_collapses_into_call_from_another_container(self):
+        """Test the conditional lock write finds a call opened elsewhere"""
+        from botocore.exceptions import ClientError
+        
+        expires_at_ms = int(time.time() * 1000) + 5000
+        self.handler.calls_table.put_item.side_effect = ClientError({
+            "Error": {"Code": "ConditionalCheckFailedException"},
+            "Item": {
+                "active_call_id": {"S": "call-from-other-container"},
+                "expires_at_ms": {"N": str(expires_at_ms)}
+            }
+        }, "PutItem")
+        
+        with patch.object(self.handler, 'notify_main_device') as notify:
+            response = self.handler.lambda_handler(self.event, None)
+        
+        notify.assert_not_called()
+        self.assertEqual(
+            self.handler.calls_table.update_item.call_args.kwargs["Key"],
+            {"call_id": "call-from-other-container"}
+        )
+        self.assertEqual(
+            response["response"]["outputSpeech"]["text"],
+            "Calling caregiver now. Help is on the way."
+        )
+    
+    def test_lock_failure_still_creates_call(self):
+        """Test a failing lock write never drops the call"""
+        self.handler.calls_table.put_item.side_effect = [Exception("throttled"), None]
+        
+        with patch.object(self.handler, 'notify_main_device') as notify:
+            self.handler.lambda_handler(self.event, None)
+        
+        notify.assert_called_once_with("Jane is calling")
+    
+    def test_window_expiry_opens_new_call(self):
+        """Test a press after the window creates a fresh call"""
+        now = [0.0]
+        self.handler.debounce_cache.clock = lambda: now[0]
+        
+        with patch.object(self.handler, 'notify_main_device') as notify, \
+             patch.object(self.handler, 'create_call_record'):
+            self.handler.lambda_handler(self.event, None)
+            now[0] += 11
+            self.handler.lambda_handler(self.event, None)
+        
+        self.assertEqual(notify.call_count, 2)
+    
+    def test_press_after_acknowledge_opens_new_call(self):
+        """Test a press within the window of an acknowledged call is not folded into it"""
+        from botocore.exceptions import ClientError
+        
+        with patch.object(self.handler, 'notify_main_device') as notify, \
+             patch.object(self.handler, 'create_call_record') as record:
+            self.handler.lambda_handler(self.event, None)
+            acknowledged = record.call_args.args[0]
+            
+            self.handler.calls_table.update_item.side_effect = [
+                ClientError({
+                    "Error": {"Code": "ConditionalCheckFailedException"},
+                    "Item": {"call_id": {"S": acknowledged}, "status": {"S": "acknowledged"}}
+                }, "UpdateItem"),
+                None
+            ]
+            self.handler.lambda_handler(self.event, None)
+            # The new call now owns the window
+            self.handler.lambda_handler(self.event, None)
+        
+        self.assertEqual(notify.call_count, 2)
+        self.assertEqual(record.call_count, 2)
+        reopened = record.call_args.args[0]
+        self.assertNotEqual(reopened, acknowledged)
+        lock = self.handler.calls_table.put_item.call_args.kwargs
+        self.assertEqual(lock["Item"]["active_call_id"], reopened)
+        self.assertEqual(lock["ExpressionAttributeValues"][":replacing"], acknowledged)
+        self.assertEqual(self.handler.calls_table.update_item.call_args.kwargs["Key"], {"call_id": reopened})
+    
+    def test_press_after_failed_call_write_opens_new_call(self):
+        """Test a retry is not folded into a call whose record was never written"""
+        from botocore.exceptions import ClientError
+        
+        self.handler.calls_table.put_item.side_effect = [None, Exception("throttled"), None, None]
+        self.handler.calls_table.update_item.side_effect = ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+        )
+        
+        with patch.object(self.handler, 'notify_main_device') as notify:
+            self.handler.lambda_handler(self.event, None)
+            self.handler.lambda_handler(self.event, None)
+        
+        self.assertEqual(notify.call_count, 2)
+        records = [
+            c.kwargs["Item"]["call_id"] for c in self.handler.calls_table.put_item.call_args_list
+            if not c.kwargs["Item"]["call_id"].startswith("debounce#")
+        ]
+        self.assertEqual(len(records), 2)
+        self.assertNotEqual(records[0], records[1])
+        lock = self.handler.calls_table.put_item.call_args_list[2].kwargs
+        self.assertEqual(lock["Item"]["active_call_id"], records[1])
+        self.assertEqual(lock["ExpressionAttributeValues"][":replacing"], records[0])
+
+class TestPendingBackfill(unittest.TestCase):
+    """Unit tests for marking calls from earlier releases as pending"""
+    
+    def test_open_calls_are_marked_across_scan_pages(self):
+        """Test every open call gets the index attribute; one acknowledged meanwhile is skipped"""
+        from botocore.exceptions import ClientError
+        
+        table = Mock()
+        table.scan.side_effect = [
+            {"Items": [{"call_id": "c1"}, {"call_id": "c2"}], "LastEvaluatedKey": {"call_id": "c2"}},
+            {"Items": [{"call_id": "c3"}]}
+        ]
+        table.update_item.side_effect = [
+            None,
+            ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"),
+            None
+        ]
+        
+        self.assertEqual(backfill_pending_markers(table), 2)
+        self.assertEqual(table.scan.call_args.kwargs["ExclusiveStartKey"], {"call_id": "c2"})
+        self.assertIn("attribute_not_exists(#pending)", table.scan.call_args.kwargs["FilterExpression"])
+        update = table.update_item.call_args.kwargs
+        self.assertEqual(update["Key"], {"call_id": "c3"})
+        self.assertEqual(update["ExpressionAttributeValues"], {":pending": "pending"})
+        self.assertEqual(update["ConditionExpression"], "#status = :pending")
+
+class TestCallOutbox(unittest.TestCase):
+    """Unit tests for the deferred call outbox"""
+    
+    def setUp(self):
+        """Set up a handler writing to an in-process outbox"""
+        self.handler = AlexaCareHandler()
+        self.handler.calls_table = Mock()
+        self.handler.outbox = InProcessOutbox()
+        
+        self.dynamodb = Mock()
+        self.dynamodb.batch_write_item.return_value = {"UnprocessedItems": {}}
+        self.sns = Mock()
+        self.sns.publish_batch.return_value = {"Successful": [], "Failed": []}
+        self.consumer = OutboxConsumer(self.dynamodb, self.sns, "CareHomeCalls", "arn:test",
+                                       sleep=lambda s: None, outbox=self.handler.outbox)
+    
+    def press(self, count):
+        """Queue one touch call from each of the first `count` rooms"""
+        for room in range(1, count + 1):
+            event = {
+                "request": {"type": "Alexa.Presentation.APL.UserEvent"},
+                "context": {"System": {"device": {"deviceId": f"room{room}_device_123"}}}
+            }
+            self.handler.lambda_handler(event, None)
+    
+    def test_handler_queues_instead_of_writing(self):
+        """Test calls are queued and no DynamoDB/SNS call is made inline"""
+        with patch('lambda_function.get_sns') as get_sns:
+            self.press(2)
+            get_sns.return_value.publish.assert_not_called()
+        
+        self.handler.calls_table.put_item.assert_not_called()
+        self.assertEqual(self.handler.outbox.queue.qsize(), 2)
+    
+    def test_drain_writes_in_batches(self):
+        """Test the consumer uses one batch write and one batch publish"""
+        self.press(3)
+        
+        self.assertEqual(self.handler.outbox.drain(self.consumer), 3)
+        
+        request_items = self.dynamodb.batch_write_item.call_args.kwargs["RequestItems"]["CareHomeCalls"]
+        self.assertEqual(len(request_items), 3)
+        self.assertEqual(request_items[0]["PutRequest"]["Item"]["status"], "pending")
+        entries = self.sns.publish_batch.call_args.kwargs["PublishBatchRequestEntries"]
+        self.assertEqual(
+            [e["Message"] for e in entries],
+            ["Jane is calling", "John is calling", "Mary is calling"]
+        )
+    
+    def test_unprocessed_items_are_retried(self):
+        """Test UnprocessedItems are resubmitted until written"""
+        self.press(2)
+        
+        def batch_write(RequestItems):
+            items = RequestItems["CareHomeCalls"]
+            if self.dynamodb.batch_write_item.call_count == 1:
+                return {"UnprocessedItems": {"CareHomeCalls": items[1:]}}
+            return {"UnprocessedItems": {}}
+        
+        self.dynamodb.batch_write_item.side_effect = batch_write
+        
+        self.assertEqual(self.handler.outbox.drain(self.consumer), 2)
+        self.assertEqual(self.dynamodb.batch_write_item.call_count, 2)
+    
+    def test_partial_failures_are_requeued(self):
+        """Test only the failed records go back on the queue"""
+        self.press(3)
+        self.sns.publish_batch.return_value = {"Successful": [], "Failed": [{"Id": "n1"}]}
+        
+        self.handler.outbox.drain(self.consumer)
+        self.assertEqual(self.handler.outbox.queue.qsize(), 1)
+        requeued = json.loads(self.handler.outbox.queue.get_nowait()["body"])
+        self.assertEqual(requeued["notification"], "John is calling")
+        self.assertTrue(requeued["written"])
+    
+    def test_publish_failure_retries_only_the_publish(self):
+        """Test a call written before its publish failed is not written again"""
+        self.press(1)
+        self.sns.publish_batch.return_value = {"Successful": [], "Failed": [{"Id": "n0"}]}
+        self.handler.outbox.drain(self.consumer)
+        
+        self.sns.publish_batch.reset_mock()
+        self.sns.publish_batch.return_value = {"Successful": [], "Failed": []}
+        self.assertEqual(self.handler.outbox.drain(self.consumer), 1)
+        
+        self.assertEqual(self.dynamodb.batch_write_item.call_count, 1)
+        self.dynamodb.Table.return_value.put_item.assert_not_called()
+        self.sns.publish_batch.assert_called_once()
+        self.assertEqual(self.handler.outbox.queue.qsize(), 0)
+    
+    def test_write_failure_retries_only_the_write(self):
+        """Test a notification already published is not sent again when the write is retried"""
+        self.press(1)
+        self.dynamodb.batch_write_item.side_effect = lambda RequestItems: {"UnprocessedItems": RequestItems}
+        self.handler.outbox.drain(self.consumer)
+        
+        self.assertEqual(self.handler.outbox.drain(self.consumer), 1)
+        
+        table = self.dynamodb.Table.return_value
+        self.assertEqual(table.put_item.call_args.kwargs["ConditionExpression"], "attribute_not_exists(call_id)")
+        self.sns.publish_batch.assert_called_once()
+        self.assertEqual(self.handler.outbox.queue.qsize(), 0)
+    
+    def test_redelivery_does_not_overwrite_acknowledged_call(self):
+        """Test a redelivered record is only written if the call is not stored yet"""
+        from botocore.exceptions import ClientError
+        
+        self.press(1)
+        record = self.handler.outbox.queue.get_nowait()
+        record["attributes"] = {"ApproximateReceiveCount": "2"}
+        # Written on the first delivery and acknowledged since
+        table = self.dynamodb.Table.return_value
+        table.put_item.side_effect = ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem"
+        )
+        
+        self.assertEqual(self.consumer.process([record]), [])
+        self.dynamodb.batch_write_item.assert_not_called()
+        self.assertEqual(table.put_item.call_args.kwargs["ConditionExpression"], "attribute_not_exists(call_id)")
+    
+    def test_requeues_are_capped(self):
+        """Test a record that keeps half failing is eventually failed for SQS to redrive"""
+        self.press(1)
+        self.sns.publish_batch.return_value = {"Successful": [], "Failed": [{"Id": "n0"}]}
+        
+        for _ in range(10):
+            self.handler.outbox.drain(self.consumer)
+        
+        record = self.handler.outbox.queue.get_nowait()
+        self.assertEqual(json.loads(record["body"])["requeues"], 5)
+        self.assertEqual(record["attributes"]["ApproximateReceiveCount"], "6")
 
 def run_integration_tests():
     """Run integration tests with sample events"""
@@ -0,0 +1,791 @@
+"""
+Repository tests against an in-memory DynamoDB table stand-in
+"""
+
+import asyncio
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from botocore.exceptions import ClientError
+from pydantic import ValidationError
+
+from src.fastapi.app.core.ids import uuid7, uuid7_lower_bound
+from src.fastapi.app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from src.fastapi.app.db.cache import LRUCache
+from src.fastapi.app.db.directory import ResidentDirectory, resident_directory
+from src.fastapi.app.db.repositories import CallEventRepository, ResidentRepository, RoomOccupiedError
+from src.fastapi.app.db.repositories import CallCounterRepository, CallRollupRepository, ResponseTimeRepository
+from src.fastapi.app.db.repositories import call_event_cache
+from src.fastapi.app.models.call_event import CallEventBatchItem, CallEventCreate, CallEventType, CallEventUpdate
+from src.fastapi.app.models.resident import ResidentCreate, ResidentUpdate
+
+
+def evaluate(condition, item):
+    """Evaluate a boto3 Key/Attr condition against a plain item"""
+    expression = condition.get_expression()
+    operator, values = expression['operator'], expression['values']
+    if operator == 'AND':
+        return all(evaluate(value, item) for value in values)
+    if operator == 'OR':
+        return any(evaluate(value, item) for value in values)
+
+    name = values[0].name
+    if operator == 'attribute_not_exists':
+        return name not in item
+    if name not in item:
+        return False
+    actual = item[name]
+    if operator == '=':
+        return actual == values[1]
+    if operator == '>=':
+        return actual >= values[1]
+    if operator == '<=':
+        return actual <= values[1]
+    if operator == '<':
+        return actual < values[1]
+    if operator == '>':
+        return actual > values[1]
+    if operator == 'BETWEEN':
+        return values[1] <= actual <= values[2]
+    if operator == 'attribute_not_exists':
+        return False
+    raise NotImplementedError(operator)
+
+
+def apply_set(item, expression, values, names=None):
+    """Apply a 'SET a = :a, #b = :b' update expression"""
+    for assignment in expression[len('SET '):].split(','):
+        name, placeholder = (part.strip() for part in assignment.split('='))
+        item[(names or {}).get(name, name)] = values[placeholder]
+
+
+def check(expression, item, values, names=None):
+    """Evaluate the string condition expressions the repositories use"""
+    if ' AND ' in expression:
+        return all(check(part, item, values, names) for part in expression.split(' AND '))
+    for clause in expression.split(' OR '):
+        clause = clause.strip()
+        if clause.startswith('attribute_not_exists('):
+            if clause[len('attribute_not_exists('):-1] not in item:
+                return True
+        elif clause.startswith('attribute_exists('):
+            if clause[len('attribute_exists('):-1] in item:
+                return True
+        else:
+            name, placeholder = (part.strip() for part in clause.split('='))
+            if item.get((names or {}).get(name, name)) == values[placeholder]:
+                return True
+    return False
+
+
+class FakeClient:
+    """Low-level client behind FakeTable.meta, for transactions"""
+
+    def __init__(self, table):
+        self.table = table
+        self.unprocessed = lambda requests: []  # which puts to hand back
+        self.unprocessed_keys = lambda keys: []  # which gets to hand back
+
+    async def batch_get_item(self, RequestItems):
+        (table_name, request), = RequestItems.items()
+        assert len(request['Keys']) <= 100
+        self.table.calls.append(('batch_get_item', {'count': len(request['Keys'])}))
+        unprocessed = self.unprocessed_keys(request['Keys'])
+        found = [dict(self.table.items[k[self.table.key]]) for k in request['Keys']
+                 if k not in unprocessed and k[self.table.key] in self.table.items]
+        response = {'Responses': {table_name: found}, 'UnprocessedKeys': {}}
+        if unprocessed:
+            response['UnprocessedKeys'] = {table_name: {'Keys': unprocessed}}
+        return response
+
+    async def batch_write_item(self, RequestItems):
+        (table_name, requests), = RequestItems.items()
+        assert len(requests) <= 25
+        self.table.calls.append(('batch_write_item', {'count': len(requests)}))
+        unprocessed = self.unprocessed(requests)
+        for request in requests:
+            if request not in unprocessed:
+                item = request['PutRequest']['Item']
+                self.table.items[item[self.table.key]] = dict(item)
+        return {'UnprocessedItems': {table_name: unprocessed} if unprocessed else {}}
+
+    async def transact_write_items(self, TransactItems):
+        self.table.calls.append(('transact_write_items', {'count': len(TransactItems)}))
+        key = self.table.key
+        reasons, failed = [], False
+        for entry in TransactItems:
+            (action, request), = entry.items()
+            item_key = (request.get('Item') or request['Key'])[key]
+            current = self.table.items.get(item_key, {})
+            ok = 'ConditionExpression' not in request or check(
+                request['ConditionExpression'], current, request.get('ExpressionAttributeValues', {}),
+                request.get('ExpressionAttributeNames'))
+            reasons.append({'Code': 'None' if ok else 'ConditionalCheckFailed'})
+            failed = failed or not ok
+        if failed:
+            raise ClientError({'Error': {'Code': 'TransactionCanceledException'},
+                               'CancellationReasons': reasons}, 'TransactWriteItems')
+
+        for entry in TransactItems:
+            (action, request), = entry.items()
+            if action == 'Put':
+                self.table.items[request['Item'][key]] = dict(request['Item'])
+            elif action == 'Delete':
+                self.table.items.pop(request['Key'][key], None)
+            elif action == 'Update':
+                apply_set(self.table.items[request['Key'][key]], request['UpdateExpression'],
+                          request['ExpressionAttributeValues'], request.get('ExpressionAttributeNames'))
+        return {}
+
+
+class FakeTable:
+    """Async stand-in for an aioboto3 Table with GSI queries and paging"""
+
+    def __init__(self, key, indexes=None):
+        self.key = key
+        self.indexes = indexes or {}  # name -> (hash key, range key)
+        self.items = {}
+        self.calls = []
+        self.meta = SimpleNamespace(client=FakeClient(self))
+
+    async def put_item(self, Item, **kwargs):
+        self.calls.append(('put_item', kwargs))
+        self.items[Item[self.key]] = dict(Item)
+        return {}
+
+    async def get_item(self, Key, **kwargs):
+        self.calls.append(('get_item', kwargs))
+        item = self.items.get(Key[self.key])
+        return {'Item': dict(item)} if item else {}
+
+    async def update_item(self, Key, UpdateExpression, ExpressionAttributeValues,
+                          ExpressionAttributeNames=None, ReturnValues=None, **kwargs):
+        self.calls.append(('update_item', kwargs))
+        item = self.items.setdefault(Key[self.key], dict(Key))
+        apply_set(item, UpdateExpression, ExpressionAttributeValues, ExpressionAttributeNames)
+        return {'Attributes': dict(item)} if ReturnValues == 'ALL_NEW' else {}
+
+    async def query(self, KeyConditionExpression, IndexName=None, Limit=None,
+                    ScanIndexForward=True, ExclusiveStartKey=None, **kwargs):
+        self.calls.append(('query', {'IndexName': IndexName, 'Limit': Limit}))
+        hash_key, range_key = self.indexes[IndexName] if IndexName else (self.key, None)
+        matches = [i for i in self.items.values()
+                   if hash_key in i and evaluate(KeyConditionExpression, i)]
+        matches.sort(key=lambda i: i.get(range_key, ''), reverse=not ScanIndexForward)
+
+        start = 0
+        if ExclusiveStartKey:
+            ids = [i[self.key] for i in matches]
+            start = ids.index(ExclusiveStartKey[self.key]) + 1
+        page = matches[start:start + Limit] if Limit else matches[start:]
+
+        response = {'Items': [dict(i) for i in page]}
+        if Limit and start + Limit < len(matches):
+            response['LastEvaluatedKey'] = {self.key: page[-1][self.key]}
+        return response
+
+    async def scan(self, FilterExpression=None, Limit=None, ExclusiveStartKey=None, **kwargs):
+        self.calls.append(('scan', {'Limit': Limit}))
+        keys = sorted(self.items)
+        start = keys.index(ExclusiveStartKey[self.key]) + 1 if ExclusiveStartKey else 0
+        evaluated = keys[start:start + Limit] if Limit else keys[start:]
+
+        items = [dict(self.items[k]) for k in evaluated]
+        if FilterExpression is not None:
+            items = [i for i in items if evaluate(FilterExpression, i)]
+        response = {'Items': items}
+        if Limit and start + Limit < len(keys):
+            response['LastEvaluatedKey'] = {self.key: evaluated[-1]}
+        return response
+
+
+@pytest.fixture
+def calls_table():
+    table = FakeTable('event_id', {
+        'day-index': ('day', 'event_id'),
+        'resident-index': ('resident_id', 'timestamp'),
+    })
+    call_event_cache.clear()
+    # Counters need real ADD semantics; they are covered in test_sqlite_backend
+    with patch('src.fastapi.app.db.repositories.get_table', return_value=table), \
+         patch.object(CallCounterRepository, 'add', AsyncMock()), \
+         patch.object(ResponseTimeRepository, 'record', AsyncMock()), \
+         patch.object(CallRollupRepository, 'increment', AsyncMock()):
+        yield table
+    call_event_cache.clear()
+
+
+@pytest.fixture
+def residents_table():
+    table = FakeTable('resident_id')
+    resident_directory.clear()
+    with patch('src.fastapi.app.db.repositories.get_table', return_value=table):
+        yield table
+    resident_directory.clear()
+
+
+def add_call(table, moment, resident_id='r1'):
+    event_id = uuid7(moment)
+    table.items[event_id] = {
+        'event_id': event_id,
+        'timestamp': moment.isoformat(),
+        'day': moment.strftime('%Y-%m-%d'),
+        'resident_id': resident_id,
+        'event_type': 'touch_call',
+        'status': 'active'
+    }
+    return event_id
+
+
+def add_resident(table, n, active=True):
+    table.items[f"res-{n:03d}"] = {
+        'resident_id': f"res-{n:03d}",
+        'name': f"Resident {n}",
+        'room_number': str(100 + n),
+        'active': active
+    }
+
+
+class TestTimeOrderedIds:
+    """UUIDv7 event IDs"""
+
+    def test_ids_sort_by_creation_time(self):
+        base = datetime(2024, 5, 1, 12, 0, 0)
+        ids = [uuid7(base + timedelta(milliseconds=ms)) for ms in (0, 1, 250, 60_000)]
+        assert ids == sorted(ids)
+
+    def test_version_and_variant(self):
+        value = uuid7()
+        assert value[14] == '7'
+        assert value[19] in '89ab'
+
+    def test_lower_bound_precedes_ids_from_that_moment(self):
+        moment = datetime(2024, 5, 1, 12, 0, 0)
+        assert uuid7_lower_bound(moment) <= uuid7(moment)
+        assert uuid7(moment - timedelta(milliseconds=1)) < uuid7_lower_bound(moment)
+
+
+class TestCallEventRepository:
+    """CallEventRepository against the fake table"""
+
+    @pytest.mark.asyncio
+    async def test_create_writes_day_bucket_and_time_ordered_id(self, calls_table):
+        repo = CallEventRepository()
+        event = await repo.create(CallEventCreate(resident_id="r1", event_type=CallEventType.TOUCH_CALL))
+
+        item = calls_table.items[event.event_id]
+        assert item['day'] == datetime.utcnow().strftime('%Y-%m-%d')
+        assert event.event_id[14] == '7'
+
+    @pytest.mark.asyncio
+    async def test_stats_writes_run_together(self, calls_table):
+        """The counter ADD does not wait on the rollup ADD, or vice versa"""
+        rollup_started = asyncio.Event()
+
+        async def add_counter(deltas):
+            await asyncio.wait_for(rollup_started.wait(), timeout=1)
+
+        async def add_rollup(*args):
+            rollup_started.set()
+
+        with patch.object(CallCounterRepository, 'add', side_effect=add_counter), \
+             patch.object(CallRollupRepository, 'increment', side_effect=add_rollup):
+            repo = CallEventRepository()
+            event = await repo.create(CallEventCreate(resident_id="r1", event_type=CallEventType.TOUCH_CALL))
+            rollup_started.clear()
+            await repo.create_many([CallEventBatchItem(resident_id="r1", event_type=CallEventType.TOUCH_CALL)])
+            rollup_started.clear()
+            await repo.update(event.event_id, CallEventUpdate(status='acknowledged', response_time=30))
+
+    @pytest.mark.asyncio
+    async def test_response_time_aggregates_are_written_together(self):
+        """The day's and the caregiver's aggregate updates overlap"""
+        in_flight, peak = 0, 0
+
+        class Table:
+            async def update_item(self, **kwargs):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0)
+                in_flight -= 1
+
+        with patch('src.fastapi.app.db.repositories.get_table', AsyncMock(return_value=Table())):
+            await ResponseTimeRepository().record('2026-01-31', 'cg1', 30)
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_get_since_is_a_range_query(self, calls_table):
+        repo = CallEventRepository()
+        now = datetime.utcnow()
+        for minutes_ago in (90, 30, 10, 5):
+            moment = now - timedelta(minutes=minutes_ago)
+            event_id = uuid7(moment)
+            calls_table.items[event_id] = {
+                'event_id': event_id,
+                'timestamp': moment.isoformat(),
+                'day': moment.strftime('%Y-%m-%d'),
+                'resident_id': 'r1',
+                'event_type': 'touch_call',
+                'status': 'active'
+            }
+
+        events = await repo.get_since(now - timedelta(minutes=20))
+
+        assert [e.timestamp for e in events] == sorted(e.timestamp for e in events)
+        assert len(events) == 2
+        assert all(name == 'query' for name, _ in calls_table.calls)
+
+    @pytest.mark.asyncio
+    async def test_get_recent_is_newest_first_across_day_buckets(self, calls_table):
+        repo = CallEventRepository()
+        now = datetime.utcnow()
+        for hours_ago in (1, 2, 30, 54, 24 * 10):
+            moment = now - timedelta(hours=hours_ago)
+            event_id = uuid7(moment)
+            calls_table.items[event_id] = {
+                'event_id': event_id,
+                'timestamp': moment.isoformat(),
+                'day': moment.strftime('%Y-%m-%d'),
+                'resident_id': 'r1',
+                'event_type': 'touch_call',
+                'status': 'active'
+            }
+
+        events = await repo.get_recent(limit=50)
+
+        # The 10-day-old event is outside the window
+        assert len(events) == 4
+        assert [e.timestamp for e in events] == sorted((e.timestamp for e in events), reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_get_recent_stops_once_limit_is_met(self, calls_table):
+        repo = CallEventRepository()
+        now = datetime.utcnow()
+        for seconds_ago in range(5):
+            moment = now - timedelta(seconds=seconds_ago)
+            event_id = uuid7(moment)
+            calls_table.items[event_id] = {
+                'event_id': event_id,
+                'timestamp': moment.isoformat(),
+                'day': moment.strftime('%Y-%m-%d'),
+                'resident_id': 'r1',
+                'event_type': 'touch_call',
+                'status': 'active'
+            }
+
+        events = await repo.get_recent(limit=2)
+
+        assert len(events) == 2
+        assert events[0].timestamp > events[1].timestamp
+        assert calls_table.calls == [('query', {'IndexName': 'day-index', 'Limit': 2})]
+
+
+class TestCursors:
+    """Signed pagination cursors"""
+
+    def test_round_trip(self):
+        key = {'day': '2024-05-01', 'event_id': 'abc'}
+        assert decode_cursor(encode_cursor(key, 'calls:recent'), 'calls:recent') == key
+
+    def test_tampered_cursor_is_rejected(self):
+        cursor = encode_cursor({'resident_id': 'res-001'}, 'residents:active')
+        _, signature = cursor.split('.')
+        forged = encode_cursor({'resident_id': 'res-999'}, 'residents:active').split('.')[0]
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(f"{forged}.{signature}", 'residents:active')
+        with pytest.raises(InvalidCursorError):
+            decode_cursor('not-a-cursor', 'residents:active')
+
+    def test_cursor_is_bound_to_its_listing(self):
+        cursor = encode_cursor({'resident_id': 'r1'}, 'calls:resident:r1')
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, 'calls:resident:r2')
+
+
+class TestPagination:
+    """Cursor pagination through the list queries"""
+
+    @pytest.mark.asyncio
+    async def test_recent_pages_cover_every_event_once(self, calls_table):
+        repo = CallEventRepository()
+        now = datetime.utcnow()
+        expected = {add_call(calls_table, now - timedelta(hours=h)) for h in range(0, 60, 4)}
+
+        seen, cursor = [], None
+        while True:
+            page = await repo.get_recent_page(limit=4, cursor=cursor)
+            seen.extend(e.event_id for e in page.items)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+
+        assert seen == sorted(expected, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_resident_pages(self, calls_table):
+        repo = CallEventRepository()
+        now = datetime.utcnow()
+        for minutes_ago in range(5):
+            add_call(calls_table, now - timedelta(minutes=minutes_ago), resident_id='r1')
+        add_call(calls_table, now, resident_id='r2')
+
+        first = await repo.get_by_resident_page('r1', limit=3)
+        second = await repo.get_by_resident_page('r1', limit=3, cursor=first.next_cursor)
+
+        assert len(first.items) == 3 and len(second.items) == 2
+        assert second.next_cursor is None
+        assert {e.resident_id for e in first.items + second.items} == {'r1'}
+
+    @pytest.mark.asyncio
+    async def test_resident_pages_fill_through_filtered_scans(self, residents_table):
+        repo = ResidentRepository()
+        for n in range(12):
+            add_resident(residents_table, n, active=n % 3 != 0)
+
+        seen, cursor = [], None
+        while True:
+            page = await repo.get_page(active_only=True, limit=5, cursor=cursor)
+            assert len(page.items) <= 5
+            seen.extend(r.resident_id for r in page.items)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+
+        assert len(seen) == len(set(seen)) == 8
+
+    @pytest.mark.asyncio
+    async def test_get_all_follows_scan_pages(self, residents_table):
+        repo = ResidentRepository()
+        for n in range(3):
+            add_resident(residents_table, n)
+
+        # Cap the fake at one item per page, as DynamoDB does at 1 MB
+        scan = residents_table.scan
+
+        async def one_per_page(**kwargs):
+            return await scan(Limit=1, **kwargs)
+
+        residents_table.scan = one_per_page
+        residents = await repo.get_all(active_only=True)
+
+        assert len(residents) == 3
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResidentDirectory:
+    """Resident reads served from the in-memory directory"""
+
+    @pytest.mark.asyncio
+    async def test_roster_is_scanned_once_within_ttl(self, residents_table):
+        clock = FakeClock()
+        repo = ResidentRepository(ResidentDirectory(ttl_seconds=60, clock=clock))
+        for n in range(3):
+            add_resident(residents_table, n, active=n != 2)
+
+        assert len(await repo.get_all(active_only=True)) == 2
+        assert len(await repo.get_all(active_only=False)) == 3
+        assert (await repo.get_by_room('101')).resident_id == 'res-001'
+        assert await repo.get_by_room('102') is None  # inactive
+        assert [name for name, _ in residents_table.calls] == ['scan']
+
+        clock.now = 61
+        add_resident(residents_table, 3)
+        assert len(await repo.get_all(active_only=True)) == 3
+        assert [name for name, _ in residents_table.calls] == ['scan', 'scan']
+
+    @pytest.mark.asyncio
+    async def test_writes_go_through_to_directory(self, residents_table):
+        repo = ResidentRepository(ResidentDirectory(ttl_seconds=60, clock=FakeClock()))
+        await repo.get_all()
+
+        resident = await repo.create(ResidentCreate(name="Mary", room_number="12", device_id="echo-12"))
+        assert (await repo.get_by_room('12')).resident_id == resident.resident_id
+        assert (await repo.get_by_device('echo-12')).resident_id == resident.resident_id
+
+        await repo.update(resident.resident_id, ResidentUpdate(room_number="14"))
+        assert await repo.get_by_room('12') is None
+        assert (await repo.get_by_room('14')).resident_id == resident.resident_id
+
+        await repo.delete(resident.resident_id)
+        assert await repo.get_by_room('14') is None
+        assert await repo.get_all(active_only=True) == []
+        assert [name for name, _ in residents_table.calls].count('scan') == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_id_falls_back_to_table(self, residents_table):
+        repo = ResidentRepository(ResidentDirectory(ttl_seconds=60, clock=FakeClock()))
+        await repo.get_all()
+        add_resident(residents_table, 7)  # written by another process
+
+        resident = await repo.get_by_id('res-007')
+
+        assert resident.room_number == '107'
+        assert ('get_item', {}) in residents_table.calls
+
+
+class TestRoomLocks:
+    """Room uniqueness through conditional room-lock writes"""
+
+    @pytest.mark.asyncio
+    async def test_second_resident_in_room_is_rejected(self, residents_table):
+        repo = ResidentRepository(ResidentDirectory(ttl_seconds=60, clock=FakeClock()))
+        first = await repo.create(ResidentCreate(name="Mary", room_number="12"))
+
+        with pytest.raises(RoomOccupiedError):
+            await repo.create(ResidentCreate(name="John", room_number="12"))
+
+        assert residents_table.items['room#12']['owner_id'] == first.resident_id
+        residents = await repo.scan_all()
+        assert [r.resident_id for r in residents] == [first.resident_id]
+        # One transaction per create, no scans
+        assert [name for name, _ in residents_table.calls].count('scan') == 1
+
+    @pytest.mark.asyncio
+    async def test_moving_releases_old_room(self, residents_table):
+        repo = ResidentRepository(ResidentDirectory(ttl_seconds=60, clock=FakeClock()))
+        mary = await repo.create(ResidentCreate(name="Mary", room_number="12"))
+        john = await repo.create(ResidentCreate(name="John", room_number="14"))
+
+        with pytest.raises(RoomOccupiedError):
+            await repo.update(john.resident_id, ResidentUpdate(room_number="12"))
+
+        moved = await repo.update(mary.resident_id, ResidentUpdate(room_number="16", name="Mary Smith"))
+        assert moved.room_number == "16" and moved.name == "Mary Smith"
+        assert 'room#12' not in residents_table.items
+
+        assert (await repo.update(john.resident_id, ResidentUpdate(room_number="12"))).room_number == "12"
+
+    @pytest.mark.asyncio
+    async def test_deactivation_frees_room(self, residents_table):
+        repo = ResidentRepository(ResidentDirectory(ttl_seconds=60, clock=FakeClock()))
+        mary = await repo.create(ResidentCreate(name="Mary", room_number="12"))
+
+        assert await repo.delete(mary.resident_id)
+        john = await repo.create(ResidentCreate(name="John", room_number="12"))
+
+        # Mary cannot come back to a room John now holds
+        with pytest.raises(RoomOccupiedError):
+            await repo.update(mary.resident_id, ResidentUpdate(active=True))
+        assert residents_table.items['room#12']['owner_id'] == john.resident_id
+
+
+class TestBulkIngestion:
+    """CallEventRepository.create_many"""
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self):
+        with patch('src.fastapi.app.db.repositories.BATCH_WRITE_BASE_DELAY', 0):
+            yield
+
+    def queued(self, count, **kwargs):
+        start = datetime(2024, 5, 1, 9, 0, 0)
+        return [CallEventBatchItem(resident_id=f"r{n}", event_type=CallEventType.TOUCH_CALL,
+                                   timestamp=start + timedelta(seconds=n), **kwargs)
+                for n in range(count)]
+
+    @pytest.mark.asyncio
+    async def test_writes_in_chunks_of_25(self, calls_table):
+        result = await CallEventRepository().create_many(self.queued(60))
+
+        assert (result.created, result.failed) == (60, 0)
+        assert [r.index for r in result.results] == list(range(60))
+        assert sorted(c['count'] for name, c in calls_table.calls if name == 'batch_write_item') == [10, 25, 25]
+        # Original call times are kept and bucketed by their own day
+        item = calls_table.items[result.results[0].event_id]
+        assert item['timestamp'] == '2024-05-01T09:00:00' and item['day'] == '2024-05-01'
+
+    @pytest.mark.asyncio
+    async def test_unprocessed_items_are_retried(self, calls_table):
+        attempts = []
+
+        def throttle_first_attempt(requests):
+            attempts.append(len(requests))
+            return requests[:5] if len(attempts) == 1 else []
+
+        calls_table.meta.client.unprocessed = throttle_first_attempt
+        result = await CallEventRepository().create_many(self.queued(10))
+
+        assert result.failed == 0
+        assert attempts == [10, 5]
+        assert len(calls_table.items) == 10
+
+    @pytest.mark.asyncio
+    async def test_persistent_failures_are_reported_per_item(self, calls_table):
+        calls_table.meta.client.unprocessed = lambda requests: [
+            r for r in requests if r['PutRequest']['Item']['resident_id'] == 'r3'
+        ]
+        result = await CallEventRepository().create_many(self.queued(5))
+
+        assert (result.created, result.failed) == (4, 1)
+        failed = [r for r in result.results if not r.created]
+        assert failed[0].index == 3 and failed[0].error
+
+    def with_ids(self, count):
+        """Queued events carrying client-minted UUIDv7 IDs"""
+        start = datetime(2024, 5, 1, 9, 0, 0)
+        return [CallEventBatchItem(event_id=uuid7(start + timedelta(seconds=n)), resident_id=f"r{n}",
+                                   event_type=CallEventType.TOUCH_CALL)
+                for n in range(count)]
+
+    @pytest.mark.asyncio
+    async def test_resent_event_ids_are_written_once(self, calls_table):
+        events = self.with_ids(2)
+        events.append(events[0])
+
+        result = await CallEventRepository().create_many(events)
+
+        assert result.created == 3
+        assert [r.event_id for r in result.results] == [events[0].event_id, events[1].event_id, events[0].event_id]
+        assert len(calls_table.items) == 2
+        # The timestamp defaults to the time embedded in the ID
+        assert calls_table.items[events[1].event_id]['timestamp'] == '2024-05-01T09:00:01'
+
+    @pytest.mark.asyncio
+    async def test_resent_batch_leaves_stored_calls_alone(self, calls_table):
+        events = self.with_ids(2)
+        repo = CallEventRepository()
+        await repo.create_many(events[:1])
+        calls_table.items[events[0].event_id]['status'] = 'acknowledged'
+        repo.counters.add.reset_mock()
+
+        result = await repo.create_many(events)
+
+        assert (result.created, result.existing, result.failed) == (1, 1, 0)
+        assert [(r.created, r.existing) for r in result.results] == [(False, True), (True, False)]
+        assert calls_table.items[events[0].event_id]['status'] == 'acknowledged'
+        # Only the new call is counted
+        (deltas,), _ = repo.counters.add.call_args
+        assert sum(deltas.values()) == 1
+
+    def test_client_ids_must_be_uuid7_at_the_timestamp(self):
+        start = datetime(2024, 5, 1, 9, 0, 0)
+        CallEventBatchItem(event_id=uuid7(start), timestamp=start, resident_id='r1',
+                           event_type=CallEventType.TOUCH_CALL)
+        for event_id, timestamp in (('gateway-0', None), (str(uuid.uuid4()), None),
+                                    (uuid7(start).upper(), None), (uuid7(start), start + timedelta(seconds=1))):
+            with pytest.raises(ValidationError):
+                CallEventBatchItem(event_id=event_id, timestamp=timestamp, resident_id='r1',
+                                   event_type=CallEventType.TOUCH_CALL)
+
+
+class TestBatchedLookups:
+    """get_many via BatchGetItem"""
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self):
+        with patch('src.fastapi.app.db.repositories.BATCH_WRITE_BASE_DELAY', 0):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_calls_are_fetched_in_chunks_of_100(self, calls_table):
+        start = datetime(2024, 5, 1, 9, 0, 0)
+        ids = [add_call(calls_table, start + timedelta(seconds=n)) for n in range(150)]
+        wanted = ids[::-1] + ['missing', ids[0]]
+
+        events = await CallEventRepository().get_many(wanted)
+
+        assert [e.event_id for e in events] == ids[::-1]
+        assert sorted(c['count'] for name, c in calls_table.calls if name == 'batch_get_item') == [51, 100]
+
+    @pytest.mark.asyncio
+    async def test_unprocessed_keys_are_retried(self, calls_table):
+        ids = [add_call(calls_table, datetime(2024, 5, 1, 9, 0, n)) for n in range(4)]
+        attempts = []
+
+        def throttle_first_attempt(keys):
+            attempts.append(len(keys))
+            return keys[:2] if len(attempts) == 1 else []
+
+        calls_table.meta.client.unprocessed_keys = throttle_first_attempt
+        events = await CallEventRepository().get_many(ids)
+
+        assert [e.event_id for e in events] == ids
+        assert attempts == [4, 2]
+
+    @pytest.mark.asyncio
+    async def test_residents_come_from_directory_then_one_batch(self, residents_table):
+        repo = ResidentRepository(ResidentDirectory(ttl_seconds=60, clock=FakeClock()))
+        for n in range(3):
+            add_resident(residents_table, n)
+        await repo.get_all()
+        for n in range(3, 5):
+            add_resident(residents_table, n)  # written by another process
+
+        residents = await repo.get_many(['res-004', 'res-000', 'res-003', 'nobody'])
+
+        assert [r.resident_id for r in residents] == ['res-004', 'res-000', 'res-003']
+        assert [c for c in residents_table.calls if c[0] == 'batch_get_item'] == [('batch_get_item', {'count': 3})]
+
+
+class TestLRUCache:
+    """Bounded LRU + TTL cache"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2, ttl_seconds=60, clock=FakeClock())
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        assert cache.get('b') is None
+        assert (cache.get('a'), cache.get('c')) == (1, 3)
+        assert cache.stats()['hits'] == 3 and cache.stats()['misses'] == 1
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = LRUCache(max_entries=10, ttl_seconds=30, clock=clock)
+        cache.put('a', 1)
+        clock.now = 31
+
+        assert cache.get('a') is None
+        assert cache.stats()['entries'] == 0
+
+
+class TestCallEventCache:
+    """Read-through caching of call events by ID"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_lookups_hit_memory(self, calls_table):
+        event_id = add_call(calls_table, datetime(2024, 5, 1, 9, 0, 0))
+        repo = CallEventRepository()
+
+        for _ in range(3):
+            assert (await repo.get_by_id(event_id)).event_id == event_id
+
+        assert [name for name, _ in calls_table.calls] == ['get_item']
+        assert (repo.cache.hits, repo.cache.misses) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_update_refreshes_cached_event(self, calls_table):
+        event_id = add_call(calls_table, datetime(2024, 5, 1, 9, 0, 0))
+        repo = CallEventRepository()
+        await repo.get_by_id(event_id)
+
+        await repo.update(event_id, CallEventUpdate(caregiver_id="c1"))
+        event = await repo.get_by_id(event_id)
+
+        assert event.caregiver_id == "c1"
+        assert [name for name, _ in calls_table.calls] == ['get_item', 'update_item']
+
+    @pytest.mark.asyncio
+    async def test_get_many_reads_only_uncached_ids(self, calls_table):
+        ids = [add_call(calls_table, datetime(2024, 5, 1, 9, 0, n)) for n in range(4)]
+        repo = CallEventRepository()
+        await repo.get_by_id(ids[1])
+
+        events = await repo.get_many(ids)
+
+        assert [e.event_id for e in events] == ids
+        assert ('batch_get_item', {'count': 3}) in calls_table.calls
@@ -0,0 +1,613 @@
+"""
+Embedded SQLite storage backend: expression handling, the Table API and
+the repositories running on it unchanged
+"""
+
+import csv
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from fastapi import HTTPException
+
+from src.fastapi.app.api.v1.deps import field_list
+from src.fastapi.app.core import histogram
+from src.fastapi.app.core.ids import uuid7
+from src.fastapi.app.db import expressions
+from src.fastapi.app.db.cache import LRUCache
+from src.fastapi.app.db.directory import ResidentDirectory, resident_directory
+from src.fastapi.app.db.dynamodb import table_definitions, time_to_live_specifications
+from src.fastapi.app.db.migrate import migrate
+from src.fastapi.app.db.repositories import CallCounterRepository, CallEventRepository, ResidentRepository
+from src.fastapi.app.db.repositories import CallNotActiveError, RoomOccupiedError
+from src.fastapi.app.db.repositories import CALL_SUMMARY_FIELDS, call_event_cache
+from src.fastapi.app.db.sqlite_backend import SQLiteStore
+from src.fastapi.app.models.call_event import CallEvent, CallEventBatchItem, CallEventCreate, CallEventSummary
+from src.fastapi.app.models.call_event import CallEventType, CallEventUpdate
+from src.fastapi.app.models.resident import ResidentCreate, ResidentSummary, ResidentUpdate
+from src.fastapi.app.services.archive import CallArchive, archive_calls
+from src.fastapi.app.services.export import export_lines, iter_calls
+
+
+@pytest.fixture
+def store():
+    store = SQLiteStore()
+    for definition in table_definitions():
+        store.create_table(definition)
+    call_event_cache.clear()
+    resident_directory.clear()
+    with patch('src.fastapi.app.db.repositories.get_table', side_effect=store.table):
+        yield store
+    call_event_cache.clear()
+    resident_directory.clear()
+    store.close()
+
+
+@pytest.fixture
+def table():
+    store = SQLiteStore()
+    yield store.create_table({
+        'TableName': 'things',
+        'KeySchema': [{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        'GlobalSecondaryIndexes': [{
+            'IndexName': 'group-index',
+            'KeySchema': [
+                {'AttributeName': 'group', 'KeyType': 'HASH'},
+                {'AttributeName': 'rank', 'KeyType': 'RANGE'}
+            ]
+        }]
+    })
+    store.close()
+
+
+class TestExpressions:
+    """Condition and update expression evaluation"""
+
+    def check(self, expression, item, values=None, names=None):
+        return expressions.evaluate(expressions.parse_condition(expression, names or {}), item, values or {})
+
+    def test_boolean_operators_and_functions(self):
+        item = {'owner_id': 'a', 'count': Decimal(3), 'tags': ['x']}
+        assert self.check('attribute_not_exists(resident_id) OR owner_id = :o', item, {':o': 'a'})
+        assert not self.check('attribute_exists(resident_id) AND owner_id = :o', item, {':o': 'a'})
+        assert self.check('NOT (#c < :n) AND contains(tags, :t)', item, {':n': 2, ':t': 'x'}, {'#c': 'count'})
+        assert self.check('#c BETWEEN :lo AND :hi', item, {':lo': 1, ':hi': 3}, {'#c': 'count'})
+        assert self.check('owner_id IN (:x, :y)', item, {':x': 'b', ':y': 'a'})
+        assert self.check('begins_with(owner_id, :p) AND size(tags) = :one', item, {':p': 'a', ':one': 1})
+
+    def test_update_actions(self):
+        item = {'id': '1', 'n': Decimal(1), 'old': True}
+        names = {'#n': 'n'}
+        actions = expressions.parse_update(
+            'SET #n = #n + :inc, label = if_not_exists(label, :label) REMOVE old ADD total :inc', names
+        )
+        expressions.apply_update(actions, item, {':inc': 2, ':label': 'x'})
+        assert item == {'id': '1', 'n': Decimal(3), 'label': 'x', 'total': Decimal(2)}
+
+    def test_boto3_conditions_are_rendered(self):
+        expression, names, values = expressions.render(Attr('active').eq(True) & Attr('room').exists(), {}, {})
+        tree = expressions.parse_condition(expression, names)
+        assert expressions.evaluate(tree, {'active': True, 'room': '101'}, values)
+        assert not expressions.evaluate(tree, {'active': True}, values)
+
+
+class TestSQLiteTable:
+    """DynamoDB Table API semantics"""
+
+    @pytest.mark.asyncio
+    async def test_numbers_round_trip_as_decimal(self, table):
+        await table.put_item(Item={'id': 'a', 'n': 5, 'nested': {'xs': [1, 'two']}})
+        item = (await table.get_item(Key={'id': 'a'}))['Item']
+        assert item == {'id': 'a', 'n': Decimal(5), 'nested': {'xs': [Decimal(1), 'two']}}
+        assert (await table.get_item(Key={'id': 'a'}, ProjectionExpression='n'))['Item'] == {'n': Decimal(5)}
+
+    @pytest.mark.asyncio
+    async def test_conditional_writes(self, table):
+        await table.put_item(Item={'id': 'a'}, ConditionExpression='attribute_not_exists(id)')
+        with pytest.raises(ClientError) as error:
+            await table.put_item(Item={'id': 'a'}, ConditionExpression='attribute_not_exists(id)')
+        assert error.value.response['Error']['Code'] == 'ConditionalCheckFailedException'
+
+        response = await table.update_item(
+            Key={'id': 'a'}, UpdateExpression='ADD hits :one', ExpressionAttributeValues={':one': 1},
+            ReturnValues='UPDATED_NEW'
+        )
+        assert response['Attributes'] == {'hits': Decimal(1)}
+
+    @pytest.mark.asyncio
+    async def test_query_orders_limits_and_resumes(self, table):
+        for rank in range(10):
+            await table.put_item(Item={'id': f"i{rank}", 'group': 'g', 'rank': rank})
+        await table.put_item(Item={'id': 'other', 'group': 'h', 'rank': 1})
+        await table.put_item(Item={'id': 'unindexed'})
+
+        condition = Key('group').eq('g') & Key('rank').gte(2)
+        first = await table.query(IndexName='group-index', KeyConditionExpression=condition,
+                                  ScanIndexForward=False, Limit=5)
+        assert [item['rank'] for item in first['Items']] == [9, 8, 7, 6, 5]
+        second = await table.query(IndexName='group-index', KeyConditionExpression=condition,
+                                   ScanIndexForward=False, Limit=5, ExclusiveStartKey=first['LastEvaluatedKey'])
+        assert [item['rank'] for item in second['Items']] == [4, 3, 2]
+        assert 'LastEvaluatedKey' not in second
+
+    @pytest.mark.asyncio
+    async def test_scan_limit_applies_before_filter(self, table):
+        for n in range(6):
+            await table.put_item(Item={'id': f"i{n}", 'even': n % 2 == 0})
+        response = await table.scan(Limit=3, FilterExpression=Attr('even').eq(True))
+        assert response['ScannedCount'] == 3
+        assert len(response['Items']) < 3
+        assert 'LastEvaluatedKey' in response
+
+    @pytest.mark.asyncio
+    async def test_transaction_is_all_or_nothing(self, table):
+        await table.put_item(Item={'id': 'taken', 'owner': 'x'})
+        with pytest.raises(ClientError) as error:
+            await table.meta.client.transact_write_items(TransactItems=[
+                {'Put': {'TableName': 'things', 'Item': {'id': 'new'}}},
+                {'Put': {'TableName': 'things', 'Item': {'id': 'taken', 'owner': 'y'},
+                         'ConditionExpression': 'attribute_not_exists(id)'}}
+            ])
+        reasons = error.value.response['CancellationReasons']
+        assert [reason['Code'] for reason in reasons] == ['None', 'ConditionalCheckFailed']
+        assert 'Item' not in await table.get_item(Key={'id': 'new'})
+        assert (await table.get_item(Key={'id': 'taken'}))['Item']['owner'] == 'x'
+
+
+class TestRepositoriesOnSQLite:
+    """The repositories run unchanged against the embedded backend"""
+
+    @pytest.mark.asyncio
+    async def test_call_events(self, store):
+        repo = CallEventRepository()
+        now = datetime.utcnow()
+        created = [
+            await repo.create(CallEventCreate(resident_id='r1', room_number='101', event_type=CallEventType.TOUCH_CALL))
+            for _ in range(3)
+        ]
+        result = await repo.create_many([
+            CallEventBatchItem(resident_id='r2', room_number='102', event_type=CallEventType.NURSE_COMM,
+                               timestamp=now - timedelta(seconds=n))
+            for n in range(30)
+        ])
+        assert result.created == 30
+
+        page = await repo.get_recent_page(limit=20)
+        assert len(page.items) == 20
+        rest = await repo.get_recent_page(limit=100, cursor=page.next_cursor)
+        assert len(page.items) + len(rest.items) == 33
+        assert {event.event_id for event in page.items}.isdisjoint(event.event_id for event in rest.items)
+
+        call_event_cache.clear()
+        updated = await repo.update(created[0].event_id, CallEventUpdate(status='acknowledged'))
+        assert updated.status == 'acknowledged'
+        assert [event.event_id for event in await repo.get_by_resident('r1')] == [
+            event.event_id for event in reversed(created)
+        ]
+        assert len(await repo.get_many([event.event_id for event in created] + [uuid7()])) == 3
+
+    @pytest.mark.asyncio
+    async def test_day_backfill_for_calls_from_before_day_index(self, store):
+        repo = CallEventRepository()
+        old = await repo.create(CallEventCreate(resident_id='r1', room_number='101', event_type=CallEventType.TOUCH_CALL))
+        await store.table('alexa-care-calls').update_item(
+            Key={'event_id': old.event_id}, UpdateExpression='REMOVE #day', ExpressionAttributeNames={'#day': 'day'}
+        )
+        assert (await repo.get_recent_page(limit=10)).items == []
+
+        assert await repo.backfill_day_buckets() == 1
+        assert [event.event_id for event in (await repo.get_recent_page(limit=10)).items] == [old.event_id]
+        assert await repo.backfill_day_buckets() == 0
+
+    @pytest.mark.asyncio
+    async def test_room_locks(self, store):
+        repo = ResidentRepository()
+        first = await repo.create(ResidentCreate(name='A', room_number='101'))
+        with pytest.raises(RoomOccupiedError):
+            await repo.create(ResidentCreate(name='B', room_number='101'))
+
+        await repo.update(first.resident_id, ResidentUpdate(room_number='102'))
+        second = await repo.create(ResidentCreate(name='B', room_number='101'))
+        assert second.room_number == '101'
+
+        resident_directory.clear()
+        residents = await repo.scan_all(active_only=True)
+        assert {resident.room_number for resident in residents} == {'101', '102'}
+
+    @pytest.mark.asyncio
+    async def test_room_lock_backfill_for_residents_from_before_locks(self, store):
+        repo = ResidentRepository()
+        mary = await repo.create(ResidentCreate(name='Mary', room_number='101'))
+        # Written before room locks existed
+        await store.table('alexa-care-residents').delete_item(Key={'resident_id': 'room#101'})
+
+        assert await repo.backfill_room_locks() == 1
+        with pytest.raises(RoomOccupiedError):
+            await repo.create(ResidentCreate(name='John', room_number='101'))
+        # Re-running keeps Mary's lock
+        assert await repo.backfill_room_locks() == 1
+        lock = await store.table('alexa-care-residents').get_item(Key={'resident_id': 'room#101'})
+        assert lock['Item']['owner_id'] == mary.resident_id
+
+    @pytest.mark.asyncio
+    async def test_room_move_from_stale_directory_follows_stored_room(self, store):
+        # Two workers, each with its own roster snapshot
+        here = ResidentRepository(ResidentDirectory(ttl_seconds=300))
+        there = ResidentRepository(ResidentDirectory(ttl_seconds=300))
+        mary = await here.create(ResidentCreate(name='Mary', room_number='A'))
+        await here.get_all()
+        await there.update(mary.resident_id, ResidentUpdate(room_number='B'))
+
+        # This worker still believes Mary is in A
+        moved = await here.update(mary.resident_id, ResidentUpdate(room_number='C'))
+        assert moved.room_number == 'C'
+
+        table = store.table('alexa-care-residents')
+        assert await table.get_item(Key={'resident_id': 'room#B'}) == {}
+        assert (await table.get_item(Key={'resident_id': 'room#C'}))['Item']['owner_id'] == mary.resident_id
+        assert (await there.create(ResidentCreate(name='John', room_number='B'))).room_number == 'B'
+
+    @pytest.mark.asyncio
+    async def test_room_change_for_resident_deactivated_elsewhere_takes_no_lock(self, store):
+        here = ResidentRepository(ResidentDirectory(ttl_seconds=300))
+        there = ResidentRepository(ResidentDirectory(ttl_seconds=300))
+        mary = await here.create(ResidentCreate(name='Mary', room_number='A'))
+        await here.get_all()
+        await there.delete(mary.resident_id)
+
+        # This worker still believes Mary is active
+        moved = await here.update(mary.resident_id, ResidentUpdate(room_number='C'))
+        assert moved.room_number == 'C' and moved.active is False
+
+        table = store.table('alexa-care-residents')
+        assert await table.get_item(Key={'resident_id': 'room#C'}) == {}
+
+
+class TestProjections:
+    """Summary models and sparse fieldsets read with ProjectionExpression"""
+
+    @pytest.mark.asyncio
+    async def test_summary_pages_leave_out_metadata(self, store):
+        repo = CallEventRepository()
+        for n in range(5):
+            await repo.create(CallEventCreate(resident_id='r1', event_type=CallEventType.NURSE_COMM,
+                                              message=f"m{n}", metadata={'blob': 'x' * 1000}))
+
+        first = await repo.get_recent_page(limit=3, fields=CALL_SUMMARY_FIELDS)
+        assert all(isinstance(event, CallEventSummary) for event in first.items)
+        rest = await repo.get_recent_page(limit=3, cursor=first.next_cursor, fields=CALL_SUMMARY_FIELDS)
+        assert len(first.items) + len(rest.items) == 5
+
+        by_resident = await repo.get_by_resident_page('r1', limit=10, fields=('event_id', 'status'))
+        assert by_resident.items[0].keys() == {'event_id', 'status'}
+
+    @pytest.mark.asyncio
+    async def test_resident_summaries_still_filter_inactive(self, store):
+        repo = ResidentRepository()
+        await repo.create(ResidentCreate(name='A', room_number='101', emergency_contacts=[{'name': 'X'}]))
+        leaving = await repo.create(ResidentCreate(name='B', room_number='102'))
+        await repo.delete(leaving.resident_id)
+
+        page = await repo.get_page(active_only=True, fields=tuple(ResidentSummary.model_fields))
+        assert [resident.name for resident in page.items] == ['A']
+        assert isinstance(page.items[0], ResidentSummary)
+
+    def test_fields_parameter(self):
+        parse = field_list(CallEvent, CallEventSummary)
+        assert parse(None) is None
+        assert parse('summary') == CALL_SUMMARY_FIELDS
+        assert parse('status, event_id,status') == ('status', 'event_id')
+        with pytest.raises(HTTPException):
+            parse('status,secret')
+
+
+class TestCallCounters:
+    """Materialized per-day call counters"""
+
+    @pytest.mark.asyncio
+    async def test_creates_and_transitions_move_counts(self, store):
+        repo = CallEventRepository()
+        touch = [await repo.create(CallEventCreate(resident_id='r1', event_type=CallEventType.TOUCH_CALL))
+                 for _ in range(3)]
+        await repo.create(CallEventCreate(resident_id='r2', event_type=CallEventType.EMERGENCY))
+        await repo.create_many([
+            CallEventBatchItem(resident_id='r3', event_type=CallEventType.NURSE_COMM,
+                               timestamp=datetime.utcnow() - timedelta(days=2))
+            for _ in range(2)
+        ])
+
+        await repo.update(touch[0].event_id, CallEventUpdate(status='acknowledged'))
+        await repo.update(touch[0].event_id, CallEventUpdate(status='resolved'))
+        await repo.update(touch[1].event_id, CallEventUpdate(status='acknowledged'))
+        # Not a transition: counts stay put
+        await repo.update(touch[1].event_id, CallEventUpdate(status='acknowledged'))
+
+        summary = await repo.counters.get_summary(days=7)
+        assert summary['today'] == 4
+        assert summary['period'] == 6
+        assert summary['by_type'] == {'touch_call': 3, 'emergency': 1, 'nurse_comm': 2}
+        assert summary['by_status_today'] == {'active': 2, 'acknowledged': 1, 'resolved': 1}
+
+    @pytest.mark.asyncio
+    async def test_stale_cached_status_is_reread(self, store):
+        repo = CallEventRepository()
+        event = await repo.create(CallEventCreate(resident_id='r1', event_type=CallEventType.TOUCH_CALL))
+        # Another process acknowledges it; this process still caches "active"
+        other = CallEventRepository(cache=LRUCache(max_entries=10, ttl_seconds=60))
+        await other.update(event.event_id, CallEventUpdate(status='acknowledged'))
+
+        await repo.update(event.event_id, CallEventUpdate(status='resolved'))
+        summary = await repo.counters.get_summary(days=1)
+        assert summary['by_status_today'] == {'active': 0, 'acknowledged': 0, 'resolved': 1}
+
+    @pytest.mark.asyncio
+    async def test_rebuild_recounts_from_calls(self, store):
+        repo = CallEventRepository()
+        for _ in range(3):
+            await repo.create(CallEventCreate(resident_id='r1', event_type=CallEventType.TOUCH_CALL))
+        stats = store.table(repo.counters.table_name)
+        for item in (await stats.scan())['Items']:
+            await stats.delete_item(Key={'stat_id': item['stat_id']})
+
+        assert await CallCounterRepository().rebuild() == 1
+        assert (await repo.counters.get_summary(days=1))['today'] == 3
+
+
+    @pytest.mark.asyncio
+    async def test_migration_recounts_calls_from_before_the_upgrade(self, store):
+        repo = CallEventRepository()
+        events = [
+            await repo.create(CallEventCreate(resident_id='r1', event_type=CallEventType.TOUCH_CALL))
+            for _ in range(3)
+        ]
+        # Written before day-index and the counters existed
+        await store.table(repo.table_name).update_item(
+            Key={'event_id': events[0].event_id}, UpdateExpression='REMOVE #day', ExpressionAttributeNames={'#day': 'day'}
+        )
+        stats = store.table(repo.counters.table_name)
+        for item in (await stats.scan())['Items']:
+            await stats.delete_item(Key={'stat_id': item['stat_id']})
+
+        with patch('src.fastapi.app.db.migrate.init_storage', AsyncMock()), \
+             patch('src.fastapi.app.db.migrate.close_storage', AsyncMock()), \
+             patch('src.fastapi.app.db.migrate.storage_backend', return_value='sqlite'):
+            await migrate()
+
+        assert (await repo.counters.get_summary(days=1))['today'] == 3
+
+class TestResponseTimes:
+    """Server-side response times and their running aggregates"""
+
+    def test_histogram_percentiles(self):
+        buckets = histogram.merge([{'le_15': 5}, {'le_30': 4, 'le_inf': 1}])
+        assert buckets['le_15'] == 5 and buckets['le_inf'] == 1
+        assert histogram.percentile(buckets, 0.5) == 15.0
+        assert histogram.percentile(buckets, 0.7) == 22.5
+        assert histogram.percentile(buckets, 1.0) == 1800.0
+        assert histogram.percentile(histogram.merge([]), 0.5) is None
+
+    @pytest.mark.asyncio
+    async def test_acknowledge_computes_response_time_once(self, store):
+        repo = CallEventRepository()
+        result = await repo.create_many([
+            CallEventBatchItem(resident_id='r1', event_type=CallEventType.TOUCH_CALL,
+                               timestamp=datetime.utcnow() - timedelta(seconds=40))
+        ])
+        event_id = result.results[0].event_id
+
+        event = await repo.acknowledge(event_id, 'carer-1')
+        assert event.status == 'acknowledged'
+        assert 40 <= event.response_time <= 45
+        assert event.acknowledged_at is not None
+        with pytest.raises(CallNotActiveError):
+            await repo.acknowledge(event_id, 'carer-2')
+        assert await repo.acknowledge(uuid7(), 'carer-1') is None
+
+        counts = await repo.counters.get_summary(days=1)
+        assert counts['by_status_today'] == {'active': 0, 'acknowledged': 1}
+
+    @pytest.mark.asyncio
+    async def test_aggregates_per_day_and_caregiver(self, store):
+        repo = CallEventRepository()
+        for seconds, caregiver in ((10, 'carer-1'), (20, 'carer-1'), (100, 'carer-2')):
+            result = await repo.create_many([
+                CallEventBatchItem(resident_id='r1', event_type=CallEventType.TOUCH_CALL,
+                                   timestamp=datetime.utcnow() - timedelta(seconds=seconds))
+            ])
+            await repo.acknowledge(result.results[0].event_id, caregiver)
+
+        # A status update to acknowledged is measured the same way
+        event = await repo.create(CallEventCreate(resident_id='r2', event_type=CallEventType.EMERGENCY))
+        await repo.update(event.event_id, CallEventUpdate(status='acknowledged', caregiver_id='carer-2',
+                                                          response_time=9999))
+
+        day = await repo.response_times.get_stats(days=1)
+        assert day.count == 4
+        assert day.histogram['le_15'] == 2 and day.histogram['le_120'] == 1
+        assert (await repo.get_by_id(event.event_id)).response_time < 5
+
+        carer = await repo.response_times.get_stats(days=7, caregiver_id='carer-1')
+        assert carer.count == 2
+        assert 25 <= carer.total_seconds <= 35
+        assert carer.p50_seconds is not None
+
+
+class TestTimeSeries:
+    """Hourly rollups served as downsampled series"""
+
+    @pytest.mark.asyncio
+    async def test_series_sums_hourly_rollups(self, store):
+        repo = CallEventRepository()
+        base = datetime(2026, 3, 1, 10, 0)
+        result = await repo.create_many([
+            CallEventBatchItem(resident_id='r1', event_type=CallEventType.TOUCH_CALL,
+                               timestamp=base + timedelta(minutes=5)),
+            CallEventBatchItem(resident_id='r1', event_type=CallEventType.TOUCH_CALL,
+                               timestamp=base + timedelta(minutes=50)),
+            CallEventBatchItem(resident_id='r2', event_type=CallEventType.EMERGENCY,
+                               timestamp=base + timedelta(hours=1, minutes=30)),
+        ])
+        await repo.acknowledge(result.results[0].event_id, 'carer-1')
+
+        hourly = await repo.rollups.get_series(base, base + timedelta(hours=3), 1)
+        assert [point.start for point in hourly] == [base + timedelta(hours=h) for h in range(3)]
+        assert [point.calls for point in hourly] == [2, 1, 0]
+        assert hourly[0].by_type == {'touch_call': 2}
+        assert hourly[0].acknowledged == 1
+        assert hourly[0].average_response_seconds > 0
+        assert hourly[1].p50_response_seconds is None
+
+        # Steps align to step boundaries, not to the requested start
+        two_hourly = await repo.rollups.get_series(base + timedelta(minutes=30), base + timedelta(hours=2), 2)
+        assert len(two_hourly) == 1
+        assert two_hourly[0].start == base
+        assert two_hourly[0].calls == 3
+        assert two_hourly[0].by_type == {'touch_call': 2, 'emergency': 1}
+
+
+class TestArchive:
+    """Archiving old resolved calls to day-partitioned files"""
+
+    @pytest.mark.asyncio
+    async def test_archive_moves_old_resolved_calls(self, store, tmp_path):
+        for table_name, ttl in time_to_live_specifications().items():
+            await store.client.update_time_to_live(TableName=table_name, TimeToLiveSpecification=ttl)
+        repo = CallEventRepository()
+        old = datetime.utcnow() - timedelta(days=100)
+        result = await repo.create_many([
+            CallEventBatchItem(resident_id=resident_id, event_type=CallEventType.TOUCH_CALL, timestamp=timestamp)
+            for resident_id, timestamp in (('r1', old), ('r2', old), ('r1', old), ('r1', datetime.utcnow()))
+        ])
+        resolved, still_active, reopened, recent = [item.event_id for item in result.results]
+        for event_id in (resolved, reopened, recent):
+            await repo.update(event_id, CallEventUpdate(status='resolved'))
+
+        archive = CallArchive(str(tmp_path))
+        # Reopened between being read and being marked: stays in the hot table
+        get_archivable = repo.get_archivable
+
+        async def reopen_after_read(day):
+            events = await get_archivable(day)
+            if events:
+                await repo.update(reopened, CallEventUpdate(status='active'))
+            return events
+
+        with patch.object(repo, 'get_archivable', side_effect=reopen_after_read):
+            summary = await archive_calls(archive, repo, older_than_days=90, lookback_days=30)
+        assert summary == {'archived': 2, 'marked': 1, 'expired': 0}
+
+        assert store.expire() == 1
+        assert await repo.get_by_id(resolved) is None
+        for event_id in (still_active, reopened, recent):
+            assert await repo.get_by_id(event_id) is not None
+        # Nothing left to archive on the next run
+        assert (await archive_calls(archive, repo, older_than_days=90, lookback_days=30))['archived'] == 0
+
+        day = old.strftime('%Y-%m-%d')
+        assert archive.days() == [day]
+        archived = list(archive.read(old.date(), old.date(), resident_id='r1'))
+        assert {event.event_id for event in archived} == {resolved, reopened}
+
+    def test_reader_drops_duplicate_parts(self, tmp_path):
+        archive = CallArchive(str(tmp_path))
+        events = [CallEvent(event_id=uuid7(), resident_id='r1', event_type=CallEventType.TOUCH_CALL,
+                            timestamp=datetime(2026, 1, 5, hour), status='resolved')
+                  for hour in (9, 8)]
+        archive.write('2026-01-05', events)
+        archive.write('2026-01-05', events[:1])
+
+        read = list(archive.read(datetime(2026, 1, 1).date(), datetime(2026, 1, 31).date()))
+        assert [event.timestamp.hour for event in read] == [8, 9]
+        assert list(archive.read(datetime(2026, 2, 1).date(), datetime(2026, 2, 2).date())) == []
+
+
+class TestExport:
+    """Streaming call history from the calls table and the archive"""
+
+    @pytest.mark.asyncio
+    async def test_export_spans_table_and_archive(self, store, tmp_path):
+        await store.client.update_time_to_live(TableName='alexa-care-calls',
+                                               TimeToLiveSpecification={'AttributeName': 'ttl', 'Enabled': True})
+        repo = CallEventRepository()
+        old = datetime.utcnow().replace(hour=12) - timedelta(days=100)
+        result = await repo.create_many([
+            CallEventBatchItem(resident_id=resident_id, event_type=CallEventType.TOUCH_CALL,
+                               timestamp=old + timedelta(hours=hours))
+            for resident_id, hours in (('r1', 0), ('r2', 1), ('r1', 2), ('r1', 24), ('r1', 24 * 20))
+        ])
+        event_ids = [item.event_id for item in result.results]
+        await repo.update(event_ids[1], CallEventUpdate(status='resolved'))
+        archive = CallArchive(str(tmp_path))
+        assert (await archive_calls(archive, repo, older_than_days=90, lookback_days=30))['archived'] == 1
+
+        start, end = old - timedelta(hours=1), old + timedelta(days=2)
+        # Archived but not yet expired: sent once
+        exported = [event.event_id async for event in iter_calls(start, end, repo=repo, archive=archive)]
+        assert exported == event_ids[:4]
+        store.expire()
+        exported = [event.event_id async for event in iter_calls(start, end, repo=repo, archive=archive)]
+        assert exported == event_ids[:4]
+
+        for_r1 = [event.event_id async for event in
+                  iter_calls(old + timedelta(hours=1), end, resident_id='r1', repo=repo, archive=archive)]
+        assert for_r1 == [event_ids[2], event_ids[3]]
+
+    @pytest.mark.asyncio
+    async def test_export_orders_by_time_within_a_millisecond(self, store, tmp_path):
+        repo = CallEventRepository()
+        moment = datetime(2026, 1, 5, 9, 0, 0, 100)
+        low, high = sorted([uuid7(moment), uuid7(moment)])
+        # The later call has the smaller ID, so day-index returns it first
+        await repo.create_many([
+            CallEventBatchItem(event_id=high, timestamp=moment, resident_id='r1', event_type=CallEventType.TOUCH_CALL),
+            CallEventBatchItem(event_id=low, timestamp=moment + timedelta(microseconds=500), resident_id='r1',
+                               event_type=CallEventType.TOUCH_CALL)
+        ])
+
+        exported = [event.event_id async for event in
+                    iter_calls(moment - timedelta(hours=1), moment + timedelta(hours=1),
+                               repo=repo, archive=CallArchive(str(tmp_path)))]
+        assert exported == [high, low]
+
+    @pytest.mark.asyncio
+    async def test_export_pages_lazily(self, store):
+        repo = CallEventRepository()
+        now = datetime.utcnow()
+        await repo.create_many([
+            CallEventBatchItem(resident_id='r1', event_type=CallEventType.EMERGENCY,
+                               timestamp=now - timedelta(minutes=n))
+            for n in range(5)
+        ])
+        table = store.table(repo.table_name)
+        with patch.object(table, 'query', wraps=table.query) as query:
+            events = repo.iter_range(now - timedelta(hours=1), now + timedelta(seconds=1), page_size=2)
+            await events.__anext__()
+            assert query.call_count == 1
+            assert len([event async for event in events]) == 4
+            assert query.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_export_formats(self):
+        events = [CallEvent(event_id=f"e{n}", resident_id='r1', event_type=CallEventType.TOUCH_CALL,
+                            timestamp=datetime(2026, 1, 5, 9, n), metadata={'room': '101'})
+                  for n in range(3)]
+
+        async def stream():
+            for event in events:
+                yield event
+
+        ndjson = [chunk async for chunk in export_lines(stream(), 'ndjson')]
+        assert len(ndjson) == 2
+        assert [json.loads(line)['event_id'] for line in ''.join(ndjson).splitlines()] == ['e0', 'e1', 'e2']
+
+        text = ''.join([chunk async for chunk in export_lines(stream(), 'csv')])
+        rows = list(csv.DictReader(io.StringIO(text)))
+        assert [row['event_id'] for row in rows] == ['e0', 'e1', 'e2']
+        assert json.loads(rows[0]['metadata']) == {'room': '101'}
+